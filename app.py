@@ -1,11 +1,14 @@
 from flask import Flask, render_template, request, jsonify, session, redirect, url_for
 from flask_mail import Mail
 from src.email_service import EmailService
-from src.data_manager import DataManager
-from src.embeddings_matcher import EmbeddingsMatcher
+from src.metrics import init_metrics
+from src.recommendation_service import RecommendationService
+from src.response_cache import ResponseCache
 from src.scheduler import init_scheduler
 import config
+import hmac
 import logging
+from functools import wraps
 
 # Configuration logging
 logging.basicConfig(level=logging.INFO)
@@ -19,9 +22,43 @@ app.config.from_object(config)
 mail = Mail(app)
 EmailService(app)
 
+# Charger les données et le modèle une seule fois (le modèle à la première recommandation
+# si MODEL_LAZY_LOAD), rechargement atomique quand les fichiers de données changent
+service = RecommendationService(model_type="word2vec", lazy_model=config.MODEL_LAZY_LOAD).start()
+
+# Cache des réponses de lecture, vidé à chaque nouvel état (catalogue ou modèle remplacé)
+response_cache = ResponseCache.from_config()
+service.add_listener(response_cache.invalidate)
+
+# Latences des requêtes et endpoint /metrics (format Prometheus)
+init_metrics(app)
+
 # Initialiser le scheduler (optionnel)
 # init_scheduler(app)
 
+def admin_required(view):
+    """Réserve un endpoint aux appels portant l'en-tête X-Admin-Token = ADMIN_TOKEN"""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        expected = app.config.get('ADMIN_TOKEN')
+        token = request.headers.get('X-Admin-Token', '')
+        if not expected or not hmac.compare_digest(token.encode('utf-8'), expected.encode('utf-8')):
+            return jsonify({'success': False, 'error': 'Accès administrateur requis'}), 403
+        return view(*args, **kwargs)
+    return wrapper
+
+def get_engine_matcher(state):
+    """Matcher du moteur demandé par la requête (?engine=word2vec|tfidf|hybrid)"""
+    data = request.get_json(silent=True) or {}
+    return state.get_matcher(request.args.get('engine') or data.get('engine'))
+
+def recommendations_cache_key():
+    """Clé du cache : moteur, profil et version de l'état (catalogue + modèle)"""
+    data = request.get_json(silent=True) or {}
+    state = service.snapshot()
+    engine = request.args.get('engine') or data.get('engine') or ''
+    return f"{engine}:{state.profiles[0]['id'] if state.profiles else ''}:{state.version}"
+
 # Routes
 @app.route('/')
 def index():
@@ -40,23 +77,20 @@ def recommendations():
     # Le JavaScript s'occupera de vérifier la session storage
     return render_template('recommendations.html')
 
-@app.route('/api/test-recommendations', methods=['POST'])
+@app.route('/api/test-recommendations', methods=['GET', 'POST'])
+@response_cache.cached(recommendations_cache_key)
 def test_recommendations():
     """API pour tester les recommandations (sans email)"""
     
     try:
-        # Charger les données
-        dm = DataManager()
-        dm.load_profiles(config.MADAGASCAR_PROFILES_FILE)
-        dm.load_scraped_jobs(config.MADAGASCAR_JOBS_FILE)
-        
-        # Entraîner le matcher
-        matcher = EmbeddingsMatcher(model_type="word2vec")
-        matcher.train_model(dm.profiles, dm.jobs)
-        
         # Récupérer les recommandations pour le premier profil
-        profile = dm.profiles[0]
-        recommendations = matcher.recommend(profile, dm.jobs)
+        state = service.snapshot()
+        try:
+            matcher = get_engine_matcher(state)
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+        profile = state.profiles[0]
+        recommendations = matcher.recommend(profile, state.jobs)
         
         # IMPORTANT: Convertir les scores float32 en float Python
         for rec in recommendations:
@@ -84,17 +118,14 @@ def send_test_email():
         if not profile_email:
             return jsonify({'success': False, 'error': 'Email requis'}), 400
         
-        # Charger les données
-        dm = DataManager()
-        dm.load_profiles(config.MADAGASCAR_PROFILES_FILE)
-        dm.load_scraped_jobs(config.MADAGASCAR_JOBS_FILE)
-        
-        # Matcher pour le premier profil
-        matcher = EmbeddingsMatcher(model_type="word2vec")
-        matcher.train_model(dm.profiles, dm.jobs)
-        
-        profile = dm.profiles[0]
-        recommendations = matcher.recommend(profile, dm.jobs)
+        # Matcher pour le premier profil (modèle chargé au démarrage)
+        state = service.snapshot()
+        try:
+            matcher = get_engine_matcher(state)
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+        profile = state.profiles[0]
+        recommendations = matcher.recommend(profile, state.jobs)
         
         # Envoyer l'email
         success = EmailService.send_recommendations_email(
@@ -113,14 +144,47 @@ def send_test_email():
         return jsonify({'success': False, 'error': str(e)}), 500
 
 @app.route('/api/profiles', methods=['GET'])
+@response_cache.cached(lambda: service.snapshot().version)
 def get_profiles():
     """API pour récupérer les profils"""
     try:
-        dm = DataManager()
-        dm.load_profiles(config.MADAGASCAR_PROFILES_FILE)
-        return jsonify({'success': True, 'profiles': dm.profiles})
+        return jsonify({'success': True, 'profiles': service.snapshot().profiles})
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
+@app.route('/api/ingest-jobs', methods=['POST'])
+@admin_required
+def ingest_jobs():
+    """API pour ajouter les nouvelles offres scrappées sans tout recharger"""
+    try:
+        data = request.get_json(silent=True)
+        if data is None:
+            data = {}
+        if not isinstance(data, dict):
+            return jsonify({'success': False, 'error': "Objet JSON {\"jobs\": [...]} attendu"}), 400
+        try:
+            if 'jobs' in data:
+                report = service.ingest_jobs(data['jobs'])
+            else:
+                report = service.ingest_jobs_file(config.SCRAPED_JOBS_FILE)
+        except ValueError as e:
+            # Lot refusé en entier avant toute modification du catalogue
+            return jsonify({'success': False, 'error': str(e)}), 400
+        return jsonify({'success': True, **report, 'version': service.snapshot().version})
+    except Exception as e:
+        logger.error(f"Erreur: {str(e)}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/api/reload', methods=['POST'])
+@admin_required
+def reload_data():
+    """API pour recharger les données et le modèle"""
+    try:
+        reloaded = service.reload(force=request.args.get('force', '').lower() in ('1', 'true', 'yes'))
+        return jsonify({'success': True, 'reloaded': reloaded, 'version': service.snapshot().version})
+    except Exception as e:
+        logger.error(f"Erreur: {str(e)}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
 if __name__ == '__main__':
     app.run(debug=True, port=5000)
\ No newline at end of file
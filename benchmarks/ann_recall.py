@@ -0,0 +1,85 @@
+"""Benchmark recall@k de l'index IVF par rapport à la recherche exacte
+
+Usage :
+    python -m benchmarks.ann_recall                      # catalogue Madagascar
+    python -m benchmarks.ann_recall --synthetic 200000   # vecteurs synthétiques
+"""
+
+import argparse
+import json
+import time
+import numpy as np
+from config import MADAGASCAR_PROFILES_FILE, MADAGASCAR_JOBS_FILE, EMBEDDING_DIM
+from src.ann_index import IVFIndex, evaluate_recall
+from src.job_index import normalize_rows
+
+
+def synthetic_vectors(n, dim, n_topics=200, seed=0):
+    """Vecteurs regroupés autour de thèmes, proches de la structure des offres"""
+    rng = np.random.default_rng(seed)
+    topics = rng.normal(size=(n_topics, dim)).astype(np.float32)
+    labels = rng.integers(0, n_topics, size=n)
+    noise = rng.normal(scale=0.8, size=(n, dim)).astype(np.float32)
+    return normalize_rows(topics[labels] + noise)
+
+
+def madagascar_vectors():
+    """Vecteurs des offres et des profils Madagascar avec le modèle du registre"""
+    from src.data_manager import DataManager
+    from src.embeddings_matcher import EmbeddingsMatcher
+
+    dm = DataManager()
+    dm.load_profiles(MADAGASCAR_PROFILES_FILE)
+    dm.load_scraped_jobs(MADAGASCAR_JOBS_FILE)
+    matcher = EmbeddingsMatcher()
+    matcher.load_or_train(dm.profiles, dm.jobs)
+
+    queries = np.array([
+        matcher._get_text_embedding(matcher._extract_profile_text(p)) for p in dm.profiles
+    ], dtype=np.float32)
+    return matcher.job_index.vectors, queries
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--synthetic', type=int, default=0, help="nombre d'offres synthétiques")
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('-k', type=int, default=10)
+    parser.add_argument('--n-lists', type=int, nargs='*', default=None)
+    parser.add_argument('--n-probe', type=int, nargs='*', default=[1, 2, 4, 8, 16, 32])
+    parser.add_argument('--json', help='fichier de résultats JSON')
+    args = parser.parse_args()
+
+    if args.synthetic:
+        vectors = synthetic_vectors(args.synthetic, EMBEDDING_DIM)
+        rng = np.random.default_rng(1)
+        queries = vectors[rng.choice(len(vectors), args.queries, replace=False)]
+        queries = queries + rng.normal(scale=0.05, size=queries.shape).astype(np.float32)
+    else:
+        vectors, queries = madagascar_vectors()
+
+    n_lists_grid = args.n_lists or [max(1, int(np.sqrt(len(vectors))))]
+    results = []
+
+    print(f"\n{'n_lists':>8} {'n_probe':>8} {'recall@k':>9} {'exact ms':>9} {'ann ms':>8} {'build s':>8}")
+    for n_lists in n_lists_grid:
+        start = time.perf_counter()
+        index = IVFIndex(n_lists=n_lists).build(vectors)
+        build_time = time.perf_counter() - start
+
+        for n_probe in args.n_probe:
+            result = evaluate_recall(index, vectors, queries, args.k, n_probe)
+            result['n_jobs'] = len(vectors)
+            result['build_s'] = build_time
+            results.append(result)
+            print(f"{result['n_lists']:>8} {result['n_probe']:>8} {result['recall']:>9.3f} "
+                  f"{result['exact_ms']:>9.3f} {result['ann_ms']:>8.3f} {build_time:>8.2f}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"\n✓ Résultats exportés vers {args.json}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+"""Temps d'import à froid des modules d'entrée (mesuré par python -X importtime)
+
+Chaque module est importé dans un interpréteur neuf; le temps reporté est
+le temps cumulé de son import (dépendances comprises). Les dépendances
+lourdes (gensim, sklearn, nltk...) chargées par l'import sont listées : elles
+ne devraient l'être qu'au premier entraînement ou à la première recommandation.
+
+Usage :
+    python -m benchmarks.cold_start
+    python -m benchmarks.cold_start --modules app src.pipeline --budget 0.5
+    python -m benchmarks.cold_start --json cold_start.json
+"""
+
+import argparse
+import json
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+DEFAULT_MODULES = ('src.recommendation_service', 'src.embeddings_matcher', 'src.matcher', 'src.pipeline', 'app')
+
+# Dépendances dont l'import coûte des centaines de millisecondes
+HEAVY_MODULES = ('gensim', 'sklearn', 'nltk', 'scipy', 'pandas')
+
+# "import time:  self [us] | cumulative | imported package" (nom indenté selon la profondeur)
+IMPORTTIME_RE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| ( *)(\S+)$")
+
+
+def import_time(module):
+    """(secondes cumulées, dépendances lourdes chargées) de l'import de module dans un processus neuf"""
+    completed = subprocess.run([sys.executable, '-X', 'importtime', '-c', f"import {module}"],
+                               cwd=ROOT, capture_output=True, text=True, check=True)
+    cumulative, loaded = 0, set()
+    for line in completed.stderr.splitlines():
+        match = IMPORTTIME_RE.match(line)
+        if not match:
+            continue
+        name = match.group(4)
+        loaded.add(name.split('.')[0])
+        if name == module and not match.group(3):
+            cumulative = int(match.group(2))
+    return cumulative / 1e6, sorted(loaded & set(HEAVY_MODULES))
+
+
+def measure(modules=DEFAULT_MODULES):
+    """Un résultat par module : {'module', 'import_s', 'heavy_modules'}"""
+    results = []
+    for module in modules:
+        seconds, heavy = import_time(module)
+        results.append({'module': module, 'import_s': seconds, 'heavy_modules': heavy})
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--modules', nargs='*', default=list(DEFAULT_MODULES))
+    parser.add_argument('--budget', type=float, default=1.0, help="temps d'import maximal par module (s)")
+    parser.add_argument('--json', help='fichier de résultats JSON')
+    args = parser.parse_args()
+
+    results = measure(args.modules)
+    over_budget = 0
+    for result in results:
+        over = result['import_s'] > args.budget
+        over_budget += over
+        heavy = ', '.join(result['heavy_modules']) or '-'
+        print(f"{'⚠️' if over else '✓'} {result['module']:<30} {result['import_s']:>7.3f} s  lourds: {heavy}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'budget_s': args.budget, 'results': results}, f, indent=2)
+        print(f"✓ Résultats exportés vers {args.json}")
+    sys.exit(1 if over_budget else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+"""Benchmark du rendu des emails de recommandations (temps pour 10k emails)
+
+Compare l'ancienne construction par concaténation de f-strings au template
+Jinja compilé une seule fois (HTML seul, puis HTML + texte).
+
+Usage :
+    python -m benchmarks.email_rendering
+    python -m benchmarks.email_rendering --emails 10000 --recommendations 5 --json emails.json
+"""
+
+import argparse
+import json
+import time
+from datetime import datetime
+from src.email_service import EmailService, _email_templates
+
+
+def concat_html(profile_name, recommendations):
+    """Ancienne construction : CSS réémis et `html +=` pour chaque offre"""
+    html = f"""
+        <html>
+            <head>
+                <meta charset="UTF-8">
+                <style>
+                    body {{ font-family: Arial, sans-serif; background-color: #f5f5f5; }}
+                    .container {{ max-width: 600px; margin: 20px auto; background: white; padding: 20px; border-radius: 8px; }}
+                    .header {{ background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); color: white; padding: 20px; border-radius: 8px 8px 0 0; text-align: center; }}
+                    .job-card {{ border: 1px solid #ddd; margin: 15px 0; padding: 15px; border-radius: 5px; }}
+                    .job-title {{ font-size: 18px; font-weight: bold; color: #333; }}
+                    .company {{ color: #666; font-size: 14px; }}
+                    .match-score {{ background: #4CAF50; color: white; padding: 5px 10px; border-radius: 3px; font-weight: bold; }}
+                    .footer {{ text-align: center; color: #999; font-size: 12px; margin-top: 20px; }}
+                </style>
+            </head>
+            <body>
+                <div class="container">
+                    <div class="header">
+                        <h1>Bonjour {profile_name}!</h1>
+                    </div>
+                    <p>Nous avons trouvé <strong>{len(recommendations)}</strong> offres correspondant à votre profil:</p>
+        """
+    for i, rec in enumerate(recommendations, 1):
+        html += f"""
+                    <div class="job-card">
+                        <div class="job-title">{i}. {rec['job_title']}</div>
+                        <div class="company">{rec['company']} - {rec['location']}</div>
+                        <div class="match-score">{rec['score']:.1%}</div>
+                        <a href="{rec['url']}" target="_blank">Voir l'offre →</a>
+                    </div>
+            """
+    html += f"""
+                    <div class="footer">
+                        <p>Envoyé le {datetime.now().strftime('%d/%m/%Y à %H:%M')}</p>
+                    </div>
+                </div>
+            </body>
+        </html>
+        """
+    return html
+
+
+def timed(render, recipients):
+    start = time.perf_counter()
+    for profile_name, _, recommendations in recipients:
+        render(profile_name, recommendations)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--emails', type=int, default=10000)
+    parser.add_argument('--recommendations', type=int, default=5, help='offres par email')
+    parser.add_argument('--json', help='fichier de résultats JSON')
+    args = parser.parse_args()
+
+    recipients = [(f'Profil {i}', f'profil{i}@example.com', [{
+        'job_title': f'Développeur Python {j}',
+        'company': 'Acme',
+        'location': 'Antananarivo',
+        'score': 0.5 + j / 100,
+        'url': f'https://example.com/jobs/{i}-{j}'
+    } for j in range(args.recommendations)]) for i in range(args.emails)]
+
+    start = time.perf_counter()
+    _email_templates()
+    compile_ms = 1000 * (time.perf_counter() - start)
+
+    sent_at = datetime.now()
+    renderers = {
+        'concat_html': concat_html,
+        'template_html': lambda name, recs: EmailService._build_email_html(name, recs, sent_at),
+        'template_html_text': lambda name, recs: (
+            EmailService._build_email_html(name, recs, sent_at),
+            EmailService._build_email_text(name, recs, sent_at)
+        )
+    }
+
+    results = {'n_emails': args.emails, 'recommendations': args.recommendations, 'compile_ms': compile_ms}
+    print(f"\n{'rendu':<20} {'s / 10k emails':>15} {'µs/email':>10}")
+    for name, render in renderers.items():
+        elapsed = timed(render, recipients)
+        results[name] = {
+            'seconds_per_10k': elapsed * 10000 / args.emails,
+            'us_per_email': 1e6 * elapsed / args.emails
+        }
+        print(f"{name:<20} {results[name]['seconds_per_10k']:>15.3f} {results[name]['us_per_email']:>10.1f}")
+    print(f"\nCompilation des templates: {compile_ms:.2f} ms")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"\n✓ Résultats exportés vers {args.json}")
+
+
+if __name__ == '__main__':
+    main()
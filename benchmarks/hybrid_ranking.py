@@ -0,0 +1,103 @@
+"""Benchmark latence et qualité du moteur hybride face à TF-IDF et aux embeddings seuls
+
+La qualité est mesurée sans jugements manuels : la pertinence d'une offre
+pour un profil est le nombre de compétences du profil présentes dans les
+compétences requises de l'offre (nDCG@k et précision@k, pertinent = au
+moins une compétence commune).
+
+Usage :
+    python -m benchmarks.hybrid_ranking
+    python -m benchmarks.hybrid_ranking --repeat 50 --json hybrid.json
+"""
+
+import argparse
+import json
+import time
+import numpy as np
+from config import MADAGASCAR_PROFILES_FILE, MADAGASCAR_JOBS_FILE, TOP_N_RECOMMENDATIONS
+from src.data_manager import DataManager
+from src.embeddings_matcher import EmbeddingsMatcher
+from src.hybrid_matcher import HybridMatcher
+from src.matcher import SimpleMatcher
+
+
+def relevance(profile, job):
+    """Nombre de compétences du profil requises par l'offre"""
+    skills = {skill.lower() for skill in profile.get('skills', [])}
+    return len(skills & {skill.lower() for skill in job.get('required_skills', [])})
+
+
+def ranking_quality(profiles, jobs, all_recommendations, k):
+    """nDCG@k et précision@k moyens sur les profils"""
+    jobs_by_id = {job['id']: job for job in jobs}
+    ndcgs, precisions = [], []
+    discounts = 1.0 / np.log2(np.arange(2, k + 2))
+
+    for profile, recommendations in zip(profiles, all_recommendations):
+        gains = [relevance(profile, jobs_by_id[r['job_id']]) for r in recommendations[:k]]
+        ideal = sorted((relevance(profile, job) for job in jobs), reverse=True)[:k]
+        idcg = float(np.dot(ideal, discounts[:len(ideal)]))
+        dcg = float(np.dot(gains, discounts[:len(gains)]))
+        ndcgs.append(dcg / idcg if idcg else 0.0)
+        precisions.append(sum(1 for g in gains if g > 0) / k)
+
+    return float(np.mean(ndcgs)), float(np.mean(precisions))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=20, help='répétitions pour la latence')
+    parser.add_argument('-k', type=int, default=TOP_N_RECOMMENDATIONS)
+    parser.add_argument('--sparse-weight', type=float, nargs='*', default=[0.3, 0.5])
+    parser.add_argument('--json', help='fichier de résultats JSON')
+    args = parser.parse_args()
+
+    dm = DataManager()
+    dm.load_profiles(MADAGASCAR_PROFILES_FILE)
+    dm.load_scraped_jobs(MADAGASCAR_JOBS_FILE)
+    profiles, jobs = dm.profiles, dm.jobs
+
+    dense = EmbeddingsMatcher()
+    dense.load_or_train(profiles, jobs)
+    sparse = SimpleMatcher()
+    sparse.load_or_fit(jobs)
+
+    engines = {'word2vec': dense, 'tfidf': sparse}
+    for weight in args.sparse_weight:
+        engines[f'hybrid-weighted-{weight}'] = HybridMatcher(dense, sparse, fusion='weighted', sparse_weight=weight)
+    engines['hybrid-rrf'] = HybridMatcher(dense, sparse, fusion='rrf')
+
+    results = []
+    print(f"\n{'moteur':<24} {'ms/profil':>10} {'lot ms':>8} {'nDCG@k':>8} {'P@k':>6}")
+    for name, matcher in engines.items():
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            for profile in profiles:
+                matcher.recommend(profile, jobs)
+        single_ms = 1000 * (time.perf_counter() - start) / (args.repeat * len(profiles))
+
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            batch = matcher.recommend_batch(profiles, jobs)
+        batch_ms = 1000 * (time.perf_counter() - start) / args.repeat
+
+        ndcg, precision = ranking_quality(profiles, jobs, batch, args.k)
+        results.append({
+            'engine': name,
+            'n_jobs': len(jobs),
+            'n_profiles': len(profiles),
+            'single_ms': single_ms,
+            'batch_ms': batch_ms,
+            'ndcg': ndcg,
+            'precision': precision
+        })
+        print(f"{name:<24} {single_ms:>10.3f} {batch_ms:>8.3f} {ndcg:>8.3f} {precision:>6.2f}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"\n✓ Résultats exportés vers {args.json}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+"""Mémoire de l'index d'offres quantifié (float16, int8, pq) et accord de classement avec float32
+
+Pour chaque méthode : octets par offre (codes et dictionnaires), recouvrement
+des top k avec la recherche float32 exacte, avec les scores quantifiés seuls
+puis après re-classement exact de n candidats, et latences par requête.
+
+Usage :
+    python -m benchmarks.quantization                      # catalogue Madagascar
+    python -m benchmarks.quantization --synthetic 200000   # vecteurs synthétiques
+    python -m benchmarks.quantization --candidates 10 50 200 --json quantization.json
+"""
+
+import argparse
+import json
+import time
+import numpy as np
+from config import EMBEDDING_DIM
+from benchmarks.ann_recall import madagascar_vectors, synthetic_vectors
+from src.quantization import QUANTIZERS, evaluate_agreement, quantize
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--synthetic', type=int, default=0, help="nombre d'offres synthétiques")
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('-k', type=int, default=5)
+    parser.add_argument('--methods', nargs='*', choices=list(QUANTIZERS), default=list(QUANTIZERS))
+    parser.add_argument('--candidates', type=int, nargs='*', default=[10, 20, 100])
+    parser.add_argument('--json', help='fichier de résultats JSON')
+    args = parser.parse_args()
+
+    if args.synthetic:
+        vectors = synthetic_vectors(args.synthetic, EMBEDDING_DIM)
+        rng = np.random.default_rng(1)
+        queries = vectors[rng.choice(len(vectors), args.queries, replace=False)]
+        queries = queries + rng.normal(scale=0.05, size=queries.shape).astype(np.float32)
+    else:
+        vectors, queries = madagascar_vectors()
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+
+    print(f"\n{len(vectors)} offres, {len(queries)} requêtes, top {args.k} "
+          f"(float64 : {8 * vectors.shape[1]} o/offre, float32 : {4 * vectors.shape[1]} o/offre)")
+    print(f"{'méthode':>8} {'o/offre':>8} {'gain':>6} {'cand.':>6} {'top-k':>6} {'re-cl.':>7} "
+          f"{'exact ms':>9} {'quant ms':>9} {'re-cl. ms':>10} {'build s':>8}")
+    results = []
+    for method in args.methods:
+        start = time.perf_counter()
+        quantized = quantize(vectors, method)
+        build_time = time.perf_counter() - start
+
+        for n_candidates in args.candidates:
+            result = evaluate_agreement(quantized, vectors, queries, args.k, n_candidates)
+            result['n_jobs'] = len(vectors)
+            result['memory_ratio'] = result['float32_bytes_per_job'] / result['bytes_per_job']
+            result['build_s'] = build_time
+            results.append(result)
+            print(f"{method:>8} {result['bytes_per_job']:>8.1f} {result['memory_ratio']:>5.1f}x "
+                  f"{n_candidates:>6} {result['topk_overlap']:>6.3f} {result['topk_overlap_reranked']:>7.3f} "
+                  f"{result['exact_ms']:>9.3f} {result['quantized_ms']:>9.3f} {result['reranked_ms']:>10.3f} "
+                  f"{build_time:>8.2f}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"\n✓ Résultats exportés vers {args.json}")
+
+
+if __name__ == '__main__':
+    main()
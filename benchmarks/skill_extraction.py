@@ -0,0 +1,90 @@
+"""Benchmark du débit d'extraction des compétences sur les offres scrappées
+
+Compare l'ancienne recherche par sous-chaînes (une passe par compétence) à
+SkillExtractor.extract et à son expression régulière alternée, et liste les
+écarts.
+
+Usage :
+    python -m benchmarks.skill_extraction
+    python -m benchmarks.skill_extraction data/scraped_jobs.json --repeat 200 --json skills.json
+"""
+
+import argparse
+import json
+import time
+from collections import Counter
+from config import SCRAPED_JOBS_FILE, MADAGASCAR_JOBS_FILE
+from src.data_manager import DataManager
+from src.skills import DEFAULT_SKILLS, SkillExtractor
+
+
+def substring_skills(description):
+    """Ancienne extraction : test `in` de chaque compétence sur la description en minuscules"""
+    description_lower = description.lower()
+    return [skill for skill in DEFAULT_SKILLS if skill.lower() in description_lower]
+
+
+def throughput(extract, descriptions, repeat):
+    """Offres/s et Mo/s d'une fonction d'extraction"""
+    size = sum(len(d.encode('utf-8')) for d in descriptions)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for description in descriptions:
+            extract(description)
+    elapsed = time.perf_counter() - start
+    return {
+        'jobs_per_s': repeat * len(descriptions) / elapsed,
+        'mb_per_s': repeat * size / elapsed / 1e6
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('files', nargs='*', default=[str(SCRAPED_JOBS_FILE), str(MADAGASCAR_JOBS_FILE)])
+    parser.add_argument('--repeat', type=int, default=50)
+    parser.add_argument('--json', help='fichier de résultats JSON')
+    args = parser.parse_args()
+
+    descriptions = [
+        job.get('description') or ''
+        for path in args.files
+        for job in DataManager.iter_jobs(path)
+    ]
+    print(f"✓ {len(descriptions)} descriptions")
+
+    start = time.perf_counter()
+    extractor = SkillExtractor()
+    compile_ms = 1000 * (time.perf_counter() - start)
+
+    results = {
+        'n_descriptions': len(descriptions),
+        'compile_ms': compile_ms,
+        'substring': throughput(substring_skills, descriptions, args.repeat),
+        'extract': throughput(extractor.extract, descriptions, args.repeat),
+        'regex': throughput(lambda d: extractor.pattern.findall(d), descriptions, args.repeat)
+    }
+
+    # Écarts entre les deux méthodes (faux positifs de la recherche par sous-chaînes)
+    removed, added = Counter(), Counter()
+    for description in descriptions:
+        old, new = set(substring_skills(description)), set(extractor.extract(description))
+        removed.update(old - new)
+        added.update(new - old)
+    results['removed'] = dict(removed.most_common())
+    results['added'] = dict(added.most_common())
+
+    print(f"\n{'méthode':<10} {'offres/s':>12} {'Mo/s':>8}")
+    for name in ('substring', 'extract', 'regex'):
+        print(f"{name:<10} {results[name]['jobs_per_s']:>12.0f} {results[name]['mb_per_s']:>8.2f}")
+    print(f"\nCompilation: {compile_ms:.2f} ms")
+    print(f"Retirées (faux positifs): {results['removed']}")
+    print(f"Ajoutées (alias): {results['added']}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+        print(f"\n✓ Résultats exportés vers {args.json}")
+
+
+if __name__ == '__main__':
+    main()
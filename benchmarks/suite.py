@@ -0,0 +1,207 @@
+"""Suite de benchmarks des matchers sur des catalogues synthétiques de tailles croissantes
+
+Mesure pour chaque taille : temps de chargement (JSON, NDJSON, store en
+colonnes), entraînement Word2Vec et ajustement TF-IDF, latence par profil
+(calculate_similarity, recommend) et débit de recommend_batch, avec le pic
+de mémoire résidente, ainsi que le temps d'import à froid des modules
+d'entrée (voir benchmarks/cold_start.py). Les résultats JSON portent le
+commit courant et peuvent être comparés à ceux d'un autre commit (--compare).
+
+Usage :
+    python -m benchmarks.suite                                  # 1k et 10k offres
+    python -m benchmarks.suite --sizes 1000 10000 100000 1000000 --json bench.json
+    python -m benchmarks.suite --json new.json --compare bench.json
+    python -m benchmarks.suite --trace-memory                   # pics tracemalloc par étape (plus lent)
+"""
+
+import argparse
+import json
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+import numpy as np
+from benchmarks import cold_start
+from benchmarks.synthetic import Vocabulary, generate_jobs, generate_profiles
+from src.data_manager import DataManager
+from src.embeddings_matcher import EmbeddingsMatcher
+from src.job_store import JobStore
+from src.matcher import SimpleMatcher
+
+# Débits : une baisse est une régression (pour les durées et la mémoire, une hausse)
+HIGHER_IS_BETTER = ('profiles_per_s',)
+
+
+def peak_rss_mb():
+    """Pic de mémoire résidente du processus depuis son démarrage"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Recorder:
+    """Mesure des étapes : durée, pic RSS et (optionnellement) pic tracemalloc"""
+
+    def __init__(self, trace_memory=False):
+        self.trace_memory = trace_memory
+        self.results = []
+
+    def measure(self, size, name, func, **extra):
+        if self.trace_memory:
+            tracemalloc.start()
+        start = time.perf_counter()
+        value = func()
+        elapsed = time.perf_counter() - start
+        result = {'size': size, 'benchmark': name, 'time_s': elapsed, 'peak_rss_mb': peak_rss_mb(), **extra}
+        if self.trace_memory:
+            result['traced_peak_mb'] = tracemalloc.get_traced_memory()[1] / 1e6
+            tracemalloc.stop()
+        self.add(result)
+        return value
+
+    def add(self, result):
+        self.results.append(result)
+        metrics = ', '.join(f"{k}={v:.4g}" for k, v in result.items()
+                            if k not in ('size', 'benchmark') and isinstance(v, (int, float)))
+        print(f"  {result['benchmark']:<28} {metrics}")
+
+
+def latencies(func, profiles):
+    """Latences (ms) d'un appel par profil : médiane et p95"""
+    times = []
+    for profile in profiles:
+        start = time.perf_counter()
+        func(profile)
+        times.append(1000 * (time.perf_counter() - start))
+    return {'p50_ms': float(np.percentile(times, 50)), 'p95_ms': float(np.percentile(times, 95))}
+
+
+def run_cold_start(recorder):
+    print("\n▶ Imports à froid")
+    for result in cold_start.measure():
+        recorder.add({
+            'size': 0,
+            'benchmark': f"import.{result['module']}",
+            'import_s': result['import_s'],
+            'heavy_modules': len(result['heavy_modules'])
+        })
+
+
+def run_size(recorder, vocabulary, size, n_profiles, workdir):
+    print(f"\n▶ {size} offres, {n_profiles} profils")
+    jobs = recorder.measure(size, 'generate', lambda: list(generate_jobs(size, vocabulary)))
+    profiles = generate_profiles(n_profiles, vocabulary)
+
+    # Chargement : JSON complet, NDJSON en flux, store en colonnes
+    json_path, ndjson_path = workdir / f'jobs-{size}.json', workdir / f'jobs-{size}.ndjson'
+    dm = DataManager()
+    dm.jobs = jobs
+    dm.save_jobs(json_path)
+    dm.save_jobs(ndjson_path)
+    recorder.measure(size, 'load_json', lambda: DataManager().load_scraped_jobs(json_path))
+    recorder.measure(size, 'load_ndjson', lambda: sum(1 for _ in DataManager.iter_jobs(ndjson_path)))
+    JobStore.build(jobs, workdir / f'jobs-{size}.store')
+    recorder.measure(size, 'open_job_store', lambda: JobStore(workdir / f'jobs-{size}.store').column('id'))
+
+    dense = EmbeddingsMatcher()
+    recorder.measure(size, 'train_word2vec', lambda: dense.train_model(profiles, jobs))
+    sparse = SimpleMatcher()
+    recorder.measure(size, 'fit_tfidf', lambda: sparse.fit(jobs))
+
+    for name, matcher in (('word2vec', dense), ('tfidf', sparse)):
+        for method in ('calculate_similarity', 'recommend'):
+            func = getattr(matcher, method)
+            recorder.add({
+                'size': size,
+                'benchmark': f'{name}.{method}',
+                **latencies(lambda profile: func(profile, jobs), profiles),
+                'peak_rss_mb': peak_rss_mb()
+            })
+
+        start = time.perf_counter()
+        matcher.recommend_batch(profiles, jobs)
+        elapsed = time.perf_counter() - start
+        recorder.add({
+            'size': size,
+            'benchmark': f'{name}.recommend_batch',
+            'time_s': elapsed,
+            'profiles_per_s': len(profiles) / elapsed,
+            'peak_rss_mb': peak_rss_mb()
+        })
+
+
+def compare(results, baseline_file, threshold):
+    """Affiche les écarts avec un fichier de résultats précédent"""
+    with open(baseline_file, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+    previous = {(r['size'], r['benchmark']): r for r in baseline['results']}
+    print(f"\nComparaison avec {baseline['meta'].get('commit')} (seuil {threshold:.0%})")
+    regressions = 0
+    for result in results:
+        old = previous.get((result['size'], result['benchmark']))
+        if old is None:
+            continue
+        for metric, value in result.items():
+            if metric in ('size', 'benchmark', 'peak_rss_mb') or not old.get(metric):
+                continue
+            ratio = value / old[metric]
+            worse = ratio < 1 - threshold if metric in HIGHER_IS_BETTER else ratio > 1 + threshold
+            regressions += worse
+            flag = '⚠️' if worse else ' '
+            print(f"{flag} {result['size']:>8} {result['benchmark']:<28} {metric:<15} "
+                  f"{old[metric]:>10.4g} → {value:>10.4g} (x{ratio:.2f})")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='*', default=[1000, 10000])
+    parser.add_argument('--profiles', type=int, default=100)
+    parser.add_argument('--trace-memory', action='store_true', help='pics tracemalloc par étape')
+    parser.add_argument('--json', help='fichier de résultats JSON')
+    parser.add_argument('--compare', help='résultats JSON de référence')
+    parser.add_argument('--threshold', type=float, default=0.2, help='écart signalé comme régression')
+    args = parser.parse_args()
+
+    vocabulary = Vocabulary.from_files()
+    recorder = Recorder(args.trace_memory)
+    run_cold_start(recorder)
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in args.sizes:
+            run_size(recorder, vocabulary, size, args.profiles, Path(tmp))
+
+    output = {
+        'meta': {
+            'commit': git_commit(),
+            'created_at': datetime.now().isoformat(),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'machine': platform.machine(),
+            'profiles': args.profiles,
+            'trace_memory': args.trace_memory
+        },
+        'results': recorder.results
+    }
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(output, f, indent=2)
+        print(f"\n✓ Résultats exportés vers {args.json}")
+    if args.compare:
+        regressions = compare(recorder.results, args.compare, args.threshold)
+        sys.exit(1 if regressions else 0)
+
+
+if __name__ == '__main__':
+    main()
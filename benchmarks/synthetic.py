@@ -0,0 +1,154 @@
+"""Générateur de catalogues synthétiques (offres et profils) à partir du vocabulaire Madagascar
+
+Les offres reprennent la distribution des mots des descriptions, des titres,
+des compétences, des localisations et des types de contrat des offres
+réelles; la génération est déterministe pour une graine donnée.
+
+Usage :
+    python -m benchmarks.synthetic --jobs 100000 --out data/synthetic_jobs.ndjson
+    python -m benchmarks.synthetic --jobs 10000 --profiles 1000 --out jobs.json --profiles-out profiles.json
+"""
+
+import argparse
+import json
+import re
+from collections import Counter
+import numpy as np
+from config import MADAGASCAR_JOBS_FILE, MADAGASCAR_PROFILES_FILE
+from src.data_manager import DataManager, is_ndjson
+from src.skills import DEFAULT_SKILLS
+
+WORD_RE = re.compile(r"[^\W\d_][\w'+#.-]*")
+
+# Valeurs absentes du catalogue réel mais utilisées par les profils (Madagascar)
+EXTRA_LOCATIONS = ['Antananarivo', 'Toamasina', 'Remote']
+EXTRA_JOB_TYPES = ['CDI', 'CDD', 'Stage', 'Remote']
+SALARY_STEPS = [None, 500, 1000, 1500, 2000, 3000, 4000, 6000]
+
+
+def _distribution(counter):
+    """Valeurs et fonction de répartition d'un compteur (tirage par searchsorted)"""
+    values = list(counter)
+    cdf = np.cumsum(np.array([counter[v] for v in values], dtype=np.float64))
+    return values, cdf / cdf[-1]
+
+
+class Vocabulary:
+    """Distributions des champs des offres réelles servant à la génération"""
+
+    def __init__(self, jobs, profiles=()):
+        words, title_words, skills = Counter(), Counter(), Counter()
+        locations, job_types = Counter(EXTRA_LOCATIONS), Counter(EXTRA_JOB_TYPES)
+        for job in jobs:
+            words.update(w.lower() for w in WORD_RE.findall(job.get('description') or ''))
+            title_words.update(WORD_RE.findall(job.get('title') or ''))
+            skills.update(job.get('required_skills') or [])
+            locations[job.get('location') or 'Remote'] += 1
+            job_types[job.get('job_type') or 'CDI'] += 1
+        for profile in profiles:
+            skills.update(profile.get('skills', []))
+            locations[profile.get('desired_location') or 'Remote'] += 1
+            job_types.update(profile.get('job_types', []))
+        skills.update({skill: 1 for skill in DEFAULT_SKILLS})
+
+        self.words = _distribution(words)
+        self.title_words = _distribution(title_words)
+        self.skills = _distribution(skills)
+        self.locations = _distribution(locations)
+        self.job_types = _distribution(job_types)
+        self.companies = sorted({job.get('company') or 'Acme' for job in jobs})
+
+    @classmethod
+    def from_files(cls, jobs_file=MADAGASCAR_JOBS_FILE, profiles_file=MADAGASCAR_PROFILES_FILE):
+        dm = DataManager()
+        dm.load_profiles(profiles_file)
+        return cls(list(DataManager.iter_jobs(jobs_file)), dm.profiles)
+
+
+def _sample(rng, distribution, size=None, replace=True):
+    """Tirage pondéré; sans remise, les doublons d'un tirage sont retirés (taille au plus size)"""
+    values, cdf = distribution
+    picks = np.minimum(np.searchsorted(cdf, rng.random(size)), len(values) - 1)
+    if size is None:
+        return values[picks]
+    if not replace:
+        picks = dict.fromkeys(picks.tolist())
+    return [values[i] for i in picks]
+
+
+def _salary_range(rng):
+    low = SALARY_STEPS[rng.integers(len(SALARY_STEPS))]
+    if low is None:
+        return None, None
+    return low, low + int(rng.choice([500, 1000, 2000]))
+
+
+def generate_jobs(n, vocabulary, seed=0, description_words=80):
+    """n offres synthétiques (itérateur, pour ne pas tout garder en mémoire si écrit en flux)"""
+    rng = np.random.default_rng(seed)
+    for i in range(n):
+        skills = _sample(rng, vocabulary.skills, int(rng.integers(2, 7)), replace=False)
+        salary_min, salary_max = _salary_range(rng)
+        description = ' '.join(_sample(rng, vocabulary.words, description_words))
+        yield {
+            'id': f"syn-{seed}-{i}",
+            'title': ' '.join(_sample(rng, vocabulary.title_words, int(rng.integers(2, 5)))),
+            'company': vocabulary.companies[rng.integers(len(vocabulary.companies))],
+            'location': _sample(rng, vocabulary.locations),
+            'description': f"{description} {' '.join(skills)}",
+            'job_type': _sample(rng, vocabulary.job_types),
+            'required_skills': skills,
+            'salary_min': salary_min,
+            'salary_max': salary_max,
+            'url': f"https://example.com/jobs/{seed}-{i}",
+            'source': 'synthetic'
+        }
+
+
+def generate_profiles(n, vocabulary, seed=0):
+    """n profils synthétiques"""
+    rng = np.random.default_rng(seed + 1_000_003)
+    profiles = []
+    for i in range(n):
+        skills = _sample(rng, vocabulary.skills, int(rng.integers(2, 6)), replace=False)
+        salary_min, salary_max = _salary_range(rng)
+        profiles.append({
+            'id': f"syn_user_{i}",
+            'name': f"Profil {i}",
+            'email': f"profil{i}@example.com",
+            'skills': skills,
+            'experience_years': int(rng.integers(0, 15)),
+            'desired_location': _sample(rng, vocabulary.locations),
+            'job_types': _sample(rng, vocabulary.job_types, int(rng.integers(1, 3)), replace=False),
+            'salary_min': salary_min,
+            'salary_max': salary_max,
+            'keywords': ' '.join(_sample(rng, vocabulary.words, 6))
+        })
+    return profiles
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--jobs', type=int, default=10000)
+    parser.add_argument('--profiles', type=int, default=0)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--out', required=True, help='offres (.ndjson écrit en flux, sinon JSON)')
+    parser.add_argument('--profiles-out')
+    args = parser.parse_args()
+
+    vocabulary = Vocabulary.from_files()
+    dm = DataManager()
+    dm.jobs = generate_jobs(args.jobs, vocabulary, args.seed)
+    if not is_ndjson(args.out):
+        dm.jobs = list(dm.jobs)
+    dm.save_jobs(args.out)
+
+    if args.profiles_out:
+        with open(args.profiles_out, 'w', encoding='utf-8') as f:
+            json.dump({'profiles': generate_profiles(args.profiles, vocabulary, args.seed)}, f,
+                      ensure_ascii=False, indent=2)
+        print(f"✓ {args.profiles} profils écrits dans {args.profiles_out}")
+
+
+if __name__ == '__main__':
+    main()
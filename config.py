@@ -19,19 +19,88 @@ MADAGASCAR_JOBS_FILE = DATA_DIR / "madagascar_jobs.json"
 # Configuration du matching
 MIN_MATCH_SCORE = 0.3
 TOP_N_RECOMMENDATIONS = 5
+RANKING_TOLERANCE = 1e-5  # Offres à moins de cet écart du top N re-scorées exactement (classement identique en gemv/gemm)
 
 # Configuration des embeddings
 EMBEDDING_MODEL = "word2vec"
 EMBEDDING_DIM = 300
 MIN_WORD_FREQ = 2
 
+# Configuration de la tokenisation ("regex" ou "nltk") et du cache des tokens
+# "regex" fonctionne hors ligne; "nltk" demande la ressource punkt dans NLTK_DATA_DIR (non fournie)
+TOKENIZER_MODE = "regex"
+TOKEN_CACHE_SIZE = 50000
+TOKEN_CACHE_DIR = None  # ex: MODELS_DIR / "token_cache" pour déborder sur disque
+STOPWORDS_DIR = DATA_DIR / "stopwords"  # Listes NLTK fournies avec le dépôt (aucun téléchargement)
+NLTK_DATA_DIR = DATA_DIR / "nltk_data"  # Ressources NLTK locales (punkt) pour le mode "nltk"
+
+# Configuration du scoring par lots (nombre max de cellules profils x offres par bloc)
+BATCH_MAX_CELLS = 4_000_000
+
+# Configuration de la recherche approximative (index IVF)
+ANN_ENABLED = False
+ANN_N_LISTS = None  # None = racine carrée du nombre d'offres
+ANN_N_PROBE = 8
+ANN_CANDIDATES = 200
+
+# Quantification de l'index d'offres (None, "float16", "int8" ou "pq") : scores approximatifs sur les
+# codes compressés, puis re-classement exact en float32 (vecteurs memory-mapped) des meilleurs candidats
+INDEX_QUANTIZATION = None
+QUANTIZED_CANDIDATES = 100
+PQ_SUBSPACES = 30  # Sous-espaces du product quantization (doit diviser EMBEDDING_DIM)
+
+# Préfiltrage strict par index inversés avant le calcul de similarité
+PREFILTER_ENABLED = False
+PREFILTER_FIELDS = ("location", "job_type")  # Parmi "location", "job_type", "salary"
+
+# Moteurs de recommandation sélectionnables par requête
+RECOMMENDATION_ENGINES = ("word2vec", "tfidf", "hybrid")
+DEFAULT_ENGINE = "word2vec"
+
+# Moteur hybride : fusion "weighted" (somme pondérée) ou "rrf" (reciprocal rank fusion)
+HYBRID_FUSION = "weighted"
+HYBRID_SPARSE_WEIGHT = 0.3  # Poids du score TF-IDF dans la somme pondérée
+HYBRID_RRF_K = 60
+HYBRID_CANDIDATES = 100  # Candidats retenus par chaque index
+
+# Store des offres en colonnes memory-mapped (partagé entre les processus)
+JOB_STORE_ENABLED = False
+JOB_STORE_DIR = None  # None = à côté du fichier d'offres, extension .store
+
+# Ingestion incrémentale : ré-entraînement complet au-delà de cette proportion de tokens inconnus
+VOCAB_DRIFT_THRESHOLD = 0.15
+
+# Quasi-doublons (même offre publiée sous plusieurs ids) : MinHash + LSH sur titre/entreprise/description
+DEDUP_ENABLED = True
+DEDUP_THRESHOLD = 0.8  # Similarité de Jaccard estimée à partir de laquelle deux offres sont des doublons
+DEDUP_BANDS = 20  # Bandes LSH x lignes par bande = taille des signatures
+DEDUP_ROWS = 6
+DEDUP_SHINGLE_SIZE = 3  # Mots par n-gramme
+DEDUP_INDEX_FILE = DATA_DIR / "dedup_index.npz"  # Signatures des offres déjà vues (scraper)
+
 # Configuration RapidAPI
 RAPIDAPI_KEY = os.getenv('RAPIDAPI_KEY')
 RAPIDAPI_HOST = os.getenv('RAPIDAPI_HOST', 'jsearch.p.rapidapi.com')
 
+# Configuration du scraping
+SKILLS_FILE = None  # Dictionnaire JSON de compétences/alias (None = dictionnaire intégré de src/skills.py)
+SCRAPER_MAX_WORKERS = 8
+SCRAPER_RATE_LIMIT = 5  # Requêtes par seconde
+SCRAPER_MAX_RETRIES = 5
+SCRAPER_BACKOFF_BASE = 1.0  # Secondes
+SCRAPER_BACKOFF_MAX = 60.0
+
 # Configuration Flask
 SECRET_KEY = os.getenv('SECRET_KEY', 'dev-secret-key-change-in-production')
 DEBUG = True
+ADMIN_TOKEN = os.getenv('ADMIN_TOKEN')  # En-tête X-Admin-Token des actions d'administration (désactivées si absent)
+RELOAD_WATCH_INTERVAL = 30  # Secondes entre deux vérifications des fichiers de données (0 = désactivé)
+MODEL_LAZY_LOAD = True  # Web : modèle (gensim, sklearn) chargé à la première recommandation, pas au démarrage
+METRICS_ENABLED = True  # Chronomètres par étape et endpoint /metrics (format Prometheus)
+RESPONSE_CACHE_BACKEND = "memory"  # "memory" (LRU du processus), "redis" ou None (désactivé)
+RESPONSE_CACHE_TTL = 300  # Secondes
+RESPONSE_CACHE_MAX_ENTRIES = 1024
+RESPONSE_CACHE_REDIS_URL = os.getenv('REDIS_URL', 'redis://localhost:6379/0')
 
 # Configuration Email
 MAIL_SERVER = os.getenv('MAIL_SERVER', 'smtp.gmail.com')
@@ -40,7 +109,16 @@ MAIL_USE_TLS = os.getenv('MAIL_USE_TLS', True)
 MAIL_USERNAME = os.getenv('MAIL_USERNAME')
 MAIL_PASSWORD = os.getenv('MAIL_PASSWORD')
 MAIL_DEFAULT_SENDER = os.getenv('MAIL_DEFAULT_SENDER', 'no-reply@job-recommendation.com')
+MAIL_BULK_WORKERS = 4  # Connexions SMTP ouvertes en parallèle pour l'envoi groupé
+MAIL_MAX_RETRIES = 3
+MAIL_BACKOFF_BASE = 0.5  # Secondes
+MAIL_BACKOFF_MAX = 30.0
 
 # Configuration Scheduler
 SCHEDULER_ENABLED = True
-SCHEDULER_TIME = "08:00"  # Heure quotidienne pour envoyer les emails (8h du matin)
\ No newline at end of file
+SCHEDULER_TIME = "08:00"  # Heure quotidienne pour envoyer les emails (8h du matin)
+PIPELINE_DIR = DATA_DIR / "pipeline"  # Points de reprise de la tâche quotidienne (un dossier par exécution)
+PIPELINE_SHARD_SIZE = 500  # Profils par shard
+PIPELINE_WORKERS = None  # Processus de scoring/rendu (None = nombre de cœurs)
+RECOMMENDATION_CACHE_ENABLED = True  # Ne rescorer que les profils/offres modifiés, n'envoyer que les nouvelles offres
+RECOMMENDATION_CACHE_FILE = DATA_DIR / "recommendation_cache.json"
\ No newline at end of file
@@ -0,0 +1,169 @@
+# Index de recherche approximative des plus proches voisins (IVF)
+
+import time
+import numpy as np
+from config import ANN_N_LISTS, ANN_N_PROBE
+from src.job_index import normalize_rows, top_n_indices
+
+# Nombre de vecteurs traités par bloc lors des affectations k-means
+ASSIGN_CHUNK_SIZE = 65536
+
+
+def _assign(vectors, centroids):
+    """Affecte chaque vecteur au centroïde le plus proche (produit scalaire)"""
+    labels = np.empty(len(vectors), dtype=np.int32)
+    for start in range(0, len(vectors), ASSIGN_CHUNK_SIZE):
+        block = vectors[start:start + ASSIGN_CHUNK_SIZE] @ centroids.T
+        labels[start:start + ASSIGN_CHUNK_SIZE] = np.argmax(block, axis=1)
+    return labels
+
+
+def spherical_kmeans(vectors, n_clusters, n_iter=20, seed=0):
+    """K-means sphérique (vecteurs et centroïdes normalisés) en NumPy"""
+    rng = np.random.default_rng(seed)
+    n_clusters = min(n_clusters, len(vectors))
+    centroids = vectors[rng.choice(len(vectors), n_clusters, replace=False)].copy()
+
+    for _ in range(n_iter):
+        labels = _assign(vectors, centroids)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, labels, vectors)
+        counts = np.bincount(labels, minlength=n_clusters)
+
+        # Réinitialiser les clusters vides sur des vecteurs aléatoires
+        empty = np.flatnonzero(counts == 0)
+        if len(empty):
+            sums[empty] = vectors[rng.choice(len(vectors), len(empty), replace=False)]
+
+        new_centroids = normalize_rows(sums)
+        if np.allclose(new_centroids, centroids, atol=1e-6):
+            centroids = new_centroids
+            break
+        centroids = new_centroids
+
+    return centroids, _assign(vectors, centroids)
+
+
+class IVFIndex:
+    """Index IVF : les offres sont réparties en listes par k-means, la recherche
+    ne parcourt que les n_probe listes dont le centroïde est le plus proche"""
+
+    def __init__(self, n_lists=ANN_N_LISTS, n_probe=ANN_N_PROBE, seed=0):
+        self.n_lists = n_lists
+        self.n_probe = n_probe
+        self.seed = seed
+        self.vectors = None
+        self.centroids = None
+        self.list_offsets = None
+        self.list_ids = None
+
+    def __len__(self):
+        return 0 if self.list_ids is None else len(self.list_ids)
+
+    def build(self, vectors, n_iter=20):
+        """Construit l'index à partir des vecteurs normalisés de l'index exact"""
+        self.vectors = vectors
+        n_lists = self.n_lists or max(1, int(np.sqrt(len(vectors))))
+        self.centroids, labels = spherical_kmeans(vectors, n_lists, n_iter, self.seed)
+        self._set_lists(labels)
+        return self
+
+    def _set_lists(self, labels):
+        # Listes inversées au format CSR : ids triés par liste + offsets
+        self.list_ids = np.argsort(labels, kind='stable').astype(np.int64)
+        counts = np.bincount(labels, minlength=len(self.centroids))
+        self.list_offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+
+    def labels(self):
+        """Liste d'affectation de chaque offre"""
+        labels = np.empty(len(self.list_ids), dtype=np.int32)
+        labels[self.list_ids] = np.repeat(np.arange(len(self.centroids)), np.diff(self.list_offsets))
+        return labels
+
+    def extended(self, vectors):
+        """Nouvel index couvrant vectors, dont les premières lignes sont déjà indexées
+
+        Les nouvelles offres sont affectées aux centroïdes existants (sans
+        ré-entraîner le k-means); l'index courant n'est pas modifié.
+        """
+        n = len(self.list_ids)
+        new_labels = _assign(vectors[n:], self.centroids)
+
+        index = IVFIndex(n_lists=self.n_lists, n_probe=self.n_probe, seed=self.seed)
+        index.vectors = vectors
+        index.centroids = self.centroids
+        index._set_lists(np.concatenate([self.labels(), new_labels]))
+        return index
+
+    def candidates(self, query_vector, n_probe=None):
+        """Ids des offres contenues dans les listes les plus proches de la requête"""
+        n_probe = min(n_probe or self.n_probe, len(self.centroids))
+        probes = top_n_indices(self.centroids @ query_vector, n_probe)
+        ids = [self.list_ids[self.list_offsets[p]:self.list_offsets[p + 1]] for p in probes]
+        return np.sort(np.concatenate(ids)) if ids else np.array([], dtype=np.int64)
+
+    def search(self, query_vector, k, n_probe=None):
+        """Retourne (ids, scores) des k offres approximativement les plus proches"""
+        query = np.asarray(query_vector, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if norm == 0 or self.list_ids is None:
+            return np.array([], dtype=np.int64), np.array([], dtype=np.float32)
+        query = query / norm
+
+        ids = self.candidates(query, n_probe)
+        scores = self.vectors[ids] @ query
+        best = top_n_indices(scores, k)
+        return ids[best], scores[best]
+
+    def save(self, path):
+        """Sauvegarde l'index (sans les vecteurs, déjà stockés avec le modèle)"""
+        np.savez(
+            path,
+            centroids=self.centroids,
+            list_ids=self.list_ids,
+            list_offsets=self.list_offsets,
+            params=np.array([self.n_lists or 0, self.n_probe, self.seed], dtype=np.int64)
+        )
+
+    @classmethod
+    def load(cls, path, vectors):
+        """Charge un index sauvegardé et le rattache aux vecteurs de l'index exact"""
+        with np.load(path) as data:
+            n_lists, n_probe, seed = (int(v) for v in data['params'])
+            index = cls(n_lists=n_lists or None, n_probe=n_probe, seed=seed)
+            index.centroids = data['centroids']
+            index.list_ids = data['list_ids']
+            index.list_offsets = data['list_offsets']
+        if len(index.list_ids) != len(vectors):
+            raise ValueError("L'index ANN ne correspond pas au catalogue d'offres")
+        index.vectors = vectors
+        return index
+
+
+def evaluate_recall(index, vectors, queries, k, n_probe=None):
+    """Compare la recherche ANN à la recherche exacte : recall@k et latences moyennes"""
+    queries = normalize_rows(queries)
+    recalls = []
+    exact_time = 0.0
+    ann_time = 0.0
+
+    for query in queries:
+        start = time.perf_counter()
+        exact = set(top_n_indices(vectors @ query, k).tolist())
+        exact_time += time.perf_counter() - start
+
+        start = time.perf_counter()
+        approx, _ = index.search(query, k, n_probe)
+        ann_time += time.perf_counter() - start
+
+        recalls.append(len(exact & set(approx.tolist())) / max(1, len(exact)))
+
+    n = max(1, len(queries))
+    return {
+        'k': k,
+        'n_lists': len(index.centroids),
+        'n_probe': min(n_probe or index.n_probe, len(index.centroids)),
+        'recall': float(np.mean(recalls)) if recalls else 0.0,
+        'exact_ms': 1000 * exact_time / n,
+        'ann_ms': 1000 * ann_time / n
+    }
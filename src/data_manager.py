@@ -1,17 +1,80 @@
 # Gestion des données
 
+import argparse
 import json
-import pandas as pd
+import os
 from pathlib import Path
-from config import SAMPLE_PROFILES_FILE, SAMPLE_JOBS_FILE, SCRAPED_JOBS_FILE
+from config import SAMPLE_PROFILES_FILE, SAMPLE_JOBS_FILE, SCRAPED_JOBS_FILE, JOB_STORE_DIR, DEDUP_ENABLED
+from src.dedup import unique_jobs
+from src.job_store import JobStore
+from src.metrics import metrics
+
+# Extensions des fichiers d'offres au format NDJSON (une offre JSON par ligne)
+NDJSON_SUFFIXES = ('.ndjson', '.jsonl')
+
+# Champs d'une offre conservés en mémoire par les matchers (sans la description)
+JOB_RECORD_FIELDS = ('id', 'title', 'company', 'location', 'job_type', 'salary_min', 'salary_max', 'url')
+
+
+def is_ndjson(file_path):
+    """Indique si un fichier d'offres est au format NDJSON"""
+    return Path(file_path).suffix.lower() in NDJSON_SUFFIXES
+
+
+def compact_job(job):
+    """Offre réduite aux champs utiles pour les recommandations"""
+    return {field: job[field] for field in JOB_RECORD_FIELDS if field in job}
+
+
+# Types attendus des champs d'une offre reçue de l'extérieur (None accepté pour les champs optionnels)
+JOB_REQUIRED_FIELDS = {'id': (str, int), 'title': str, 'company': str, 'location': str}
+JOB_OPTIONAL_FIELDS = {
+    'description': str, 'job_type': str, 'required_skills': list, 'url': str, 'posted_date': str,
+    'salary_min': (int, float), 'salary_max': (int, float)
+}
+
+
+def validate_jobs(jobs, max_errors=10):
+    """Vérifie un lot d'offres reçu de l'extérieur et le retourne sous forme de liste
+
+    Lève ValueError (avec les premières erreurs) si une offre n'est pas un
+    objet, s'il lui manque un champ obligatoire ou si un champ a un mauvais type :
+    le lot est refusé en entier, rien n'est ajouté.
+    """
+    if not isinstance(jobs, list):
+        raise ValueError("Les offres doivent être une liste d'objets")
+    errors = []
+    for i, job in enumerate(jobs):
+        if not isinstance(job, dict):
+            errors.append(f"offre {i}: objet attendu")
+            continue
+        for field, kind in JOB_REQUIRED_FIELDS.items():
+            value = job.get(field)
+            if value is None or value == '' or isinstance(value, bool) or not isinstance(value, kind):
+                errors.append(f"offre {i}: champ '{field}' manquant ou invalide")
+        for field, kind in JOB_OPTIONAL_FIELDS.items():
+            value = job.get(field)
+            if value is not None and (isinstance(value, bool) or not isinstance(value, kind)):
+                errors.append(f"offre {i}: champ '{field}' invalide")
+        if isinstance(job.get('required_skills'), list) and not all(
+                isinstance(skill, str) for skill in job['required_skills']):
+            errors.append(f"offre {i}: champ 'required_skills' invalide")
+    if errors:
+        more = f" (+{len(errors) - max_errors} autres)" if len(errors) > max_errors else ''
+        raise ValueError("Offres invalides: " + '; '.join(errors[:max_errors]) + more)
+    return jobs
+
 
 class DataManager:
     """Gestionnaire de données pour profils et offres d'emploi"""
     
-    def __init__(self):
+    def __init__(self, dedup=DEDUP_ENABLED):
         self.profiles = []
         self.jobs = []
+        # Quasi-doublons (même offre sous plusieurs ids) retirés au chargement des offres
+        self.dedup = dedup
     
+    @metrics.timed("load")
     def load_profiles(self, file_path=SAMPLE_PROFILES_FILE):
         """Charge les profils utilisateur depuis un JSON"""
         try:
@@ -24,12 +87,34 @@ class DataManager:
             print(f"✗ Fichier non trouvé: {file_path}")
             return []
     
+    @staticmethod
+    def iter_jobs(file_path):
+        """Parcourt les offres d'un fichier sans tout charger (NDJSON) ou depuis un JSON {"jobs": [...]}"""
+        if not is_ndjson(file_path):
+            with open(file_path, 'r', encoding='utf-8') as f:
+                yield from json.load(f).get('jobs', [])
+            return
+        
+        with open(file_path, 'r', encoding='utf-8') as f:
+            for line_number, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    # Ligne tronquée (écriture interrompue) : ignorée
+                    print(f"⚠️  Ligne {line_number} invalide ignorée: {file_path}")
+    
+    @metrics.timed("load")
     def load_jobs(self, file_path=SAMPLE_JOBS_FILE):
-        """Charge les offres d'emploi depuis un JSON"""
+        """Charge les offres d'emploi depuis un JSON ou un NDJSON"""
+        if is_ndjson(file_path):
+            return self._load_jobs_ndjson(file_path, "offres chargées")
         try:
             with open(file_path, 'r', encoding='utf-8') as f:
                 data = json.load(f)
-            self.jobs = data.get('jobs', [])
+            self.jobs = list(unique_jobs(data.get('jobs', []), self.dedup))
             print(f"✓ {len(self.jobs)} offres chargées")
             return self.jobs
         except FileNotFoundError:
@@ -42,10 +127,14 @@ class DataManager:
     
     def get_all_profiles_df(self):
         """Retourne tous les profils sous forme de DataFrame pandas"""
+        import pandas as pd
         return pd.DataFrame(self.profiles)
     
     def get_all_jobs_df(self):
-        """Retourne toutes les offres sous forme de DataFrame pandas"""
+        """Retourne toutes les offres sous forme de DataFrame pandas (colonnes numériques sans copie depuis un JobStore)"""
+        if isinstance(self.jobs, JobStore):
+            return self.jobs.to_dataframe()
+        import pandas as pd
         return pd.DataFrame(self.jobs)
     
     def save_profiles(self, file_path=SAMPLE_PROFILES_FILE):
@@ -55,19 +144,122 @@ class DataManager:
         print(f"✓ Profils sauvegardés")
     
     def save_jobs(self, file_path=SAMPLE_JOBS_FILE):
-        """Sauvegarde les offres en JSON"""
+        """Sauvegarde les offres en JSON (ou en NDJSON selon l'extension)"""
         with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump({'jobs': self.jobs}, f, ensure_ascii=False, indent=2)
+            if is_ndjson(file_path):
+                self._write_ndjson(f, self.jobs)
+            else:
+                json.dump({'jobs': self.jobs}, f, ensure_ascii=False, indent=2)
         print(f"✓ Offres sauvegardées")
+    
+    @staticmethod
+    def _write_ndjson(f, jobs):
+        count = 0
+        for job in jobs:
+            f.write(json.dumps(job, ensure_ascii=False))
+            f.write('\n')
+            count += 1
+        return count
+    
+    @staticmethod
+    def append_jobs(jobs, file_path):
+        """Ajoute des offres en fin de catalogue sans perdre les offres existantes
+        
+        NDJSON : ajout en fin de fichier, sans réécrire le catalogue. JSON : le
+        fichier brut (quasi-doublons compris, ils ne sont retirés qu'à la
+        lecture) est relu puis réécrit de façon atomique avec les offres ajoutées.
+        """
+        if not is_ndjson(file_path):
+            return DataManager._append_jobs_json(jobs, file_path)
+        # Terminer une éventuelle ligne tronquée avant d'ajouter
+        needs_newline = False
+        if Path(file_path).exists():
+            with open(file_path, 'rb') as f:
+                if f.seek(0, 2) > 0:
+                    f.seek(-1, 2)
+                    needs_newline = f.read(1) != b'\n'
+        
+        with open(file_path, 'a', encoding='utf-8') as f:
+            if needs_newline:
+                f.write('\n')
+            count = DataManager._write_ndjson(f, jobs)
+        print(f"✓ {count} offres ajoutées à {file_path}")
+        return count
+    
+    @staticmethod
+    def _append_jobs_json(jobs, file_path):
+        path = Path(file_path)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            data = {}
+        jobs = list(jobs)
+        data['jobs'] = data.get('jobs', []) + jobs
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, path)
+        print(f"✓ {len(jobs)} offres ajoutées à {file_path}")
+        return len(jobs)
+    
+    @staticmethod
+    def convert_to_ndjson(json_path, ndjson_path=None):
+        """Convertit un fichier {"jobs": [...]} en NDJSON (même nom, extension .ndjson par défaut)"""
+        ndjson_path = Path(ndjson_path or Path(json_path).with_suffix('.ndjson'))
+        tmp_path = ndjson_path.with_name(ndjson_path.name + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            count = DataManager._write_ndjson(f, DataManager.iter_jobs(json_path))
+        tmp_path.replace(ndjson_path)
+        print(f"✓ {count} offres converties: {ndjson_path}")
+        return ndjson_path
+    
+    @metrics.timed("load")
+    def load_job_store(self, file_path=SCRAPED_JOBS_FILE, directory=JOB_STORE_DIR):
+        """Charge les offres depuis le store en colonnes memory-mapped
         
+        Le store est (re)construit depuis file_path (JSON ou NDJSON) s'il est
+        absent ou si le fichier a changé depuis sa construction.
+        """
+        directory = Path(directory or Path(file_path).with_suffix('.store'))
+        try:
+            if JobStore.is_stale(directory, file_path):
+                JobStore.build(unique_jobs(self.iter_jobs(file_path), self.dedup), directory, source=file_path)
+        except FileNotFoundError:
+            print(f"✗ Fichier non trouvé: {file_path}")
+            return []
+        self.jobs = JobStore(directory)
+        print(f"✓ {len(self.jobs)} offres chargées (store memory-mapped)")
+        return self.jobs
+    
+    def _load_jobs_ndjson(self, file_path, label):
+        try:
+            self.jobs = list(unique_jobs(self.iter_jobs(file_path), self.dedup))
+        except FileNotFoundError:
+            print(f"✗ Fichier non trouvé: {file_path}")
+            return []
+        print(f"✓ {len(self.jobs)} {label}")
+        return self.jobs
+        
+    @metrics.timed("load")
     def load_scraped_jobs(self, file_path=SCRAPED_JOBS_FILE):
-        """Charge les offres d'emploi scrappées depuis un JSON"""
+        """Charge les offres d'emploi scrappées depuis un JSON ou un NDJSON"""
+        if is_ndjson(file_path):
+            return self._load_jobs_ndjson(file_path, "offres scrappées chargées")
         try:
             with open(file_path, 'r', encoding='utf-8') as f:
                 data = json.load(f)
-            self.jobs = data.get('jobs', [])
+            self.jobs = list(unique_jobs(data.get('jobs', []), self.dedup))
             print(f"✓ {len(self.jobs)} offres scrappées chargées")
             return self.jobs
         except FileNotFoundError:
             print(f"⚠️  Aucune offre scrappée trouvée. Lancez d'abord le scraper.")
-            return []
\ No newline at end of file
+            return []
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Conversion des fichiers d'offres JSON en NDJSON")
+    parser.add_argument('json_file', help='Fichier {"jobs": [...]} à convertir')
+    parser.add_argument('ndjson_file', nargs='?', help='Fichier de sortie (défaut: même nom en .ndjson)')
+    args = parser.parse_args()
+    DataManager.convert_to_ndjson(args.json_file, args.ndjson_file)
@@ -0,0 +1,217 @@
+# Détection des offres quasi-identiques (MinHash + LSH) publiées sous des ids différents
+
+import argparse
+import os
+import re
+import zlib
+from pathlib import Path
+import numpy as np
+from config import (
+    DEDUP_ENABLED, DEDUP_THRESHOLD, DEDUP_BANDS, DEDUP_ROWS, DEDUP_SHINGLE_SIZE, DEDUP_INDEX_FILE
+)
+
+WORD_RE = re.compile(r"\w+")
+
+_SHINGLE_MULTIPLIER = np.uint64(1_000_003)
+
+
+def job_shingles(job, size=DEDUP_SHINGLE_SIZE):
+    """Empreintes 32 bits distinctes des n-grammes de mots du titre, de l'entreprise et de la description
+
+    Les mots sont hachés un par un (crc32) puis combinés par numpy : pas de
+    chaîne construite par n-gramme.
+    """
+    text = ' '.join(job.get(field) or '' for field in ('title', 'company', 'description'))
+    words = WORD_RE.findall(text.lower())
+    if not words:
+        return np.empty(0, dtype=np.uint64)
+    hashes = np.fromiter((zlib.crc32(word.encode('utf-8')) for word in words), dtype=np.uint64, count=len(words))
+    n = max(1, len(words) - size + 1)
+    combined = np.zeros(n, dtype=np.uint64)
+    for offset in range(min(size, len(words))):
+        combined = combined * _SHINGLE_MULTIPLIER + hashes[offset:offset + n]  # modulo 2**64
+    return np.unique((combined ^ (combined >> np.uint64(32))) & np.uint64(0xFFFFFFFF))
+
+
+class MinHashLSH:
+    """Signatures MinHash des offres et index LSH par bandes
+
+    Une offre n'est comparée qu'aux offres partageant au moins une bande de
+    signature (candidats), puis retenue comme doublon si la similarité de
+    Jaccard estimée atteint le seuil.
+    """
+
+    def __init__(self, threshold=DEDUP_THRESHOLD, bands=DEDUP_BANDS, rows=DEDUP_ROWS,
+                 shingle_size=DEDUP_SHINGLE_SIZE, seed=1):
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = rows
+        self.shingle_size = shingle_size
+        self.seed = seed
+        # Permutations par hachage multiplicatif : (a * x + b) mod 2**64, 32 bits de poids fort
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(0, 1 << 63, bands * rows, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+        self._b = rng.integers(0, 1 << 63, bands * rows, dtype=np.uint64)
+        self.ids = []
+        self._positions = {}
+        self._signatures = np.empty((0, bands * rows), dtype=np.uint32)
+        self._size = 0
+        self._buckets = [{} for _ in range(bands)]
+        # id du doublon -> id de l'offre conservée
+        self.duplicates = {}
+
+    @property
+    def params(self):
+        return {'threshold': self.threshold, 'bands': self.bands, 'rows': self.rows,
+                'shingle_size': self.shingle_size, 'seed': self.seed}
+
+    def __len__(self):
+        return self._size
+
+    def __contains__(self, job_id):
+        return str(job_id) in self._positions
+
+    def signature(self, job):
+        """Signature MinHash d'une offre (None si elle n'a aucun texte)"""
+        shingles = job_shingles(job, self.shingle_size)
+        if not len(shingles):
+            return None
+        permuted = (np.outer(shingles, self._a) + self._b) >> np.uint64(32)
+        return permuted.min(axis=0).astype(np.uint32)
+
+    def get(self, job_id):
+        """Signature enregistrée d'une offre, ou None"""
+        position = self._positions.get(str(job_id))
+        return self._signatures[position] if position is not None else None
+
+    def _band_keys(self, signature):
+        for band in range(self.bands):
+            yield band, signature[band * self.rows:(band + 1) * self.rows].tobytes()
+
+    def query(self, signature):
+        """(id, similarité estimée) de l'offre indexée la plus proche au-delà du seuil, ou None"""
+        candidates = set()
+        for band, key in self._band_keys(signature):
+            candidates.update(self._buckets[band].get(key, ()))
+        if not candidates:
+            return None
+        positions = np.fromiter(candidates, dtype=np.int64, count=len(candidates))
+        similarities = (self._signatures[positions] == signature).mean(axis=1)
+        best = int(np.argmax(similarities))
+        if similarities[best] < self.threshold:
+            return None
+        return self.ids[positions[best]], float(similarities[best])
+
+    def add(self, job_id, signature):
+        """Indexe la signature d'une offre"""
+        job_id = str(job_id)
+        position = self._size
+        if position == len(self._signatures):
+            # Capacité doublée : ajouts en O(1) amorti
+            grown = np.empty((max(64, 2 * position), self._signatures.shape[1]), dtype=np.uint32)
+            grown[:position] = self._signatures[:position]
+            self._signatures = grown
+        self._signatures[position] = signature
+        self._size += 1
+        self.ids.append(job_id)
+        self._positions[job_id] = position
+        for band, key in self._band_keys(signature):
+            self._buckets[band].setdefault(key, []).append(position)
+
+    def unique(self, jobs, signatures=None):
+        """Offres sans les quasi-doublons (la première occurrence est conservée), en flux
+
+        Une offre dont l'id est déjà indexé est conservée telle quelle.
+        signatures : index dont les signatures déjà calculées sont réutilisées (par id).
+        """
+        for job in jobs:
+            job_id = job.get('id')
+            if job_id in self:
+                yield job
+                continue
+            signature = signatures.get(job_id) if signatures is not None else None
+            if signature is None:
+                signature = self.signature(job)
+            if signature is None:
+                yield job
+                continue
+            match = self.query(signature)
+            if match is not None:
+                self.duplicates[str(job_id)] = match[0]
+                continue
+            self.add(job_id, signature)
+            yield job
+
+    def save(self, path=DEDUP_INDEX_FILE):
+        """Enregistre ids, signatures et paramètres (écriture atomique)"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + '.tmp')
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, ids=np.array(self.ids, dtype=str), signatures=self._signatures[:self._size],
+                     params=np.array([self.params[name] for name in sorted(self.params)], dtype=np.float64))
+        os.replace(tmp_path, path)
+        return path
+
+    @classmethod
+    def load(cls, path=DEDUP_INDEX_FILE, **params):
+        """Index enregistré (buckets reconstruits); vide si absent ou construit avec d'autres paramètres"""
+        index = cls(**params)
+        try:
+            with np.load(path) as data:
+                saved = list(data['params'])
+                ids, signatures = data['ids'].tolist(), data['signatures']
+        except FileNotFoundError:
+            return index
+        if saved != [float(index.params[name]) for name in sorted(index.params)]:
+            print(f"⚠️  Index de signatures construit avec d'autres paramètres, ignoré: {path}")
+            return index
+        for job_id, signature in zip(ids, signatures):
+            index.add(job_id, signature)
+        return index
+
+
+_signature_cache = {}
+
+
+def cached_signatures(path=DEDUP_INDEX_FILE):
+    """Index persistant du processus (signatures réutilisées au chargement), None s'il n'existe pas"""
+    path = Path(path)
+    try:
+        mtime = path.stat().st_mtime_ns
+    except FileNotFoundError:
+        return None
+    cached = _signature_cache.get(path)
+    if cached is None or cached[0] != mtime:
+        _signature_cache[path] = cached = (mtime, MinHashLSH.load(path))
+    return cached[1]
+
+
+def unique_jobs(jobs, enabled=DEDUP_ENABLED, index_file=DEDUP_INDEX_FILE):
+    """Offres d'un catalogue sans quasi-doublons (entre elles), en flux
+
+    Les signatures de l'index persistant sont réutilisées quand elles existent.
+    """
+    if not enabled:
+        return iter(jobs)
+    return MinHashLSH().unique(jobs, signatures=cached_signatures(index_file))
+
+
+def main():
+    from src.data_manager import DataManager
+
+    parser = argparse.ArgumentParser(description="Index persistant des signatures MinHash d'un catalogue")
+    parser.add_argument('jobs_file', help="Fichier d'offres (JSON ou NDJSON)")
+    parser.add_argument('--index', default=str(DEDUP_INDEX_FILE))
+    args = parser.parse_args()
+
+    index = MinHashLSH.load(args.index)
+    before = len(index)
+    kept = sum(1 for _ in index.unique(DataManager.iter_jobs(args.jobs_file)))
+    index.save(args.index)
+    print(f"✓ {kept} offres uniques, {len(index.duplicates)} quasi-doublons, "
+          f"{len(index) - before} signatures ajoutées ({len(index)} au total)")
+
+
+if __name__ == "__main__":
+    main()
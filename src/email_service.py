@@ -1,9 +1,78 @@
+import queue
+import random
+import smtplib
+import time
+from concurrent.futures import ThreadPoolExecutor
+from flask import current_app
 from flask_mail import Mail, Message
-from config import MAIL_DEFAULT_SENDER
+from jinja2 import Environment, FileSystemLoader, select_autoescape
+from config import (
+    BASE_DIR, MAIL_DEFAULT_SENDER, MAIL_BULK_WORKERS, MAIL_MAX_RETRIES, MAIL_BACKOFF_BASE, MAIL_BACKOFF_MAX
+)
 from datetime import datetime
+from src.metrics import metrics, emails_total
 
 mail = Mail()
 
+EMAIL_TEMPLATES_DIR = BASE_DIR / "templates" / "email"
+
+_templates = None
+
+
+def _email_templates():
+    """Templates HTML et texte des emails, compilés au premier appel puis réutilisés"""
+    global _templates
+    if _templates is None:
+        env = Environment(
+            loader=FileSystemLoader(str(EMAIL_TEMPLATES_DIR)),
+            autoescape=select_autoescape(['html']),
+            keep_trailing_newline=True
+        )
+        env.filters['percent'] = lambda value: f"{value:.1%}"
+        _templates = {
+            'html': env.get_template('recommendations.html'),
+            'text': env.get_template('recommendations.txt')
+        }
+    return _templates
+
+
+def is_transient_error(error):
+    """Erreur SMTP temporaire (connexion perdue, code 4xx) qui justifie une nouvelle tentative
+
+    SMTPException hérite d'OSError : les erreurs SMTP sont classées avant les
+    erreurs réseau, les autres (ex: SMTPNotSupportedError) sont définitives.
+    """
+    if isinstance(error, (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError)):
+        return True
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return all(400 <= code < 500 for code, _ in error.recipients.values())
+    if isinstance(error, smtplib.SMTPResponseException):
+        return 400 <= error.smtp_code < 500
+    if isinstance(error, smtplib.SMTPException):
+        return False
+    return isinstance(error, OSError)
+
+
+class SMTPWorker:
+    """Connexion SMTP persistante d'un worker, rouverte après une erreur"""
+
+    def __init__(self):
+        self.connection = None
+
+    def send(self, msg):
+        if self.connection is None:
+            self.connection = mail.connect().__enter__()
+        self.connection.send(msg)
+
+    def close(self):
+        """Ferme la connexion (sans erreur si le serveur l'a déjà coupée)"""
+        if self.connection is not None and self.connection.host:
+            try:
+                self.connection.host.quit()
+            except (smtplib.SMTPException, OSError):
+                self.connection.host.close()
+        self.connection = None
+
 class EmailService:
     """Service d'envoi d'emails avec recommandations"""
     
@@ -19,15 +88,8 @@ class EmailService:
         if not recommendations:
             return False
         
-        # Construire le contenu HTML
-        html_body = EmailService._build_email_html(profile_name, recommendations)
-        
         try:
-            msg = Message(
-                subject=f"Vos recommandations d'emploi - {datetime.now().strftime('%d/%m/%Y')}",
-                recipients=[profile_email],
-                html=html_body
-            )
+            msg = EmailService._build_message(profile_name, profile_email, recommendations)
             mail.send(msg)
             return True
         except Exception as e:
@@ -35,64 +97,133 @@ class EmailService:
             return False
     
     @staticmethod
-    def _build_email_html(profile_name, recommendations):
-        """Construit le contenu HTML de l'email"""
+    @metrics.timed("render")
+    def _build_message(profile_name, profile_email, recommendations, sent_at=None):
+        """Construit le message de recommandations d'un profil (HTML et texte)"""
+        sent_at = sent_at or datetime.now()
+        return Message(
+            subject=EmailService._build_subject(sent_at),
+            recipients=[profile_email],
+            html=EmailService._build_email_html(profile_name, recommendations, sent_at),
+            body=EmailService._build_email_text(profile_name, recommendations, sent_at)
+        )
+    
+    @staticmethod
+    def _build_subject(sent_at):
+        return f"Vos recommandations d'emploi - {sent_at.strftime('%d/%m/%Y')}"
+    
+    @staticmethod
+    def render_messages(recipients, sent_at=None):
+        """Construit en lot les messages d'une liste de (nom, email, recommandations)
+        
+        Retourne pour chaque destinataire le message, ou l'erreur de rendu
+        (None sans recommandations). Nécessite un contexte d'application Flask.
+        """
+        sent_at = sent_at or datetime.now()
+        messages = []
+        for profile_name, profile_email, recommendations in recipients:
+            if not recommendations:
+                messages.append(None)
+                continue
+            try:
+                messages.append(EmailService._build_message(profile_name, profile_email, recommendations, sent_at))
+            except Exception as e:
+                messages.append(e)
+        return messages
+    
+    @staticmethod
+    def send_bulk(recipients, app=None, max_workers=MAIL_BULK_WORKERS, max_retries=MAIL_MAX_RETRIES):
+        """Envoie les recommandations d'une liste de (nom, email, recommandations)
         
-        html = f"""
-        <html>
-            <head>
-                <meta charset="UTF-8">
-                <style>
-                    body {{ font-family: Arial, sans-serif; background-color: #f5f5f5; }}
-                    .container {{ max-width: 600px; margin: 20px auto; background: white; padding: 20px; border-radius: 8px; }}
-                    .header {{ background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); color: white; padding: 20px; border-radius: 8px 8px 0 0; text-align: center; }}
-                    .job-card {{ border: 1px solid #ddd; margin: 15px 0; padding: 15px; border-radius: 5px; }}
-                    .job-title {{ font-size: 18px; font-weight: bold; color: #333; }}
-                    .company {{ color: #666; font-size: 14px; }}
-                    .match-score {{ background: #4CAF50; color: white; padding: 5px 10px; border-radius: 3px; font-weight: bold; }}
-                    .cta {{ text-align: center; margin-top: 20px; }}
-                    .cta-button {{ background: #667eea; color: white; padding: 12px 30px; text-decoration: none; border-radius: 5px; }}
-                    .footer {{ text-align: center; color: #999; font-size: 12px; margin-top: 20px; }}
-                </style>
-            </head>
-            <body>
-                <div class="container">
-                    <div class="header">
-                        <h1>Bonjour {profile_name}!</h1>
-                        <p>Voici vos recommandations d'emploi du jour</p>
-                    </div>
-                    
-                    <p>Nous avons trouvé <strong>{len(recommendations)}</strong> offres correspondant à votre profil:</p>
+        Tous les messages sont rendus avant l'envoi. Chaque worker garde sa
+        connexion SMTP ouverte pour tous ses messages; les erreurs temporaires
+        sont retentées avec un délai exponentiel.
+        Retourne un résultat par destinataire, dans l'ordre de la liste :
+        {'email', 'success', 'attempts', 'error'}.
         """
+        app = app or current_app._get_current_object()
+        with app.app_context():
+            messages = EmailService.render_messages(recipients)
+        
+        results = [None] * len(recipients)
+        to_send = []
+        for i, ((_, profile_email, _), msg) in enumerate(zip(recipients, messages)):
+            if isinstance(msg, Message):
+                to_send.append(i)
+            else:
+                error = str(msg) if msg is not None else 'Aucune recommandation'
+                results[i] = {'email': profile_email, 'success': False, 'attempts': 0, 'error': error}
         
-        for i, rec in enumerate(recommendations, 1):
-            html += f"""
-                    <div class="job-card">
-                        <div style="display: flex; justify-content: space-between; align-items: start;">
-                            <div>
-                                <div class="job-title">{i}. {rec['job_title']}</div>
-                                <div class="company">{rec['company']} - {rec['location']}</div>
-                            </div>
-                            <div class="match-score">{rec['score']:.1%}</div>
-                        </div>
-                        <p style="margin-top: 10px;">
-                            <a href="{rec['url']}" target="_blank" style="color: #667eea; text-decoration: none;">Voir l'offre →</a>
-                        </p>
-                    </div>
-            """
+        sent = EmailService.send_messages([messages[i] for i in to_send], app, max_workers, max_retries)
+        for i, result in zip(to_send, sent):
+            results[i] = result
+        return results
+    
+    @staticmethod
+    def send_messages(messages, app=None, max_workers=MAIL_BULK_WORKERS, max_retries=MAIL_MAX_RETRIES,
+                      on_result=None):
+        """Envoie des messages déjà construits sur un pool de connexions SMTP persistantes
         
-        html += f"""
-                    <div class="cta">
-                        <p>Connectez-vous pour gérer vos préférences</p>
-                    </div>
-                    
-                    <div class="footer">
-                        <p>Système de Recommandation d'Emploi | Envoyé le {datetime.now().strftime('%d/%m/%Y à %H:%M')}</p>
-                        <p>Ne pas répondre à cet email automatique</p>
-                    </div>
-                </div>
-            </body>
-        </html>
+        on_result(result) est appelé depuis le worker dès qu'un envoi est terminé.
+        Retourne un résultat par message, dans l'ordre de la liste.
         """
+        app = app or current_app._get_current_object()
+        results = [None] * len(messages)
+        tasks = queue.Queue()
+        for i in range(len(messages)):
+            tasks.put(i)
         
-        return html
\ No newline at end of file
+        def worker():
+            with app.app_context():
+                smtp = SMTPWorker()
+                try:
+                    while True:
+                        try:
+                            i = tasks.get_nowait()
+                        except queue.Empty:
+                            return
+                        results[i] = EmailService._send_with_retries(smtp, messages[i], max_retries)
+                        if on_result:
+                            on_result(results[i])
+                finally:
+                    smtp.close()
+        
+        n_workers = max(1, min(max_workers, len(messages)))
+        with ThreadPoolExecutor(max_workers=n_workers) as executor:
+            for future in [executor.submit(worker) for _ in range(n_workers)]:
+                future.result()
+        return results
+    
+    @staticmethod
+    def _send_with_retries(smtp, msg, max_retries):
+        """Envoie un message sur la connexion du worker, avec nouvelles tentatives"""
+        profile_email = msg.recipients[0]
+        for attempt in range(max_retries + 1):
+            try:
+                with metrics.timer("smtp_send"):
+                    smtp.send(msg)
+                emails_total.inc(status='sent')
+                return {'email': profile_email, 'success': True, 'attempts': attempt + 1, 'error': None}
+            except Exception as e:
+                # Connexion dans un état inconnu : elle sera rouverte au prochain envoi
+                smtp.close()
+                if not is_transient_error(e) or attempt == max_retries:
+                    emails_total.inc(status='failed')
+                    return {'email': profile_email, 'success': False, 'attempts': attempt + 1, 'error': str(e)}
+                time.sleep(random.uniform(0, min(MAIL_BACKOFF_MAX, MAIL_BACKOFF_BASE * 2 ** attempt)))
+    
+    @staticmethod
+    def _build_email_html(profile_name, recommendations, sent_at=None):
+        """Construit le contenu HTML de l'email (template compilé une seule fois)"""
+        return _email_templates()['html'].render(
+            profile_name=profile_name, recommendations=recommendations,
+            sent_at=(sent_at or datetime.now()).strftime('%d/%m/%Y à %H:%M')
+        )
+    
+    @staticmethod
+    def _build_email_text(profile_name, recommendations, sent_at=None):
+        """Construit la version texte de l'email"""
+        return _email_templates()['text'].render(
+            profile_name=profile_name, recommendations=recommendations,
+            sent_at=(sent_at or datetime.now()).strftime('%d/%m/%Y à %H:%M')
+        )
@@ -1,94 +1,259 @@
-from gensim.models import Word2Vec, FastText
-from sklearn.metrics.pairwise import cosine_similarity
+from collections.abc import Sequence
 import numpy as np
-from nltk.tokenize import word_tokenize
-from nltk.corpus import stopwords
-import nltk
-from config import EMBEDDING_MODEL, EMBEDDING_DIM, MIN_WORD_FREQ, MIN_MATCH_SCORE, TOP_N_RECOMMENDATIONS
-import os
+from config import (
+    EMBEDDING_DIM, MIN_WORD_FREQ, MIN_MATCH_SCORE, TOP_N_RECOMMENDATIONS, RANKING_TOLERANCE,
+    BATCH_MAX_CELLS, ANN_ENABLED, ANN_CANDIDATES, TOKENIZER_MODE, VOCAB_DRIFT_THRESHOLD,
+    PREFILTER_ENABLED, PREFILTER_FIELDS, INDEX_QUANTIZATION, QUANTIZED_CANDIDATES
+)
+from src.model_store import ModelStore
+from src.job_index import JobIndex, normalize_rows, top_n_indices, top_n_refined
+from src.metrics import metrics
+from src.scoring import MAX_SCORE, JobColumns, apply_bonus, apply_bonus_batch
+from src.ann_index import IVFIndex
+from src.data_manager import compact_job
+from src.prefilter import JobFilterIndex
+from src.quantization import load_quantized, quantize
+from src.text_processing import TextTokenizer
 
-# Télécharger les ressources NLTK si nécessaire
-try:
-    nltk.data.find('tokenizers/punkt')
-except LookupError:
-    nltk.download('punkt')
+# Artefact du registre : vecteurs d'offres normalisés (n_jobs, EMBEDDING_DIM), memory-mappables
+JOB_VECTORS_FILE = 'job_vectors.npy'
 
-try:
-    nltk.data.find('corpora/stopwords')
-except LookupError:
-    nltk.download('stopwords')
+
+def index_artifact_path(store, model_key, index_key, name):
+    """Chemin d'un artefact de l'index d'offres (vecteurs, codes quantifiés, listes IVF)
+
+    Rangé avec le modèle pour son corpus d'entraînement (index_key égal à
+    model_key), dans un sous-dossier propre au catalogue quand le modèle est
+    réutilisé pour un autre catalogue.
+    """
+    if index_key in (None, model_key):
+        return store.artifact_path(model_key, name)
+    path = store.artifact_path(model_key, 'catalogs') / index_key / name
+    path.parent.mkdir(parents=True, exist_ok=True)
+    return path
 
 
 class EmbeddingsMatcher:
     """Moteur de matching utilisant Word2Vec ou FastText embeddings"""
     
-    def __init__(self, model_type="word2vec"):
+    # Bonus ajoutés à la similarité
+    BONUS_WEIGHTS = {'location': 0.15, 'job_type': 0.10, 'salary': 0.10}
+    
+    def __init__(self, model_type="word2vec", use_ann=ANN_ENABLED, tokenizer_mode=TOKENIZER_MODE,
+                 prefilter=PREFILTER_ENABLED, quantization=INDEX_QUANTIZATION):
         self.model_type = model_type
+        self.use_ann = use_ann
+        self.quantization = quantization
+        self.prefilter = prefilter
+        self.prefilter_fields = PREFILTER_FIELDS
+        self._filter_index = (None, None)
+        self.tokenizer = TextTokenizer(tokenizer_mode)
         self.model = None
-        self.french_stops = set(stopwords.words('french'))
-        self.english_stops = set(stopwords.words('english'))
+        self.wv = None
+        self.model_key = None
+        # Empreinte du corpus de l'index d'offres (différente de model_key si le modèle est réutilisé)
+        self.index_key = None
+        self.job_index = None
+        self.ann_index = None
+        self.quantized_index = None
+        # Suivi des tokens inconnus du modèle dans les offres ajoutées depuis l'entraînement
+        self.ingested_tokens = 0
+        self.oov_tokens = 0
     
     def _preprocess_text(self, text):
-        """Nettoie et tokenise le texte"""
-        # Convertir en minuscules
-        text = text.lower()
-        
-        # Tokenizer
-        tokens = word_tokenize(text)
-        
-        # Supprimer les stop words et les caractères spéciaux
-        tokens = [
-            token for token in tokens 
-            if token.isalnum() and token not in self.french_stops and token not in self.english_stops
-        ]
-        
-        return tokens
+        """Nettoie et tokenise le texte (minuscules, sans stop words, tokens en cache)"""
+        return self.tokenizer.tokenize(text)
     
-    def train_model(self, profiles, jobs):
-        """Entraîne le modèle d'embeddings sur les profils et offres"""
-        print(f"📚 Entraînement du modèle {self.model_type.upper()}...")
-        
-        # Préparer tous les textes
-        all_texts = []
-        
-        # Ajouter les textes des profils
-        for profile in profiles:
-            text = self._extract_profile_text(profile)
-            tokens = self._preprocess_text(text)
-            if tokens:
-                all_texts.append(tokens)
+    def _training_params(self):
+        """Hyperparamètres qui déterminent le modèle entraîné"""
+        return {
+            'model_type': self.model_type,
+            'tokenizer': self.tokenizer.mode,
+            'vector_size': EMBEDDING_DIM,
+            'window': 5,
+            'min_count': MIN_WORD_FREQ,
+            'sg': 1 if self.model_type == "word2vec" else 0
+        }
+    
+    def _corpus_texts(self, profiles, jobs):
+        """Textes bruts du corpus d'entraînement (profils puis offres)"""
+        texts = [self._extract_profile_text(profile) for profile in profiles]
+        texts += [self._extract_job_text(job) for job in jobs]
+        return texts
+    
+    @metrics.timed("tokenize")
+    def _scan_jobs(self, jobs, digest=None):
+        """Parcourt les offres une seule fois (liste ou itérateur)
         
-        # Ajouter les textes des offres
+        Retourne (records, job_tokens) : une liste (ou un JobStore) conserve ses
+        offres telles quelles, un itérateur est réduit aux champs utiles aux recommandations.
+        Si digest est fourni, les textes bruts y sont ajoutés au passage.
+        """
+        materialized = isinstance(jobs, Sequence)
+        records = jobs if materialized else []
+        job_tokens = []
         for job in jobs:
             text = self._extract_job_text(job)
-            tokens = self._preprocess_text(text)
-            if tokens:
-                all_texts.append(tokens)
-        
+            if digest is not None:
+                ModelStore.update_digest(digest, text)
+            job_tokens.append(self._preprocess_text(text))
+            if not materialized:
+                records.append(compact_job(job))
+        return records, job_tokens
+    
+    @metrics.timed("train")
+    def _fit(self, token_lists):
+        """Entraîne le modèle d'embeddings sur des documents tokenisés"""
+        all_texts = [tokens for tokens in token_lists if tokens]
         print(f"   Documents traités: {len(all_texts)}")
         
-        # Entraîner le modèle
+        params = self._training_params()
+        
+        # Entraîner le modèle (gensim n'est importé qu'ici et au chargement des vecteurs)
+        from gensim.models import Word2Vec, FastText
         if self.model_type == "word2vec":
             self.model = Word2Vec(
                 sentences=all_texts,
-                vector_size=EMBEDDING_DIM,
-                window=5,
-                min_count=MIN_WORD_FREQ,
+                vector_size=params['vector_size'],
+                window=params['window'],
+                min_count=params['min_count'],
                 workers=4,
-                sg=1  # Skip-gram
+                sg=params['sg']  # Skip-gram
             )
         elif self.model_type == "fasttext":
             self.model = FastText(
                 sentences=all_texts,
-                vector_size=EMBEDDING_DIM,
-                window=5,
-                min_count=MIN_WORD_FREQ,
+                vector_size=params['vector_size'],
+                window=params['window'],
+                min_count=params['min_count'],
                 workers=4
             )
         
-        print(f"   Modèle entraîné! Vocabulaire: {len(self.model.wv)} mots")
+        self.wv = self.model.wv
+        self.ingested_tokens = 0
+        self.oov_tokens = 0
+        print(f"   Modèle entraîné! Vocabulaire: {len(self.wv)} mots")
+        return self.model
+    
+    def train_model(self, profiles, jobs):
+        """Entraîne le modèle d'embeddings sur les profils et offres (liste ou itérateur)"""
+        print(f"📚 Entraînement du modèle {self.model_type.upper()}...")
+        
+        # Tokeniser les profils puis les offres (un seul passage sur les offres)
+        profile_tokens = [self._preprocess_text(self._extract_profile_text(p)) for p in profiles]
+        records, job_tokens = self._scan_jobs(jobs)
+        
+        self._fit(profile_tokens + job_tokens)
+        self._set_job_index(records, job_tokens)
         return self.model
     
+    def load_or_train(self, profiles, jobs, store=None, reuse=False):
+        """Charge le modèle du registre s'il existe pour ce corpus, sinon l'entraîne et l'enregistre
+        
+        jobs peut être un itérateur (ex: DataManager.iter_jobs) : il n'est
+        parcouru qu'une fois, l'empreinte du corpus est calculée au passage.
+        reuse : sans version pour ce corpus, la plus récente entraînée avec les
+        mêmes hyperparamètres est réutilisée tant que la dérive du vocabulaire
+        des offres reste sous VOCAB_DRIFT_THRESHOLD (voir _reusable_model) :
+        model_key ne change pas et les scores restent comparables.
+        """
+        store = store or ModelStore()
+        params = self._training_params()
+        
+        digest = store.corpus_digest(params)
+        profile_tokens = []
+        for profile in profiles:
+            text = self._extract_profile_text(profile)
+            store.update_digest(digest, text)
+            profile_tokens.append(self._preprocess_text(text))
+        records, job_tokens = self._scan_jobs(jobs, digest)
+        key = store.key_from_digest(digest, params)
+        
+        model_key = key
+        if store.exists(key):
+            self.model = None
+            self.wv = store.load(key)
+        else:
+            base_key = self._reusable_model(store, params, job_tokens) if reuse else None
+            if base_key is not None:
+                model_key = base_key
+            else:
+                print(f"📚 Entraînement du modèle {self.model_type.upper()}...")
+                self._fit(profile_tokens + job_tokens)
+                store.save(key, self.wv, params, {'job_oov_ratio': self._oov_ratio(job_tokens)})
+        self.model_key, self.index_key = model_key, key
+        self._set_job_index(records, job_tokens)
+        
+        if self.quantization:
+            self._load_or_build_quantized(store)
+        if self.use_ann:
+            self._load_or_build_ann(store)
+        
+        return self.wv
+    
+    def _oov_ratio(self, job_tokens, wv=None):
+        """Proportion des tokens d'offres inconnus du modèle"""
+        wv = wv if wv is not None else self.wv
+        total = sum(len(tokens) for tokens in job_tokens)
+        oov = sum(1 for tokens in job_tokens for token in tokens if token not in wv)
+        return oov / total if total else 0.0
+    
+    def _reusable_model(self, store, params, job_tokens):
+        """Version la plus récente aux mêmes hyperparamètres, chargée si la dérive du vocabulaire le permet
+        
+        La dérive est la hausse de la proportion de tokens d'offres inconnus
+        du modèle par rapport à son corpus d'entraînement. Retourne la clé de
+        la version réutilisée, ou None s'il faut ré-entraîner.
+        """
+        base_key = store.latest(params)
+        if base_key is None:
+            return None
+        base_ratio = store.load_meta(base_key).get('job_oov_ratio')
+        if base_ratio is None:
+            return None
+        wv = store.load(base_key)
+        drift = self._oov_ratio(job_tokens, wv) - base_ratio
+        if drift > VOCAB_DRIFT_THRESHOLD:
+            print(f"📚 Dérive du vocabulaire {drift:.1%} depuis {base_key} : ré-entraînement")
+            return None
+        self.model = None
+        self.wv = wv
+        print(f"✓ Modèle {base_key} réutilisé (dérive du vocabulaire {drift:.1%})")
+        return base_key
+    
+    def save_job_vectors(self, store=None):
+        """Enregistre les vecteurs d'offres avec le modèle; l'index les lit ensuite en memory-mapped"""
+        store = store or ModelStore()
+        self.job_index = self.job_index.memory_mapped(self._index_artifact(store, JOB_VECTORS_FILE))
+        return self.job_index
+    
+    def load_from_store(self, jobs, key, store=None, index_key=None):
+        """Charge une version du registre et ses vecteurs d'offres (voir save_job_vectors)
+        
+        Ni tokenisation ni embedding du catalogue : jobs (liste ou itérateur)
+        doit être le catalogue pour lequel les vecteurs ont été enregistrés,
+        dans le même ordre (ValueError si le nombre d'offres diffère).
+        index_key : index_key du matcher qui les a enregistrés (key par défaut).
+        """
+        store = store or ModelStore()
+        records = jobs if isinstance(jobs, Sequence) else [compact_job(job) for job in jobs]
+        self.model = None
+        self.wv = store.load(key)
+        self.model_key, self.index_key = key, index_key or key
+        self.job_index = JobIndex.load(records, self._index_artifact(store, JOB_VECTORS_FILE), JobColumns(records))
+        self.ann_index = None
+        self.quantized_index = None
+        
+        if self.quantization:
+            self._load_or_build_quantized(store)
+        if self.use_ann:
+            self._load_or_build_ann(store)
+        
+        return self.wv
+    
+    def _index_artifact(self, store, name):
+        return index_artifact_path(store, self.model_key, self.index_key, name)
+    
     def _extract_profile_text(self, profile):
         """Extrait le texte pertinent du profil"""
         parts = [
@@ -112,45 +277,154 @@ class EmbeddingsMatcher:
     
     def _get_text_embedding(self, text):
         """Obtient l'embedding moyen d'un texte"""
-        if not self.model:
-            raise ValueError("Le modèle n'a pas été entraîné. Appelez train_model() d'abord.")
-        
-        tokens = self._preprocess_text(text)
+        return self._tokens_embedding(self._preprocess_text(text))
+    
+    def _tokens_embedding(self, tokens):
+        """Embedding moyen d'une liste de tokens"""
+        if self.wv is None:
+            raise ValueError("Le modèle n'a pas été entraîné. Appelez train_model() ou load_or_train() d'abord.")
         
         if not tokens:
             # Retourner un vecteur zéro si pas de tokens
-            return np.zeros(EMBEDDING_DIM)
+            return np.zeros(EMBEDDING_DIM, dtype=np.float32)
         
         # Moyenne des embeddings des mots présents
         embeddings = []
         for token in tokens:
-            if token in self.model.wv:
-                embeddings.append(self.model.wv[token])
+            if token in self.wv:
+                embeddings.append(self.wv[token])
         
         if not embeddings:
-            return np.zeros(EMBEDDING_DIM)
+            return np.zeros(EMBEDDING_DIM, dtype=np.float32)
+        
+        return np.mean(embeddings, axis=0, dtype=np.float32)
+    
+    @metrics.timed("embed")
+    def _embed_tokens(self, token_lists):
+        """Matrice (n_jobs, EMBEDDING_DIM) des embeddings d'offres tokenisées"""
+        vectors = np.zeros((len(token_lists), EMBEDDING_DIM), dtype=np.float32)
+        for i, tokens in enumerate(token_lists):
+            vectors[i] = self._tokens_embedding(tokens)
+        return vectors
+    
+    def _make_index(self, records, job_tokens):
+        return JobIndex(records, self._embed_tokens(job_tokens), JobColumns(records))
+    
+    def _set_job_index(self, records, job_tokens):
+        self.job_index = self._make_index(records, job_tokens)
+        self.ann_index = None
+        self.quantized_index = None
+        return self.job_index
+    
+    def build_job_index(self, jobs):
+        """Construit l'index des embeddings d'offres (une seule fois par catalogue, liste ou itérateur)"""
+        return self._set_job_index(*self._scan_jobs(jobs))
+    
+    def build_ann_index(self):
+        """Construit l'index approximatif (IVF) sur l'index exact des offres"""
+        self.ann_index = IVFIndex().build(self.job_index.vectors)
+        return self.ann_index
+    
+    def build_quantized_index(self):
+        """Encode l'index exact des offres (float16, int8 ou pq selon self.quantization)"""
+        self.quantized_index = quantize(self.job_index.vectors, self.quantization)
+        return self.quantized_index
+    
+    def _load_or_build_quantized(self, store):
+        """Vecteurs float32 memory-mapped depuis le registre (re-classement) et codes quantifiés
+        chargés du registre, ou encodés et enregistrés avec le modèle"""
+        self.job_index = self.job_index.memory_mapped(self._index_artifact(store, JOB_VECTORS_FILE))
+        path = self._index_artifact(store, f'quantized_{self.quantization}.npz')
+        try:
+            self.quantized_index = load_quantized(path, len(self.job_index.vectors))
+        except (FileNotFoundError, ValueError):
+            self.build_quantized_index().save(path)
+        return self.quantized_index
+    
+    def _load_or_build_ann(self, store):
+        """Charge l'index ANN enregistré avec le modèle, ou le construit et l'enregistre"""
+        path = self._index_artifact(store, 'ann_ivf.npz')
+        try:
+            self.ann_index = IVFIndex.load(path, self.job_index.vectors)
+        except (FileNotFoundError, ValueError):
+            self.build_ann_index().save(path)
+        return self.ann_index
+    
+    def add_jobs(self, jobs):
+        """Ajoute de nouvelles offres à l'index sans ré-entraîner le modèle
         
-        return np.mean(embeddings, axis=0)
+        Les offres déjà présentes (même id) sont ignorées. Les nouvelles offres
+        sont embeddées avec le modèle courant et ajoutées en fin d'index; la
+        proportion de tokens inconnus du modèle est suivie pour savoir quand
+        un ré-entraînement complet devient nécessaire.
+        """
+        if self.wv is None or self.job_index is None:
+            raise ValueError("Le modèle n'a pas été entraîné. Appelez train_model() ou load_or_train() d'abord.")
+        
+        # Dédoublonnage par id (catalogue existant et lot ajouté)
+        known_ids = set(self.job_index.ids)
+        new_jobs = []
+        received = 0
+        for job in jobs:
+            received += 1
+            if job.get('id') not in known_ids:
+                known_ids.add(job.get('id'))
+                new_jobs.append(job)
+        
+        new_tokens = [self._preprocess_text(self._extract_job_text(job)) for job in new_jobs]
+        for tokens in new_tokens:
+            self.ingested_tokens += len(tokens)
+            self.oov_tokens += sum(1 for token in tokens if token not in self.wv)
+        
+        if new_jobs:
+            self.job_index = self.job_index.extended(
+                new_jobs,
+                self._embed_tokens(new_tokens),
+                self.job_index.columns.extended(new_jobs)
+            )
+            if self.ann_index is not None:
+                self.ann_index = self.ann_index.extended(self.job_index.vectors)
+            if self.quantized_index is not None:
+                self.quantized_index = self.quantized_index.extended(self.job_index.vectors)
+        
+        return {
+            'added': len(new_jobs),
+            'duplicates': received - len(new_jobs),
+            'vocab_drift': self.vocab_drift,
+            'needs_retrain': self.needs_retrain
+        }
+    
+    @property
+    def vocab_drift(self):
+        """Proportion de tokens inconnus du modèle dans les offres ajoutées"""
+        return self.oov_tokens / self.ingested_tokens if self.ingested_tokens else 0.0
+    
+    @property
+    def needs_retrain(self):
+        """Indique si la dérive du vocabulaire justifie un ré-entraînement complet"""
+        return self.vocab_drift > VOCAB_DRIFT_THRESHOLD
+    
+    def _index_for(self, jobs):
+        """Retourne l'index du catalogue, ou un index temporaire pour d'autres offres"""
+        if self.job_index is not None and self.job_index.covers(jobs):
+            return self.job_index
+        return self._make_index(*self._scan_jobs(jobs))
+    
+    def _filter_index_for(self, index):
+        """Index inversés de préfiltrage de l'index d'offres (construits une fois par index)"""
+        built_for, filter_index = self._filter_index
+        if built_for is not index:
+            filter_index = JobFilterIndex(index.columns)
+            self._filter_index = (index, filter_index)
+        return filter_index
     
     def calculate_similarity(self, profile, jobs):
         """Calcule la similarité entre un profil et des offres"""
         profile_text = self._extract_profile_text(profile)
         profile_embedding = self._get_text_embedding(profile_text)
         
-        similarities = []
-        for job in jobs:
-            job_text = self._extract_job_text(job)
-            job_embedding = self._get_text_embedding(job_text)
-            
-            # Calcul de similarité cosinus
-            similarity = cosine_similarity(
-                [profile_embedding],
-                [job_embedding]
-            )[0][0]
-            
-            similarities.append(similarity)
-        
-        return np.array(similarities)
+        # Un seul produit matrice-vecteur sur les embeddings normalisés
+        return self._index_for(jobs).scores(profile_embedding)
     
     def add_score_filtering(self, profile, job, base_score):
         """Ajoute des bonus basés sur les critères"""
@@ -158,11 +432,11 @@ class EmbeddingsMatcher:
         
         # Bonus localisation
         if profile.get('desired_location', '').lower() == job.get('location', '').lower():
-            score += 0.15
+            score += self.BONUS_WEIGHTS['location']
         
         # Bonus type de contrat
         if job.get('job_type') in profile.get('job_types', []):
-            score += 0.10
+            score += self.BONUS_WEIGHTS['job_type']
         
         # Bonus salaire (gérer les None)
         job_salary_min = job.get('salary_min') or 0
@@ -172,38 +446,143 @@ class EmbeddingsMatcher:
         
         if job_salary_min and job_salary_max:
             if job_salary_min <= profile_salary_max and job_salary_max >= profile_salary_min:
-                score += 0.10
+                score += self.BONUS_WEIGHTS['salary']
         
         return min(score, 1.0)
     
     def recommend(self, profile, jobs):
         """Recommande les meilleures offres pour un profil"""
-        if not jobs or not self.model:
+        if self.wv is None:
             return []
         
-        similarities = self.calculate_similarity(profile, jobs)
+        index = self._index_for(jobs)
+        if not len(index):
+            return []
+        return self._recommend_in(index, profile)
+    
+    def recommend_among(self, profile, jobs, ids):
+        """Recommande parmi certaines offres du catalogue seulement (ids = positions dans jobs)"""
+        if self.wv is None:
+            return []
+        
+        index = self._index_for(jobs)
+        return self._recommend_in(index, profile, np.asarray(ids, dtype=np.int64))
+    
+    def _recommend_in(self, index, profile, ids=None):
+        """Recommandations d'un profil dans un index d'offres (restreintes aux ids si fournis)"""
+        profile_embedding = self._get_text_embedding(self._extract_profile_text(profile))
+        
+        candidates = ids
+        if self.prefilter:
+            filtered = self._filter_index_for(index).candidates(profile, self.prefilter_fields)
+            if filtered is not None:
+                candidates = filtered if ids is None else np.intersect1d(filtered, ids)
+        
+        if candidates is not None:
+            if not len(candidates):
+                return []
+            # Préfiltrage strict ou sous-ensemble demandé : seules ces offres sont scorées
+            similarities = index.scores(profile_embedding, candidates)
+            columns = index.columns.subset(candidates)
+        elif self.use_ann and self.ann_index is not None and index is self.job_index:
+            # Présélection approximative puis re-classement exact avec les bonus
+            candidates, similarities = self.ann_index.search(profile_embedding, ANN_CANDIDATES)
+            # Ordre du catalogue, comme la recherche exacte (égalités départagées par position)
+            order = np.argsort(candidates, kind='stable')
+            candidates, similarities = candidates[order], similarities[order]
+            columns = index.columns.subset(candidates)
+        elif self.quantized_index is not None and index is self.job_index:
+            # Scores approximatifs sur les codes compressés, re-classement exact en float32
+            candidates = np.sort(self.quantized_index.search(profile_embedding, QUANTIZED_CANDIDATES))
+            similarities = index.scores(profile_embedding, candidates)
+            columns = index.columns.subset(candidates)
+        else:
+            similarities = index.scores(profile_embedding)
+            columns = index.columns
+        
+        # Ajouter les scores additionnels (vectorisé sur toutes les offres)
+        final_scores = apply_bonus(similarities, profile, columns, self.BONUS_WEIGHTS)
         
-        # Ajouter les scores additionnels
-        final_scores = []
-        for i, base_score in enumerate(similarities):
-            final_score = self.add_score_filtering(profile, jobs[i], base_score)
-            final_scores.append(final_score)
+        refine = self._exact_scorer(index, profile, profile_embedding, candidates)
+        return self._select_recommendations(final_scores, index.jobs, candidates, refine)
+    
+    def _exact_scorer(self, index, profile, profile_embedding, candidates=None):
+        """Scores finaux reproductibles (similarité exacte + bonus) de positions de final_scores"""
+        def refine(positions):
+            ids = positions if candidates is None else candidates[positions]
+            similarities = index.exact_scores(profile_embedding, ids)
+            return apply_bonus(similarities, profile, index.columns.subset(ids), self.BONUS_WEIGHTS)
+        return refine
+    
+    def _select_recommendations(self, final_scores, jobs, candidates=None, refine=None):
+        """Construit les TOP N recommandations à partir des scores finaux
+        
+        candidates : ids des offres correspondant à final_scores (toutes si None).
+        refine : scores exacts de positions de final_scores (voir _exact_scorer); les
+        quasi-égalités sont alors classées de la même façon en gemv et en gemm.
+        """
+        # Sélection du top N sans trier tout le catalogue
+        if refine is None:
+            top_indices = top_n_indices(final_scores, TOP_N_RECOMMENDATIONS)
+            top_scores = final_scores[top_indices]
+        else:
+            top_indices, top_scores = top_n_refined(
+                final_scores, TOP_N_RECOMMENDATIONS, refine, RANKING_TOLERANCE, MAX_SCORE
+            )
         
         # Créer les recommandations
         recommendations = []
-        for i, job in enumerate(jobs):
+        for i, score in zip(top_indices, top_scores):
+            if score < MIN_MATCH_SCORE:
+                break
+            job = jobs[i if candidates is None else candidates[i]]
             recommendations.append({
                 'job_id': job['id'],
                 'job_title': job['title'],
                 'company': job['company'],
                 'location': job['location'],
                 'salary_range': f"{job.get('salary_min', 'N/A')} - {job.get('salary_max', 'N/A')}",
-                'score': final_scores[i],
+                'score': score,
                 'url': job.get('url', '#')
             })
         
-        # Trier et filtrer
-        recommendations.sort(key=lambda x: x['score'], reverse=True)
-        recommendations = [r for r in recommendations if r['score'] >= MIN_MATCH_SCORE]
+        return recommendations
+    
+    def recommend_batch(self, profiles, jobs):
+        """Recommande les meilleures offres pour chaque profil d'une liste
+        
+        Les offres sont embeddées une seule fois, les profils sont empilés en
+        matrice et les scores profils x offres sont calculés par blocs dont la
+        taille est bornée par BATCH_MAX_CELLS.
+        """
+        if not profiles:
+            return []
+        if self.wv is None:
+            return [[] for _ in profiles]
+        
+        index = self._index_for(jobs)
+        if not len(index):
+            return [[] for _ in profiles]
+        if self.prefilter:
+            # Candidats propres à chaque profil : scoring restreint profil par profil
+            return [self._recommend_in(index, profile) for profile in profiles]
+        
+        profile_embeddings = np.array([
+            self._get_text_embedding(self._extract_profile_text(profile))
+            for profile in profiles
+        ], dtype=np.float32).reshape(len(profiles), EMBEDDING_DIM)
+        profile_vectors = normalize_rows(profile_embeddings)
+        
+        chunk_size = max(1, BATCH_MAX_CELLS // len(index))
+        all_recommendations = []
+        for start in range(0, len(profiles), chunk_size):
+            chunk_profiles = profiles[start:start + chunk_size]
+            with metrics.timer("score"):
+                similarities = profile_vectors[start:start + chunk_size] @ index.vectors.T
+            final_scores = apply_bonus_batch(similarities, chunk_profiles, index.columns, self.BONUS_WEIGHTS)
+            
+            for profile, embedding, row in zip(chunk_profiles, profile_embeddings[start:], final_scores):
+                refine = self._exact_scorer(index, profile, embedding)
+                all_recommendations.append(self._select_recommendations(row, index.jobs, refine=refine))
         
-        return recommendations[:TOP_N_RECOMMENDATIONS]
\ No newline at end of file
+        return all_recommendations
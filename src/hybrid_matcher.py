@@ -0,0 +1,125 @@
+# Moteur de matching hybride : TF-IDF (index creux) + embeddings (index dense)
+
+from collections.abc import Sequence
+import numpy as np
+from config import (
+    EMBEDDING_DIM, BATCH_MAX_CELLS, HYBRID_FUSION, HYBRID_SPARSE_WEIGHT, HYBRID_RRF_K, HYBRID_CANDIDATES
+)
+from src.embeddings_matcher import EmbeddingsMatcher
+from src.job_index import normalize_rows
+from src.matcher import SimpleMatcher
+from src.metrics import metrics
+from src.scoring import apply_bonus_batch
+
+
+def top_n_mask(scores, n):
+    """Masque (n_requêtes, n_jobs) des n meilleurs scores de chaque ligne"""
+    mask = np.zeros(scores.shape, dtype=bool)
+    if n >= scores.shape[1]:
+        mask[:] = True
+    elif n > 0:
+        best = np.argpartition(-scores, n - 1, axis=1)[:, :n]
+        np.put_along_axis(mask, best, True, axis=1)
+    return mask
+
+
+def ranks(scores):
+    """Rang (0 = meilleur) de chaque offre dans chaque ligne, égalités dans l'ordre d'origine"""
+    order = np.argsort(-scores, axis=1, kind='stable')
+    result = np.empty(scores.shape, dtype=np.int64)
+    np.put_along_axis(result, order, np.arange(scores.shape[1])[None, :], axis=1)
+    return result
+
+
+class HybridMatcher:
+    """Moteur hybride : candidats des index TF-IDF et embeddings, scores fusionnés puis bonus
+
+    fusion : "weighted" (somme pondérée des similarités cosinus) ou "rrf"
+    (reciprocal rank fusion, ramenée entre 0 et 1). Seules les offres parmi
+    les `candidates` meilleures de l'un des deux index peuvent être
+    recommandées.
+    """
+
+    # Bonus ajoutés au score fusionné
+    BONUS_WEIGHTS = EmbeddingsMatcher.BONUS_WEIGHTS
+
+    def __init__(self, dense=None, sparse=None, fusion=HYBRID_FUSION, sparse_weight=HYBRID_SPARSE_WEIGHT,
+                 rrf_k=HYBRID_RRF_K, candidates=HYBRID_CANDIDATES):
+        if fusion not in ("weighted", "rrf"):
+            raise ValueError(f"Fusion inconnue: {fusion}")
+        self.dense = dense or EmbeddingsMatcher()
+        self.sparse = sparse or SimpleMatcher()
+        self.fusion = fusion
+        self.sparse_weight = sparse_weight
+        self.rrf_k = rrf_k
+        self.candidates = candidates
+
+    @property
+    def model_key(self):
+        return f"{self.dense.model_key}+{self.sparse.model_key}"
+
+    def load_or_train(self, profiles, jobs, store=None):
+        """Charge ou entraîne les deux index sur le même catalogue"""
+        # Les deux index doivent partager la même liste d'offres
+        if not isinstance(jobs, Sequence):
+            jobs = list(jobs)
+        self.dense.load_or_train(profiles, jobs, store=store)
+        self.sparse.load_or_fit(jobs, store=store)
+        return self
+
+    def _indexes_for(self, jobs):
+        if not isinstance(jobs, Sequence):
+            jobs = list(jobs)
+        return self.dense._index_for(jobs), self.sparse._index_for(jobs)
+
+    def fuse(self, dense_scores, sparse_scores):
+        """Fusionne deux blocs de similarités (n_profils, n_jobs); -inf hors candidats"""
+        candidates = top_n_mask(dense_scores, self.candidates) | top_n_mask(sparse_scores, self.candidates)
+
+        if self.fusion == "weighted":
+            fused = (1 - self.sparse_weight) * dense_scores + self.sparse_weight * sparse_scores
+        else:
+            # Rangs hors des listes de candidats : contribution nulle
+            fused = np.zeros(dense_scores.shape, dtype=np.float64)
+            for scores in (dense_scores, sparse_scores):
+                rank = ranks(scores)
+                fused += np.where(rank < self.candidates, 1.0 / (self.rrf_k + rank + 1), 0.0)
+            fused *= (self.rrf_k + 1) / 2  # 1.0 pour une offre classée première des deux côtés
+
+        return np.where(candidates, fused, -np.inf)
+
+    def recommend(self, profile, jobs):
+        """Recommande les meilleures offres pour un profil"""
+        return self.recommend_batch([profile], jobs)[0]
+
+    def recommend_batch(self, profiles, jobs):
+        """Recommande les meilleures offres pour chaque profil d'une liste (calcul par blocs)"""
+        if not profiles:
+            return []
+        if self.dense.wv is None:
+            return [[] for _ in profiles]
+
+        dense_index, sparse_index = self._indexes_for(jobs)
+        if not len(dense_index):
+            return [[] for _ in profiles]
+
+        profile_vectors = normalize_rows(np.array([
+            self.dense._get_text_embedding(self.dense._extract_profile_text(profile))
+            for profile in profiles
+        ], dtype=np.float32).reshape(len(profiles), EMBEDDING_DIM))
+        profile_matrix = self.sparse._profile_matrix(profiles)
+
+        chunk_size = max(1, BATCH_MAX_CELLS // len(dense_index))
+        all_recommendations = []
+        for start in range(0, len(profiles), chunk_size):
+            chunk_profiles = profiles[start:start + chunk_size]
+            with metrics.timer("score"):
+                dense_scores = profile_vectors[start:start + chunk_size] @ dense_index.vectors.T
+            sparse_scores = sparse_index.scores(profile_matrix[start:start + chunk_size])
+            fused = self.fuse(dense_scores.astype(np.float64), sparse_scores)
+            final_scores = apply_bonus_batch(fused, chunk_profiles, dense_index.columns, self.BONUS_WEIGHTS)
+
+            for row in final_scores:
+                all_recommendations.append(self.dense._select_recommendations(row, dense_index.jobs))
+
+        return all_recommendations
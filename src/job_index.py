@@ -0,0 +1,232 @@
+# Index des embeddings d'offres
+
+import os
+import tempfile
+from pathlib import Path
+import numpy as np
+from src.metrics import metrics
+
+# Lignes recopiées par bloc lors de l'agrandissement d'un tampon memory-mapped
+COPY_CHUNK_SIZE = 65536
+
+
+def normalize_rows(matrix):
+    """Normalise chaque ligne (norme L2), les lignes nulles restent nulles"""
+    matrix = np.ascontiguousarray(matrix, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def top_n_indices(scores, n):
+    """Indices des n meilleurs scores, triés par score décroissant
+
+    En cas d'égalité, l'ordre d'origine est conservé (comme un tri stable).
+    """
+    scores = np.asarray(scores)
+    if n <= 0 or len(scores) == 0:
+        return np.array([], dtype=np.int64)
+
+    if n >= len(scores):
+        candidates = np.arange(len(scores))
+    else:
+        # argpartition donne le n-ième meilleur score; on garde toutes les égalités
+        partition = np.argpartition(-scores, n - 1)[:n]
+        threshold = scores[partition].min()
+        candidates = np.flatnonzero(scores >= threshold)
+
+    order = np.lexsort((candidates, -scores[candidates]))
+    return candidates[order][:n]
+
+
+def top_n_refined(scores, n, refine, tolerance, max_score=None):
+    """Indices et scores des n meilleurs après re-calcul exact des quasi-égalités
+
+    Les offres à moins de tolerance du n-ième meilleur score (scores float32,
+    dont l'arrondi dépend du calcul : gemv, gemm, taille des blocs) sont
+    re-scorées par refine(indices), dont le résultat ne dépend pas du chemin
+    suivi. Les égalités restantes sont départagées par position.
+    max_score : plafond des scores exacts; les offres sont re-scorées dans
+    l'ordre du catalogue et le re-calcul s'arrête dès que n offres l'atteignent
+    (les suivantes ne peuvent au mieux qu'être à égalité, derrière elles).
+    """
+    scores = np.asarray(scores)
+    if n <= 0 or len(scores) == 0:
+        return np.array([], dtype=np.int64), np.array([], dtype=np.float64)
+    nth_best = scores[top_n_indices(scores, n)[-1]]
+    shortlist = np.flatnonzero(scores >= nth_best - tolerance)
+
+    step = len(shortlist) if max_score is None else max(64, 4 * n)
+    refined, at_max = [], 0
+    for start in range(0, len(shortlist), step):
+        block = np.asarray(refine(shortlist[start:start + step]))
+        refined.append(block)
+        if max_score is not None:
+            at_max += int(np.count_nonzero(block >= max_score))
+            if at_max >= n:
+                shortlist = shortlist[:start + len(block)]
+                break
+    refined = np.concatenate(refined)
+    order = np.lexsort((shortlist, -refined))[:n]
+    return shortlist[order], refined[order]
+
+
+class JobIndex:
+    """Matrice contiguë float32 (n_jobs, dim) des embeddings d'offres normalisés"""
+
+    def __init__(self, jobs, vectors, columns=None):
+        self.jobs = jobs
+        self.vectors = normalize_rows(vectors)
+        self.columns = columns
+        self._ids = None
+        # Tampon partagé entre les versions successives de l'index (ajouts en fin)
+        self._storage = {'buffer': self.vectors, 'used': len(self.vectors)}
+
+    def __len__(self):
+        return len(self.jobs)
+
+    @property
+    def dim(self):
+        return self.vectors.shape[1]
+
+    def covers(self, jobs):
+        """Indique si l'index a été construit pour cette liste d'offres"""
+        return jobs is self.jobs and len(jobs) == len(self.vectors)
+
+    @property
+    def ids(self):
+        """Ensemble des ids des offres indexées"""
+        if self._ids is None:
+            self._ids = {job.get('id') for job in self.jobs}
+        return self._ids
+
+    def extended(self, jobs, vectors, columns=None):
+        """Nouvel index avec des offres ajoutées en fin, sans ré-embedder le catalogue
+
+        L'index courant n'est pas modifié : les requêtes en cours peuvent
+        continuer à l'utiliser. Le tampon de vecteurs est agrandi par
+        doublement et partagé tant que les ajouts se font à sa fin. Un index
+        memory-mapped reste sur disque : son nouveau tampon est un fichier
+        temporaire memory-mapped (anonyme, dans le dossier du fichier
+        d'origine), rempli par blocs.
+        """
+        vectors = normalize_rows(np.asarray(vectors).reshape(len(jobs), self.dim))
+        n = len(self.vectors)
+        needed = n + len(vectors)
+
+        storage = self._storage
+        buffer = storage['buffer']
+        if storage['used'] != n or needed > len(buffer):
+            # Agrandir (ou dupliquer si une autre version a déjà écrit en fin de tampon)
+            capacity = max(needed, 2 * len(buffer))
+            if isinstance(buffer, np.memmap):
+                with tempfile.TemporaryFile(dir=Path(buffer.filename).parent) as f:
+                    new_buffer = np.memmap(f, dtype=np.float32, mode='w+', shape=(capacity, self.dim))
+                for start in range(0, n, COPY_CHUNK_SIZE):
+                    stop = min(start + COPY_CHUNK_SIZE, n)
+                    new_buffer[start:stop] = self.vectors[start:stop]
+            else:
+                new_buffer = np.empty((capacity, self.dim), dtype=np.float32)
+                new_buffer[:n] = self.vectors
+            storage = {'buffer': new_buffer, 'used': n}
+            buffer = new_buffer
+
+        buffer[n:needed] = vectors
+        storage['used'] = needed
+
+        index = JobIndex.__new__(JobIndex)
+        index.jobs = list(self.jobs) + list(jobs)
+        index.vectors = buffer[:needed]
+        index.columns = columns
+        index._ids = self.ids | {job.get('id') for job in jobs}
+        index._storage = storage
+        return index
+
+    @classmethod
+    def load(cls, jobs, path, columns=None):
+        """Index dont les vecteurs (déjà normalisés) sont lus depuis un fichier .npy memory-mapped
+
+        ValueError si le fichier ne contient pas une ligne par offre de jobs.
+        """
+        vectors = np.load(path, mmap_mode='r')
+        if len(vectors) != len(jobs):
+            raise ValueError("Les vecteurs enregistrés ne correspondent pas au catalogue d'offres")
+        index = cls.__new__(cls)
+        index.jobs = jobs
+        index.vectors = vectors
+        index.columns = columns
+        index._ids = None
+        index._storage = {'buffer': vectors, 'used': len(vectors)}
+        return index
+
+    def memory_mapped(self, path):
+        """Même index, vecteurs lus depuis un fichier .npy memory-mapped (écrit s'il manque)
+
+        Les pages du fichier sont partagées entre les processus et seules les
+        lignes lues (ex: candidats à re-classer) sont chargées en mémoire.
+        """
+        path = Path(path)
+        try:
+            vectors = np.load(path, mmap_mode='r')
+        except (FileNotFoundError, ValueError):
+            vectors = None
+        if vectors is None or vectors.shape != self.vectors.shape:
+            tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+            with open(tmp_path, 'wb') as f:
+                np.save(f, self.vectors)
+            os.replace(tmp_path, path)
+
+        index = JobIndex.load(self.jobs, path, self.columns)
+        index._ids = self._ids
+        return index
+
+    @metrics.timed("score")
+    def scores(self, query_vector, ids=None):
+        """Similarité cosinus entre un vecteur requête et toutes les offres (ou les offres ids)"""
+        vectors = self.vectors if ids is None else self.vectors[ids]
+        query = np.asarray(query_vector, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if norm == 0:
+            return np.zeros(len(vectors), dtype=np.float32)
+        return vectors @ (query / norm)
+
+    def exact_scores(self, query_vector, ids):
+        """Similarités cosinus des offres ids accumulées en float64 puis arrondies en float32
+
+        Le résultat ne dépend pas de l'ordre d'accumulation (produit
+        matrice-vecteur ou matrice-matrice, nombre de lignes) : il sert à
+        départager les quasi-égalités de manière reproductible.
+        """
+        query = np.asarray(query_vector, dtype=np.float64)
+        norm = np.linalg.norm(query)
+        if norm == 0:
+            return np.zeros(len(ids), dtype=np.float32)
+        return (np.asarray(self.vectors[ids], dtype=np.float64) @ (query / norm)).astype(np.float32)
+
+    def search(self, query_vector, n):
+        """Retourne (indices, scores) des n offres les plus proches"""
+        scores = self.scores(query_vector)
+        indices = top_n_indices(scores, n)
+        return indices, scores[indices]
+
+
+class SparseJobIndex:
+    """Matrice CSR (n_jobs, n_termes) des vecteurs TF-IDF d'offres (lignes normalisées L2)"""
+
+    def __init__(self, jobs, matrix, columns=None):
+        self.jobs = jobs
+        self.matrix = matrix.tocsr()
+        self.columns = columns
+
+    def __len__(self):
+        return len(self.jobs)
+
+    def covers(self, jobs):
+        """Indique si l'index a été construit pour cette liste d'offres"""
+        return jobs is self.jobs and len(jobs) == self.matrix.shape[0]
+
+    @metrics.timed("score")
+    def scores(self, query_matrix, ids=None):
+        """Similarités cosinus (n_requêtes, n_jobs) entre des requêtes TF-IDF et toutes les offres (ou les offres ids)"""
+        matrix = self.matrix if ids is None else self.matrix[ids]
+        return (query_matrix @ matrix.T).toarray()
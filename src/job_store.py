@@ -0,0 +1,241 @@
+# Stockage en colonnes des offres, partagé entre processus par memory-mapping
+
+import json
+import os
+import shutil
+import time
+from collections.abc import Sequence
+from datetime import datetime
+from pathlib import Path
+import numpy as np
+
+# Séparateur des éléments d'une liste (compétences) dans le blob de chaînes
+LIST_SEPARATOR = '\x1f'
+
+# Fichier désignant la version publiée dans le dossier du store
+CURRENT_FILE = 'CURRENT'
+
+
+def _infer_kind(values):
+    """Type de colonne d'un champ : 'int', 'float', 'list' ou 'str'"""
+    kinds = set()
+    for value in values:
+        if value is None:
+            continue
+        if isinstance(value, bool):
+            kinds.add('str')
+        elif isinstance(value, int):
+            kinds.add('int')
+        elif isinstance(value, float):
+            kinds.add('float')
+        elif isinstance(value, list):
+            kinds.add('list')
+        else:
+            kinds.add('str')
+    if kinds <= {'int'}:
+        return 'int' if kinds else 'str'
+    if kinds <= {'int', 'float'}:
+        return 'float'
+    if kinds == {'list'}:
+        return 'list'
+    return 'str'
+
+
+def _encode(value, kind):
+    if kind == 'list':
+        return LIST_SEPARATOR.join(str(item) for item in value)
+    return value if isinstance(value, str) else json.dumps(value, ensure_ascii=False)
+
+
+class JobStore(Sequence):
+    """Catalogue d'offres en colonnes memory-mapped
+
+    Les champs numériques sont des tableaux int64, ou float64 avec NaN pour
+    les valeurs absentes; les champs texte un blob UTF-8 indexé par un tableau
+    d'offsets. Les fichiers sont ouverts en lecture seule avec mmap : les
+    processus (workers Flask, scheduler) partagent les mêmes pages.
+    Une offre absente d'un champ est relue avec la valeur None.
+
+    Chaque construction écrit une version dans un sous-dossier; le fichier
+    CURRENT du dossier du store désigne la version publiée et est remplacé
+    atomiquement, le dossier du store n'est donc jamais absent.
+    """
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        self.path = self.current_path(self.directory)
+        with open(self.path / 'meta.json', 'r', encoding='utf-8') as f:
+            self.meta = json.load(f)
+        self.fields = self.meta['fields']
+        self._columns = {}
+        self._decoded = {}
+        for name, kind in self.fields.items():
+            if kind in ('int', 'float'):
+                self._columns[name] = np.load(self.path / f'{name}.npy', mmap_mode='r')
+            else:
+                self._columns[name] = (
+                    np.load(self.path / f'{name}.offsets.npy', mmap_mode='r'),
+                    self._open_blob(self.path / f'{name}.bin'),
+                    np.load(self.path / f'{name}.null.npy', mmap_mode='r')
+                )
+
+    @staticmethod
+    def current_path(directory):
+        """Dossier de la version publiée d'un store (le dossier lui-même pour un store sans versions)"""
+        directory = Path(directory)
+        try:
+            return directory / (directory / CURRENT_FILE).read_text(encoding='utf-8').strip()
+        except FileNotFoundError:
+            return directory
+
+    @staticmethod
+    def _open_blob(path):
+        # np.memmap refuse les fichiers vides
+        if path.stat().st_size == 0:
+            return np.empty(0, dtype=np.uint8)
+        return np.memmap(path, dtype=np.uint8, mode='r')
+
+    @classmethod
+    def build(cls, jobs, directory, source=None):
+        """Écrit un catalogue (liste ou itérateur d'offres) et retourne le store ouvert
+
+        La version est écrite dans un dossier temporaire, renommée puis publiée
+        en remplaçant le fichier CURRENT. La version précédente est conservée
+        pour les processus qui l'ouvrent au même moment; les plus anciennes sont supprimées.
+        source : fichier d'origine, dont l'empreinte est enregistrée (voir is_stale).
+        """
+        jobs = list(jobs)
+        fields = {}
+        for job in jobs:
+            for name in job:
+                fields.setdefault(name, None)
+        fields = {name: _infer_kind(job.get(name) for job in jobs) for name in fields}
+
+        target = Path(directory)
+        version = f"v-{time.time_ns()}-{os.getpid()}"
+        tmp_dir = target / f".{version}.tmp"
+        tmp_dir.mkdir(parents=True)
+
+        for name, kind in fields.items():
+            values = [job.get(name) for job in jobs]
+            if kind == 'int' and None not in values:
+                np.save(tmp_dir / f'{name}.npy', np.array(values, dtype=np.int64))
+                continue
+            if kind in ('int', 'float'):
+                column = np.array([np.nan if v is None else v for v in values], dtype=np.float64)
+                np.save(tmp_dir / f'{name}.npy', column)
+                continue
+
+            null = np.array([v is None for v in values], dtype=bool)
+            offsets = np.zeros(len(values) + 1, dtype=np.int64)
+            with open(tmp_dir / f'{name}.bin', 'wb') as f:
+                for i, value in enumerate(values):
+                    data = b'' if value is None else _encode(value, kind).encode('utf-8')
+                    f.write(data)
+                    offsets[i + 1] = offsets[i] + len(data)
+            np.save(tmp_dir / f'{name}.offsets.npy', offsets)
+            np.save(tmp_dir / f'{name}.null.npy', null)
+
+        meta = {
+            'n_jobs': len(jobs),
+            'fields': fields,
+            'source': cls._source_stamp(source) if source else None,
+            'created_at': datetime.now().isoformat()
+        }
+        with open(tmp_dir / 'meta.json', 'w', encoding='utf-8') as f:
+            json.dump(meta, f, ensure_ascii=False, indent=2)
+
+        # Publication : remplacement atomique de CURRENT, le store reste lisible pendant l'échange
+        tmp_dir.rename(target / version)
+        previous = cls.current_path(target)
+        tmp_current = target / f".{CURRENT_FILE}.{os.getpid()}.tmp"
+        tmp_current.write_text(version, encoding='utf-8')
+        os.replace(tmp_current, target / CURRENT_FILE)
+        cls._remove_old_versions(target, keep={version, previous.name})
+        print(f"✓ Store d'offres écrit: {target} ({len(jobs)} offres)")
+        return cls(target)
+
+    @classmethod
+    def _remove_old_versions(cls, directory, keep):
+        """Supprime les versions (et fichiers d'un store sans versions) ni publiées ni précédentes"""
+        keep = set(keep) | {cls.current_path(directory).name, CURRENT_FILE}
+        for path in directory.iterdir():
+            if path.name in keep or path.name.startswith('.'):
+                continue
+            if path.is_dir():
+                shutil.rmtree(path, ignore_errors=True)
+            else:
+                path.unlink(missing_ok=True)
+
+    @staticmethod
+    def _source_stamp(source):
+        st = os.stat(source)
+        return {'path': str(source), 'mtime_ns': st.st_mtime_ns, 'size': st.st_size}
+
+    @classmethod
+    def is_stale(cls, directory, source):
+        """Indique si le store est absent ou plus ancien que son fichier d'origine"""
+        try:
+            with open(cls.current_path(directory) / 'meta.json', 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return True
+        return meta.get('source') != cls._source_stamp(source)
+
+    def __len__(self):
+        return self.meta['n_jobs']
+
+    def _value(self, name, i):
+        kind = self.fields[name]
+        column = self._columns[name]
+        if kind in ('int', 'float'):
+            if column.dtype.kind == 'i':
+                return int(column[i])
+            value = float(column[i])
+            if np.isnan(value):
+                return None
+            return int(value) if kind == 'int' else value
+
+        offsets, blob, null = column
+        if null[i]:
+            return None
+        text = bytes(blob[offsets[i]:offsets[i + 1]]).decode('utf-8')
+        if kind == 'list':
+            return text.split(LIST_SEPARATOR) if text else []
+        return text
+
+    def get(self, i, fields=None):
+        """Offre i sous forme de dict, restreinte à certains champs si demandé"""
+        return {name: self._value(name, i) for name in (fields or self.fields) if name in self.fields}
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self.get(j) for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        return self.get(i)
+
+    def column(self, name):
+        """Colonne d'un champ : tableau memory-mapped (numérique) ou valeurs décodées (texte, en cache)"""
+        kind = self.fields[name]
+        if kind in ('int', 'float'):
+            return self._columns[name]
+        if name not in self._decoded:
+            values = np.empty(len(self), dtype=object)
+            for i in range(len(self)):
+                values[i] = self._value(name, i)
+            self._decoded[name] = values
+        return self._decoded[name]
+
+    def to_dataframe(self, fields=None):
+        """DataFrame des offres
+
+        Seules les colonnes numériques partagent la mémoire du store (sans
+        copie); les colonnes texte et listes sont décodées en objets Python
+        (une fois par store, voir column).
+        """
+        import pandas as pd
+        fields = [name for name in (fields or self.fields) if name in self.fields]
+        return pd.DataFrame({name: self.column(name) for name in fields}, copy=False)
@@ -1,18 +1,74 @@
 import requests
 import json
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
-from config import RAPIDAPI_KEY, RAPIDAPI_HOST, SCRAPED_JOBS_FILE
+from pathlib import Path
+from requests.adapters import HTTPAdapter
+from config import (
+    RAPIDAPI_KEY, RAPIDAPI_HOST, SCRAPED_JOBS_FILE, SCRAPER_MAX_WORKERS, SCRAPER_RATE_LIMIT,
+    SCRAPER_MAX_RETRIES, SCRAPER_BACKOFF_BASE, SCRAPER_BACKOFF_MAX, DEDUP_ENABLED, DEDUP_INDEX_FILE
+)
+from src.dedup import MinHashLSH
+from src.skills import get_skill_extractor
 import time
 
+
+class TokenBucket:
+    """Limiteur de débit partagé entre threads (rate jetons/seconde)"""
+    
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or max(1, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+    
+    def acquire(self):
+        """Attend qu'un jeton soit disponible puis le consomme"""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
 class JSearchScraper:
     """Scraper pour récupérer les offres d'emploi via JSearch API"""
     
-    def __init__(self):
-        self.api_key = RAPIDAPI_KEY
+    def __init__(self, api_key=RAPIDAPI_KEY, base_url="https://jsearch.p.rapidapi.com/search",
+                 max_workers=SCRAPER_MAX_WORKERS, rate_limit=SCRAPER_RATE_LIMIT,
+                 max_retries=SCRAPER_MAX_RETRIES, checkpoint_file=None, dedup=DEDUP_ENABLED,
+                 dedup_index_file=DEDUP_INDEX_FILE):
+        self.api_key = api_key
         self.api_host = RAPIDAPI_HOST
-        self.base_url = "https://jsearch.p.rapidapi.com/search"
+        self.base_url = base_url
         self.jobs = []
         self.errors = []
+        self.max_workers = max_workers
+        self.max_retries = max_retries
+        self.rate_limiter = TokenBucket(rate_limit)
+        self.checkpoint_file = Path(checkpoint_file) if checkpoint_file else None
+        self.completed = set()
+        self._lock = threading.Lock()
+        self.dedup = dedup
+        self.dedup_index_file = dedup_index_file
+        self._dedup_index = None
+        
+        # Session HTTP partagée avec un pool de connexions par worker
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        
+        if self.checkpoint_file:
+            self._load_checkpoint()
     
     def _validate_api_key(self):
         """Vérifie que la clé API est configurée"""
@@ -22,75 +78,140 @@ class JSearchScraper:
                 "Créez un fichier .env avec votre clé API"
             )
     
-    def search_jobs(self, query, location, pages=1):
-        """
-        Récupère les offres d'emploi via JSearch
-        
-        Args:
-            query (str): Poste recherché (ex: "Python developer")
-            location (str): Localisation (ex: "France")
-            pages (int): Nombre de pages à récupérer (défaut: 1)
-        """
-        self._validate_api_key()
-        
+    @staticmethod
+    def _task_key(query, location, page):
+        return f"{query}|{location}|{page}"
+    
+    def _load_checkpoint(self):
+        """Reprend les pages déjà récupérées lors d'une exécution précédente"""
+        if not self.checkpoint_file.exists():
+            return
+        with open(self.checkpoint_file, 'r', encoding='utf-8') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                self.completed.add(entry['key'])
+                self.jobs.extend(entry['jobs'])
+        print(f"↻ Reprise: {len(self.completed)} pages déjà récupérées")
+    
+    def _save_checkpoint(self, key, jobs):
+        """Ajoute une page terminée au fichier de reprise (écriture en fin de fichier)"""
+        if not self.checkpoint_file:
+            return
+        self.checkpoint_file.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.checkpoint_file, 'a', encoding='utf-8') as f:
+            f.write(json.dumps({'key': key, 'jobs': jobs}, ensure_ascii=False) + '\n')
+    
+    def _backoff_delay(self, attempt, retry_after=None):
+        """Délai exponentiel avec jitter (ou Retry-After si fourni par l'API)"""
+        if retry_after:
+            try:
+                return min(SCRAPER_BACKOFF_MAX, float(retry_after))
+            except ValueError:
+                pass
+        return random.uniform(0, min(SCRAPER_BACKOFF_MAX, SCRAPER_BACKOFF_BASE * 2 ** attempt))
+    
+    def _fetch_page(self, query, location, page):
+        """Récupère une page, avec nouvelles tentatives sur 429/5xx et erreurs réseau"""
         headers = {
             'x-rapidapi-key': self.api_key,
             'x-rapidapi-host': self.api_host
         }
+        querystring = {
+            "query": query,
+            "location": location,
+            "page": page,
+            "num_pages": 1
+        }
         
-        print(f"\n🔍 Recherche: {query} - {location}")
-        
-        for page in range(1, pages + 1):
-            querystring = {
-                "query": query,
-                "location": location,
-                "page": page,
-                "num_pages": 1
-            }
-            
+        for attempt in range(self.max_retries + 1):
+            self.rate_limiter.acquire()
             try:
-                response = requests.get(
+                response = self.session.get(
                     self.base_url,
                     headers=headers,
                     params=querystring,
                     timeout=10
                 )
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    jobs_data = data.get('data', [])
-                    
-                    if not jobs_data:
-                        print(f"   Page {page}: Aucune offre trouvée")
-                        break
-                    
-                    print(f"   Page {page}: {len(jobs_data)} offres trouvées")
-                    self._parse_jobs(jobs_data, query)
-                    
-                    # Attendre un peu entre les requêtes pour respecter les limites
-                    if page < pages:
-                        time.sleep(1)
-                
-                elif response.status_code == 429:
-                    print(f"   ⚠️ Limite d'API atteinte. Attendez quelques minutes.")
+            except (requests.exceptions.Timeout, requests.exceptions.ConnectionError):
+                if attempt == self.max_retries:
+                    raise
+                time.sleep(self._backoff_delay(attempt))
+                continue
+            
+            if response.status_code == 200:
+                return response.json().get('data', [])
+            
+            if response.status_code == 429 or response.status_code >= 500:
+                if attempt == self.max_retries:
                     break
-                else:
-                    error = f"Erreur {response.status_code} pour {query}"
+                time.sleep(self._backoff_delay(attempt, response.headers.get('Retry-After')))
+                continue
+            
+            raise RuntimeError(f"Erreur {response.status_code} pour {query}")
+        
+        raise RuntimeError(f"Erreur {response.status_code} pour {query} après {self.max_retries} nouvelles tentatives")
+    
+    def _run_task(self, query, location, page):
+        """Récupère et parse une page, puis l'enregistre comme terminée"""
+        jobs_data = self._fetch_page(query, location, page)
+        parsed = self._parse_jobs(jobs_data, query)
+        key = self._task_key(query, location, page)
+        with self._lock:
+            self.jobs.extend(parsed)
+            self.completed.add(key)
+            self._save_checkpoint(key, parsed)
+        return len(parsed)
+    
+    def search_many(self, queries, locations, pages=1):
+        """
+        Récupère en parallèle toutes les combinaisons requête/localisation/page
+        
+        Args:
+            queries (list): Postes recherchés
+            locations (list): Localisations
+            pages (int): Nombre de pages par combinaison
+        """
+        self._validate_api_key()
+        
+        tasks = [
+            (query, location, page)
+            for query in queries
+            for location in locations
+            for page in range(1, pages + 1)
+            if self._task_key(query, location, page) not in self.completed
+        ]
+        print(f"\n🔍 {len(tasks)} pages à récupérer ({self.max_workers} workers)")
+        
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {executor.submit(self._run_task, *task): task for task in tasks}
+            for future in as_completed(futures):
+                query, location, page = futures[future]
+                try:
+                    count = future.result()
+                    print(f"   {query} - {location} - page {page}: {count} offres trouvées")
+                except Exception as e:
+                    error = f"Erreur lors du scraping ({query} - {location} - page {page}): {str(e)}"
                     print(f"   ❌ {error}")
-                    self.errors.append(error)
-                    
-            except requests.exceptions.Timeout:
-                error = f"Timeout lors de la recherche: {query}"
-                print(f"   ❌ {error}")
-                self.errors.append(error)
-            except Exception as e:
-                error = f"Erreur lors du scraping: {str(e)}"
-                print(f"   ❌ {error}")
-                self.errors.append(error)
+                    with self._lock:
+                        self.errors.append(error)
+    
+    def search_jobs(self, query, location, pages=1):
+        """
+        Récupère les offres d'emploi via JSearch
+        
+        Args:
+            query (str): Poste recherché (ex: "Python developer")
+            location (str): Localisation (ex: "France")
+            pages (int): Nombre de pages à récupérer (défaut: 1)
+        """
+        self.search_many([query], [location], pages)
     
     def _parse_jobs(self, jobs_data, search_query):
         """Parse les données brutes en format standardisé"""
         
+        parsed_jobs = []
         for job in jobs_data:
             try:
                 parsed_job = {
@@ -108,36 +229,28 @@ class JSearchScraper:
                     'search_query': search_query,
                     'source': 'JSearch API'
                 }
-                self.jobs.append(parsed_job)
+                parsed_jobs.append(parsed_job)
             except Exception as e:
                 print(f"   ⚠️ Erreur parsing job: {str(e)}")
+        
+        return parsed_jobs
     
     def _extract_skills(self, description):
-        """Extrait les compétences de la description"""
-        # Liste commune de compétences techniques
-        tech_skills = [
-            'Python', 'JavaScript', 'Java', 'C++', 'C#', 'PHP', 'Ruby', 'Go', 'Rust',
-            'React', 'Vue', 'Angular', 'Node.js', 'Django', 'Flask', 'Spring',
-            'Machine Learning', 'Deep Learning', 'AI', 'Data Analysis', 'SQL',
-            'Git', 'Docker', 'Kubernetes', 'AWS', 'Azure', 'GCP',
-            'HTML', 'CSS', 'REST API', 'GraphQL', 'MongoDB', 'PostgreSQL'
-        ]
-        
-        found_skills = []
-        description_lower = description.lower()
-        
-        for skill in tech_skills:
-            if skill.lower() in description_lower:
-                found_skills.append(skill)
-        
-        return found_skills if found_skills else []
+        """Extrait les compétences de la description (un seul passage d'expression régulière)"""
+        return get_skill_extractor().extract(description)
     
     def get_jobs(self):
         """Retourne tous les jobs scraped"""
         return self.jobs
     
+    def get_dedup_index(self):
+        """Index des signatures des offres déjà vues (chargé une fois depuis dedup_index_file)"""
+        if self._dedup_index is None:
+            self._dedup_index = MinHashLSH.load(self.dedup_index_file)
+        return self._dedup_index
+    
     def get_unique_jobs(self):
-        """Retourne les jobs sans doublons (basé sur job_id)"""
+        """Retourne les jobs sans doublons (même job_id, ou quasi-identiques à une offre déjà vue)"""
         seen = set()
         unique_jobs = []
         
@@ -147,6 +260,11 @@ class JSearchScraper:
                 seen.add(job_id)
                 unique_jobs.append(job)
         
+        if self.dedup:
+            # Même offre publiée sous un autre id (autre site) : comparée au catalogue via LSH
+            index = self.get_dedup_index()
+            unique_jobs = list(index.unique(unique_jobs))
+        
         return unique_jobs
     
     def save_to_json(self, filepath=SCRAPED_JOBS_FILE):
@@ -163,6 +281,11 @@ class JSearchScraper:
         
         print(f"\n✓ {len(unique_jobs)} offres sauvegardées dans {filepath}")
         
+        if self.dedup:
+            index = self.get_dedup_index()
+            index.save(self.dedup_index_file)
+            print(f"✓ {len(index.duplicates)} quasi-doublons écartés, {len(index)} signatures indexées")
+        
         if self.errors:
             print(f"⚠️  {len(self.errors)} erreurs rencontrées")
     
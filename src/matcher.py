@@ -1,15 +1,25 @@
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
+from collections.abc import Sequence
 import numpy as np
-from nltk.corpus import stopwords
-from config import MIN_MATCH_SCORE, TOP_N_RECOMMENDATIONS
+from config import MIN_MATCH_SCORE, TOP_N_RECOMMENDATIONS, BATCH_MAX_CELLS, PREFILTER_ENABLED, PREFILTER_FIELDS
+from src.job_index import SparseJobIndex, top_n_indices
+from src.metrics import metrics
+from src.model_store import ModelStore
+from src.scoring import JobColumns, apply_bonus, apply_bonus_batch
+from src.data_manager import compact_job
+from src.prefilter import JobFilterIndex
+from src.text_processing import load_stopwords
 
 class SimpleMatcher:
     """Moteur de matching basé sur TF-IDF et similarité cosinus"""
     
-    def __init__(self):
-        # Charger les stop words français
-        french_stops = set(stopwords.words('french'))
+    # Bonus ajoutés à la similarité
+    BONUS_WEIGHTS = {'location': 0.1, 'job_type': 0.1, 'salary': 0.05}
+    
+    def __init__(self, prefilter=PREFILTER_ENABLED):
+        # sklearn n'est importé qu'à la création d'un matcher TF-IDF
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        # Stop words français (copie locale de la liste NLTK)
+        french_stops = set(load_stopwords('french'))
         
         self.vectorizer = TfidfVectorizer(
             lowercase=True,
@@ -19,6 +29,11 @@ class SimpleMatcher:
         )
         self.profile_vector = None
         self.jobs_vectors = None
+        self.job_index = None
+        self.model_key = None
+        self.prefilter = prefilter
+        self.prefilter_fields = PREFILTER_FIELDS
+        self._filter_index = (None, None)
     
     def prepare_text(self, profile, jobs):
         """Prépare les textes pour la vectorisation"""
@@ -26,6 +41,18 @@ class SimpleMatcher:
         jobs_texts = [self._extract_job_text(job) for job in jobs]
         return profile_text, jobs_texts
     
+    @metrics.timed("tokenize")
+    def _scan_jobs(self, jobs):
+        """Parcourt les offres une seule fois (liste ou itérateur) : (records, textes)"""
+        materialized = isinstance(jobs, Sequence)
+        records = jobs if materialized else []
+        jobs_texts = []
+        for job in jobs:
+            jobs_texts.append(self._extract_job_text(job))
+            if not materialized:
+                records.append(compact_job(job))
+        return records, jobs_texts
+    
     def _extract_profile_text(self, profile):
         """Extrait et combine les informations pertinentes du profil"""
         parts = [
@@ -47,20 +74,104 @@ class SimpleMatcher:
         ]
         return ' '.join(parts).lower()
     
-    def calculate_similarity(self, profile, jobs):
-        """Calcule la similarité entre un profil et une liste d'offres"""
-        profile_text, jobs_texts = self.prepare_text(profile, jobs)
+    def _training_params(self):
+        """Paramètres qui déterminent le vectoriseur ajusté"""
+        return {
+            'model_type': 'tfidf',
+            'lowercase': True,
+            'stop_words': 'french',
+            'ngram_range': [1, 2]
+        }
+    
+    @metrics.timed("train")
+    def _fit_texts(self, records, jobs_texts):
+        """Ajuste un nouveau vectoriseur sur les textes des offres"""
+        from scipy import sparse
+        from sklearn.base import clone
+        vectorizer = clone(self.vectorizer)
+        if jobs_texts:
+            matrix = vectorizer.fit_transform(jobs_texts)
+        else:
+            matrix = sparse.csr_matrix((0, 0))
+        return self._set_job_index(vectorizer, records, matrix)
+    
+    def _set_job_index(self, vectorizer, records, matrix):
+        # Le vectoriseur et la matrice des offres sont toujours remplacés ensemble
+        self.vectorizer = vectorizer
+        self.job_index = SparseJobIndex(records, matrix, JobColumns(records))
+        return self.job_index
+    
+    def fit(self, jobs):
+        """Ajuste le vectoriseur et la matrice CSR des offres (une seule fois par catalogue)"""
+        return self._fit_texts(*self._scan_jobs(jobs))
+    
+    def load_or_fit(self, jobs, store=None):
+        """Charge le vectoriseur du registre s'il existe pour ce catalogue, sinon l'ajuste et l'enregistre"""
+        store = store or ModelStore()
+        params = self._training_params()
+        
+        records, jobs_texts = self._scan_jobs(jobs)
+        key = store.compute_key(jobs_texts, params)
         
-        # Vectorize tous les textes ensemble
-        all_texts = [profile_text] + jobs_texts
-        vectors = self.vectorizer.fit_transform(all_texts)
+        if store.exists(key):
+            vectorizer, matrix = store.load_tfidf(key)
+            self._set_job_index(vectorizer, records, matrix)
+        else:
+            self._fit_texts(records, jobs_texts)
+            # Catalogue vide : vectoriseur non ajusté, rien à enregistrer
+            if jobs_texts:
+                store.save_tfidf(key, self.vectorizer, self.job_index.matrix, params)
+        
+        self.model_key = key
+        return self.job_index
+    
+    def add_jobs(self, jobs):
+        """Ajoute de nouvelles offres à l'index sans ré-ajuster le vectoriseur (vocabulaire et IDF fixes)"""
+        if self.job_index is None:
+            raise ValueError("Le vectoriseur n'a pas été ajusté. Appelez fit() ou load_or_fit() d'abord.")
         
-        # Calcul de la similarité cosinus
-        profile_vector = vectors[0]
-        jobs_vectors = vectors[1:]
+        # Dédoublonnage par id (catalogue existant et lot ajouté)
+        known_ids = {job.get('id') for job in self.job_index.jobs}
+        new_jobs = []
+        received = 0
+        for job in jobs:
+            received += 1
+            if job.get('id') not in known_ids:
+                known_ids.add(job.get('id'))
+                new_jobs.append(job)
         
-        similarities = cosine_similarity(profile_vector, jobs_vectors)[0]
-        return similarities
+        if new_jobs:
+            from scipy import sparse
+            matrix = sparse.vstack([
+                self.job_index.matrix,
+                self.vectorizer.transform([self._extract_job_text(job) for job in new_jobs])
+            ])
+            self.job_index = SparseJobIndex(
+                list(self.job_index.jobs) + new_jobs,
+                matrix,
+                self.job_index.columns.extended(new_jobs)
+            )
+        
+        return {'added': len(new_jobs), 'duplicates': received - len(new_jobs)}
+    
+    def _index_for(self, jobs):
+        """Retourne l'index du catalogue, ou ajuste (et garde) un index pour d'autres offres"""
+        if self.job_index is not None and self.job_index.covers(jobs):
+            return self.job_index
+        return self.fit(jobs)
+    
+    def _profile_matrix(self, profiles):
+        """Vecteurs TF-IDF (CSR) des profils dans le vocabulaire du catalogue"""
+        return self.vectorizer.transform([self._extract_profile_text(profile) for profile in profiles])
+    
+    def calculate_similarity(self, profile, jobs):
+        """Calcule la similarité entre un profil et une liste d'offres"""
+        index = self._index_for(jobs)
+        if not len(index):
+            return np.zeros(0)
+        
+        # Les lignes TF-IDF sont normalisées : la similarité cosinus est un produit scalaire creux
+        return index.scores(self._profile_matrix([profile]))[0]
     
     def add_score_filtering(self, profile, job, base_score):
         """Ajoute des scores supplémentaires basés sur les critères"""
@@ -68,11 +179,11 @@ class SimpleMatcher:
         
         # Bonus si la localisation correspond
         if profile.get('desired_location', '').lower() == job.get('location', '').lower():
-            score += 0.1
+            score += self.BONUS_WEIGHTS['location']
         
         # Bonus si le type de contrat correspond
         if job.get('job_type') in profile.get('job_types', []):
-            score += 0.1
+            score += self.BONUS_WEIGHTS['job_type']
         
         # Bonus si le salaire correspond
         job_salary_min = job.get('salary_min') or 0
@@ -82,26 +193,52 @@ class SimpleMatcher:
         
         if job_salary_min and job_salary_max:  # Seulement si les deux valeurs existent
             if job_salary_min <= profile_salary_max and job_salary_max >= profile_salary_min:
-                score += 0.05
+                score += self.BONUS_WEIGHTS['salary']
         
         return min(score, 1.0)  # Cap à 1.0
     
     def recommend(self, profile, jobs):
-        """Recommande les meilleures offres pour un profil"""
-        if not jobs:
+        """Recommande les meilleures offres pour un profil (offres en liste ou itérateur)"""
+        index = self._index_for(jobs)
+        if not len(index):
             return []
+        return self._recommend_in(index, profile)
+    
+    def _recommend_in(self, index, profile):
+        """Recommandations d'un profil dans un index d'offres"""
+        candidates = None
+        columns = index.columns
+        if self.prefilter:
+            candidates = self._filter_index_for(index).candidates(profile, self.prefilter_fields)
+            if candidates is not None:
+                # Préfiltrage strict : seules les offres retenues sont scorées
+                columns = columns.subset(candidates)
         
-        similarities = self.calculate_similarity(profile, jobs)
+        similarities = index.scores(self._profile_matrix([profile]), candidates)[0]
         
-        # Ajouter les scores additionnels
-        final_scores = []
-        for i, base_score in enumerate(similarities):
-            final_score = self.add_score_filtering(profile, jobs[i], base_score)
-            final_scores.append(final_score)
+        # Ajouter les scores additionnels (vectorisé sur toutes les offres)
+        final_scores = apply_bonus(similarities, profile, columns, self.BONUS_WEIGHTS)
         
-        # Créer les recommandations
+        return self._select_recommendations(final_scores, index.jobs, candidates)
+    
+    def _filter_index_for(self, index):
+        """Index inversés de préfiltrage de l'index d'offres (construits une fois par index)"""
+        built_for, filter_index = self._filter_index
+        if built_for is not index:
+            filter_index = JobFilterIndex(index.columns)
+            self._filter_index = (index, filter_index)
+        return filter_index
+    
+    def _select_recommendations(self, final_scores, jobs, candidates=None):
+        """Construit les TOP N recommandations à partir des scores finaux
+        
+        candidates : ids des offres correspondant à final_scores (toutes si None).
+        """
         recommendations = []
-        for i, job in enumerate(jobs):
+        for i in top_n_indices(final_scores, TOP_N_RECOMMENDATIONS):
+            if final_scores[i] < MIN_MATCH_SCORE:
+                break
+            job = jobs[i if candidates is None else candidates[i]]
             recommendations.append({
                 'job_id': job['id'],
                 'job_title': job['title'],
@@ -112,8 +249,33 @@ class SimpleMatcher:
                 'url': job.get('url', '#')  # À ajouter plus tard
             })
         
-        # Trier par score et retourner les TOP N
-        recommendations.sort(key=lambda x: x['score'], reverse=True)
-        recommendations = [r for r in recommendations if r['score'] >= MIN_MATCH_SCORE]
+        return recommendations
+    
+    def recommend_batch(self, profiles, jobs):
+        """Recommande les meilleures offres pour chaque profil d'une liste
+        
+        Le catalogue n'est vectorisé qu'une fois; les profils sont transformés
+        en matrice creuse et scorés par blocs bornés par BATCH_MAX_CELLS.
+        """
+        if not profiles:
+            return []
+        
+        index = self._index_for(jobs)
+        if not len(index):
+            return [[] for _ in profiles]
+        if self.prefilter:
+            # Candidats propres à chaque profil : scoring restreint profil par profil
+            return [self._recommend_in(index, profile) for profile in profiles]
+        
+        profile_matrix = self._profile_matrix(profiles)
+        chunk_size = max(1, BATCH_MAX_CELLS // len(index))
+        all_recommendations = []
+        for start in range(0, len(profiles), chunk_size):
+            chunk_profiles = profiles[start:start + chunk_size]
+            similarities = index.scores(profile_matrix[start:start + chunk_size])
+            final_scores = apply_bonus_batch(similarities, chunk_profiles, index.columns, self.BONUS_WEIGHTS)
+            
+            for row in final_scores:
+                all_recommendations.append(self._select_recommendations(row, index.jobs))
         
-        return recommendations[:TOP_N_RECOMMENDATIONS]
\ No newline at end of file
+        return all_recommendations
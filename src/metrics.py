@@ -0,0 +1,237 @@
+# Instrumentation : chronomètres par étape, compteurs et histogrammes au format texte Prometheus
+
+import bisect
+import threading
+import time
+from functools import wraps
+from config import METRICS_ENABLED
+
+# Bornes des histogrammes de latence (secondes)
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+                   30.0, 60.0, 300.0)
+
+
+def _format_labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ''
+    escaped = (str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, v in pairs)
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + '}'
+
+
+def _format_value(value):
+    return repr(float(value)) if value != float('inf') else '+Inf'
+
+
+class Counter:
+    """Compteur monotone, une valeur par combinaison de labels"""
+
+    kind = 'counter'
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.exposed_name = f"{name}_total"
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(labels.get(name, '') for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._values.get(tuple(labels.get(name, '') for name in self.labelnames), 0)
+
+    def samples(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            yield f"{self.exposed_name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+
+
+class Histogram:
+    """Histogramme cumulatif (buckets, somme et nombre d'observations) par combinaison de labels"""
+
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.exposed_name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(labels.get(name, '') for name in self.labelnames)
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][i] += 1
+            series[1] += value
+            series[2] += 1
+
+    def totals(self):
+        """{labels: (nombre, somme)} de toutes les séries"""
+        with self._lock:
+            return {key: (series[2], series[1]) for key, series in self._series.items()}
+
+    def samples(self):
+        with self._lock:
+            items = sorted((key, ([*series[0]], series[1], series[2])) for key, series in self._series.items())
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += bucket_count
+                labels = _format_labels(self.labelnames, key, [('le', _format_value(bound))])
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            labels = _format_labels(self.labelnames, key)
+            yield f"{self.name}_sum{labels} {_format_value(total)}"
+            yield f"{self.name}_count{labels} {count}"
+
+
+class _NullTimer:
+    """Chronomètre inactif (instrumentation désactivée) : aucun appel d'horloge"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class _StageTimer:
+    __slots__ = ('registry', 'stage', 'start')
+
+    def __init__(self, registry, stage):
+        self.registry = registry
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.registry.stage_seconds.observe(time.perf_counter() - self.start, stage=self.stage)
+        return False
+
+
+class MetricsRegistry:
+    """Métriques du processus; timer() et timed() ne coûtent qu'un test de booléen si désactivé"""
+
+    def __init__(self, enabled=METRICS_ENABLED):
+        self.enabled = enabled
+        self._metrics = {}
+        self.stage_seconds = self.histogram(
+            'job_reco_stage_duration_seconds', "Durée des étapes de la chaîne de recommandation", ['stage']
+        )
+
+    def _register(self, metric):
+        return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._register(Counter(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def timer(self, stage):
+        """Chronomètre d'une étape : `with metrics.timer("score"): ...`"""
+        if not self.enabled:
+            return _NULL_TIMER
+        return _StageTimer(self, stage)
+
+    def timed(self, stage):
+        """Décorateur chronométrant chaque appel d'une fonction comme une étape"""
+        def decorator(func):
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                start = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self.stage_seconds.observe(time.perf_counter() - start, stage=stage)
+            return wrapper
+        return decorator
+
+    def stage_totals(self):
+        """{étape: (nombre d'appels, secondes cumulées)}"""
+        return {key[0]: totals for key, totals in self.stage_seconds.totals().items()}
+
+    def render(self):
+        """Toutes les métriques au format texte d'exposition Prometheus (version 0.0.4)"""
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.exposed_name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.exposed_name} {metric.kind}")
+            lines.extend(metric.samples())
+        return '\n'.join(lines) + '\n'
+
+
+class StageSummary:
+    """Durées par étape pendant un bloc (ex: la tâche quotidienne), par différence des totaux"""
+
+    def __init__(self, registry):
+        self.registry = registry
+        self.stages = {}
+
+    def __enter__(self):
+        self._before = self.registry.stage_totals()
+        return self
+
+    def __exit__(self, *exc):
+        for stage, (count, seconds) in self.registry.stage_totals().items():
+            old_count, old_seconds = self._before.get(stage, (0, 0.0))
+            if count > old_count:
+                self.stages[stage] = {'calls': count - old_count, 'seconds': seconds - old_seconds}
+        return False
+
+    def format(self):
+        """Tableau texte des étapes, de la plus longue à la plus courte"""
+        rows = sorted(self.stages.items(), key=lambda item: -item[1]['seconds'])
+        return '\n'.join(f"  {stage:<16} {s['seconds']:>9.3f} s  ({s['calls']} appels)" for stage, s in rows)
+
+
+# Registre partagé par le processus
+metrics = MetricsRegistry()
+
+emails_total = metrics.counter('job_reco_emails', "Emails de recommandations par résultat", ['status'])
+
+
+def init_metrics(app, registry=metrics):
+    """Chronomètre les requêtes HTTP de l'app Flask et expose GET /metrics"""
+    from flask import Response, g, request
+    request_seconds = registry.histogram(
+        'job_reco_http_request_duration_seconds', "Latence des requêtes HTTP", ['endpoint', 'method', 'status']
+    )
+
+    @app.before_request
+    def _start_timer():
+        if registry.enabled:
+            g.metrics_start = time.perf_counter()
+
+    @app.after_request
+    def _observe_request(response):
+        start = g.pop('metrics_start', None)
+        if start is not None:
+            request_seconds.observe(
+                time.perf_counter() - start,
+                endpoint=request.endpoint or 'inconnu', method=request.method, status=response.status_code
+            )
+        return response
+
+    @app.route('/metrics')
+    def prometheus_metrics():
+        return Response(registry.render(), mimetype='text/plain; version=0.0.4')
+
+    return app
@@ -0,0 +1,148 @@
+# Registre des modèles d'embeddings
+
+import hashlib
+import json
+import os
+import shutil
+import uuid
+from datetime import datetime
+from pathlib import Path
+from config import MODELS_DIR
+
+
+class ModelStore:
+    """Registre versionné des modèles entraînés, indexés par l'empreinte du corpus"""
+
+    def __init__(self, models_dir=MODELS_DIR):
+        self.models_dir = Path(models_dir)
+
+    @staticmethod
+    def corpus_digest(params):
+        """Empreinte incrémentale d'un corpus, initialisée avec les hyperparamètres"""
+        digest = hashlib.sha256()
+        digest.update(json.dumps(params, sort_keys=True).encode('utf-8'))
+        return digest
+
+    @staticmethod
+    def update_digest(digest, text):
+        """Ajoute un texte brut à l'empreinte du corpus"""
+        digest.update(text.encode('utf-8'))
+        digest.update(b'\x00')
+
+    @staticmethod
+    def key_from_digest(digest, params):
+        """Clé de version à partir de l'empreinte complète du corpus"""
+        return f"{params.get('model_type', 'model')}-{digest.hexdigest()[:16]}"
+
+    @staticmethod
+    def compute_key(texts, params):
+        """Calcule l'empreinte d'un corpus (textes bruts) et des hyperparamètres"""
+        digest = ModelStore.corpus_digest(params)
+        for text in texts:
+            ModelStore.update_digest(digest, text)
+        return ModelStore.key_from_digest(digest, params)
+
+    def model_dir(self, key):
+        """Retourne le dossier d'une version de modèle"""
+        return self.models_dir / key
+
+    def artifact_path(self, key, name):
+        """Chemin d'un artefact stocké à côté d'une version de modèle"""
+        return self.model_dir(key) / name
+
+    def exists(self, key):
+        """Indique si une version de modèle est déjà enregistrée"""
+        return (self.model_dir(key) / 'meta.json').exists()
+
+    def _publish(self, key, params, write, meta=None):
+        """Écrit une version dans un dossier temporaire puis la publie par renommage
+
+        Le dossier temporaire est propre au processus : plusieurs processus
+        (workers Flask, pool du pipeline) peuvent entraîner la même clé en même
+        temps. Le premier renommage publie la version; les suivants trouvent
+        le dossier cible déjà en place et abandonnent leur copie, identique
+        puisque la clé est l'empreinte du corpus et des hyperparamètres.
+        """
+        target = self.model_dir(key)
+        tmp_dir = target.with_name(f"{target.name}.{os.getpid()}.{uuid.uuid4().hex}.tmp")
+        tmp_dir.mkdir(parents=True)
+
+        write(tmp_dir)
+
+        meta = {
+            'key': key,
+            'params': params,
+            **(meta or {}),
+            'created_at': datetime.now().isoformat()
+        }
+        with open(tmp_dir / 'meta.json', 'w', encoding='utf-8') as f:
+            json.dump(meta, f, ensure_ascii=False, indent=2)
+
+        # rename() d'un dossier échoue si la cible existe déjà (non vide) : jamais de version absente
+        try:
+            tmp_dir.rename(target)
+        except OSError:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            if not self.exists(key):
+                raise
+            print(f"✓ Modèle déjà publié: {target}")
+            return target
+        print(f"✓ Modèle enregistré: {target}")
+        return target
+
+    def save(self, key, wv, params, meta=None):
+        """Enregistre les vecteurs d'un modèle entraîné (meta : métadonnées ajoutées)"""
+        # sep_limit=0 : tous les tableaux numpy dans des fichiers séparés (mmap possible)
+        return self._publish(
+            key, params,
+            lambda tmp_dir: wv.save(str(tmp_dir / 'vectors.kv'), sep_limit=0),
+            {'vocab_size': len(wv), **(meta or {})}
+        )
+
+    def load(self, key, mmap='r'):
+        """Charge les vecteurs d'une version (memory-mapped par défaut)"""
+        from gensim.models import KeyedVectors
+        path = self.model_dir(key) / 'vectors.kv'
+        wv = KeyedVectors.load(str(path), mmap=mmap)
+        print(f"✓ Modèle chargé: {key} ({len(wv)} mots)")
+        return wv
+
+    def save_tfidf(self, key, vectorizer, matrix, params):
+        """Enregistre un vectoriseur TF-IDF ajusté et la matrice CSR des offres"""
+        import joblib
+        from scipy import sparse
+
+        def write(tmp_dir):
+            joblib.dump(vectorizer, tmp_dir / 'vectorizer.joblib')
+            sparse.save_npz(tmp_dir / 'job_matrix.npz', matrix)
+
+        return self._publish(key, params, write, {'vocab_size': len(vectorizer.vocabulary_)})
+
+    def load_tfidf(self, key):
+        """Charge le vectoriseur TF-IDF et la matrice CSR des offres d'une version"""
+        import joblib
+        from scipy import sparse
+        vectorizer = joblib.load(self.model_dir(key) / 'vectorizer.joblib')
+        matrix = sparse.load_npz(self.model_dir(key) / 'job_matrix.npz').tocsr()
+        print(f"✓ Modèle chargé: {key} ({len(vectorizer.vocabulary_)} termes)")
+        return vectorizer, matrix
+
+    def load_meta(self, key):
+        """Retourne les métadonnées d'une version"""
+        with open(self.model_dir(key) / 'meta.json', 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def latest(self, params):
+        """Clé de la version la plus récente entraînée avec ces hyperparamètres, ou None"""
+        versions = [(meta['created_at'], key) for key, meta in
+                    ((key, self.load_meta(key)) for key in self.list_models()) if meta.get('params') == params]
+        return max(versions)[1] if versions else None
+
+    def list_models(self):
+        """Liste les versions enregistrées"""
+        if not self.models_dir.exists():
+            return []
+        return sorted(
+            p.name for p in self.models_dir.iterdir()
+            if (p / 'meta.json').exists()
+        )
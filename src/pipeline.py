@@ -0,0 +1,388 @@
+# Tâche quotidienne découpée en étapes avec points de reprise :
+# chargement -> embeddings -> scoring -> rendu -> envoi
+
+import argparse
+import json
+import logging
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from flask import Flask
+from flask_mail import Message
+import config
+from config import (
+    MADAGASCAR_PROFILES_FILE, MADAGASCAR_JOBS_FILE, MODELS_DIR, JOB_STORE_ENABLED,
+    PIPELINE_DIR, PIPELINE_SHARD_SIZE, PIPELINE_WORKERS, RECOMMENDATION_CACHE_ENABLED, RECOMMENDATION_CACHE_FILE
+)
+from src.data_manager import DataManager
+from src.email_service import EmailService, mail
+from src.embeddings_matcher import JOB_VECTORS_FILE, EmbeddingsMatcher, index_artifact_path
+from src.metrics import metrics, StageSummary
+from src.model_store import ModelStore
+from src.recommendation_cache import (
+    RecommendationCache, catalog_fingerprints, catalog_version, refresh_recommendations
+)
+
+logger = logging.getLogger(__name__)
+
+
+def _write_json(path, data):
+    """Écriture atomique : un fichier de shard est complet ou absent"""
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def _read_json(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _load_data(profiles_file, jobs_file):
+    """Profils et offres figés de l'exécution (offres déjà dédoublonnées par l'étape load)"""
+    dm = DataManager(dedup=False)
+    dm.load_profiles(profiles_file)
+    if JOB_STORE_ENABLED:
+        # Store construit à côté de l'instantané, dans le dossier de l'exécution
+        dm.load_job_store(jobs_file, directory=Path(jobs_file).with_suffix('.store'))
+    else:
+        dm.load_scraped_jobs(jobs_file)
+    return dm.profiles, dm.jobs
+
+
+# État d'un processus de scoring, chargé une fois par processus
+_worker = {}
+
+
+def _init_score_worker(profiles_file, jobs_file, model_type, models_dir, model, cache_file, catalog_file):
+    """Charge les données, le modèle et les vecteurs d'offres (enregistrés par l'étape embed) et le cache
+
+    Les vecteurs sont memory-mapped : aucun processus ne ré-embarque le catalogue.
+    """
+    profiles, jobs = _load_data(profiles_file, jobs_file)
+    matcher = EmbeddingsMatcher(model_type=model_type)
+    matcher.load_from_store(jobs, model['model_key'], store=ModelStore(models_dir), index_key=model['index_key'])
+    _worker.update(profiles=profiles, jobs=jobs, matcher=matcher, cache=None)
+    if cache_file:
+        # Cache de l'exécution précédente, en lecture seule (mis à jour par l'étape send)
+        fingerprints = catalog_fingerprints(jobs)
+        _worker.update(cache=RecommendationCache(cache_file), fingerprints=fingerprints)
+        if not Path(catalog_file).exists():
+            _write_json(Path(catalog_file), {
+                'version': catalog_version(fingerprints, matcher.model_key), 'jobs': fingerprints
+            })
+
+
+def _score_shard(start, stop, output):
+    """Recommandations des profils [start, stop) écrites dans le fichier du shard
+    
+    Avec le cache, seules les offres jamais envoyées au profil sont gardées
+    pour l'email; l'entrée de cache à jour accompagne chaque profil.
+    """
+    profiles = _worker['profiles'][start:stop]
+    statuses = {}
+    if _worker['cache'] is None:
+        all_recommendations = _worker['matcher'].recommend_batch(profiles, _worker['jobs'])
+        entries = [{
+            'name': profile['name'],
+            'email': profile['email'],
+            'recommendations': [{**rec, 'score': float(rec['score'])} for rec in recommendations]
+        } for profile, recommendations in zip(profiles, all_recommendations)]
+    else:
+        refreshed = refresh_recommendations(
+            _worker['matcher'], profiles, _worker['jobs'], _worker['cache'], _worker['fingerprints']
+        )
+        entries = []
+        for profile, result in zip(profiles, refreshed):
+            statuses[result['status']] = statuses.get(result['status'], 0) + 1
+            entries.append({
+                'name': profile['name'],
+                'email': profile['email'],
+                'recommendations': result['new_matches'],
+                'cache': result['entry']
+            })
+    _write_json(Path(output), entries)
+    return output, statuses
+
+
+def _render_shard(scores_file, output, sent_at):
+    """Corps HTML et texte des emails d'un shard (profils sans recommandation ignorés)"""
+    sent_at = datetime.fromisoformat(sent_at)
+    _write_json(Path(output), [{
+        'email': entry['email'],
+        'subject': EmailService._build_subject(sent_at),
+        'html': EmailService._build_email_html(entry['name'], entry['recommendations'], sent_at),
+        'text': EmailService._build_email_text(entry['name'], entry['recommendations'], sent_at)
+    } for entry in _read_json(scores_file) if entry['recommendations']])
+    return output
+
+
+def create_mail_app():
+    """Application Flask minimale pour envoyer les emails hors du serveur web"""
+    app = Flask(__name__)
+    app.config.from_object(config)
+    mail.init_app(app)
+    return app
+
+
+class DailyPipeline:
+    """Tâche quotidienne en étapes, reprenable après un arrêt
+
+    Les profils sont découpés en shards; chaque étape écrit un fichier par
+    shard dans le dossier de l'exécution (run_id, la date du jour par
+    défaut) et les shards déjà écrits sont sautés à la reprise. Les emails
+    envoyés sont inscrits un par un dans sent.ndjson : une reprise n'envoie
+    que les destinataires absents du journal.
+    """
+
+    STAGES = ("load", "embed", "score", "render", "send")
+
+    def __init__(self, run_id=None, profiles_file=MADAGASCAR_PROFILES_FILE, jobs_file=MADAGASCAR_JOBS_FILE,
+                 shard_size=PIPELINE_SHARD_SIZE, workers=PIPELINE_WORKERS, pipeline_dir=PIPELINE_DIR,
+                 model_type="word2vec", models_dir=MODELS_DIR,
+                 cache_file=RECOMMENDATION_CACHE_FILE if RECOMMENDATION_CACHE_ENABLED else None):
+        self.run_id = run_id or datetime.now().strftime('%Y-%m-%d')
+        self.run_dir = Path(pipeline_dir) / self.run_id
+        self.source_jobs_file = str(jobs_file)
+        self.jobs_file = str(self.run_dir / 'jobs.json')
+        self.source_profiles_file = str(profiles_file)
+        self.profiles_file = str(self.run_dir / 'profiles.json')
+        self.shard_size = shard_size
+        self.workers = workers
+        self.model_type = model_type
+        self.models_dir = str(models_dir)
+        self.cache_file = str(cache_file) if cache_file else None
+        self.manifest = None
+        self._ledger_lock = threading.Lock()
+
+    @property
+    def ledger_file(self):
+        return self.run_dir / 'sent.ndjson'
+
+    def _shard_file(self, stage, shard_id):
+        return self.run_dir / stage / f"shard-{shard_id:05d}.json"
+
+    @property
+    def model_file(self):
+        return self.run_dir / 'model.json'
+
+    def _pending(self, stage):
+        return [i for i in range(self.manifest['n_shards']) if not self._shard_file(stage, i).exists()]
+
+    def load(self):
+        """Fige les profils, les offres (dédoublonnées) et le découpage en shards de l'exécution
+
+        À la reprise, les étapes suivantes relisent ces instantanés : les
+        vecteurs enregistrés par embed restent alignés sur les offres même si
+        le catalogue source a changé entre-temps.
+        """
+        manifest_file = self.run_dir / 'manifest.json'
+        if manifest_file.exists():
+            self.manifest = _read_json(manifest_file)
+            logger.info(f"↻ Reprise de l'exécution {self.run_id}")
+            return
+
+        self.run_dir.mkdir(parents=True, exist_ok=True)
+        dm = DataManager()
+        dm.load_profiles(self.source_profiles_file)
+        dm.load_scraped_jobs(self.source_jobs_file)
+        _write_json(Path(self.profiles_file), {'profiles': dm.profiles})
+        _write_json(Path(self.jobs_file), {'jobs': dm.jobs})
+        n_profiles = len(dm.profiles)
+        self.manifest = {
+            'run_id': self.run_id,
+            'n_profiles': n_profiles,
+            'shard_size': self.shard_size,
+            'n_shards': (n_profiles + self.shard_size - 1) // self.shard_size,
+            'n_jobs': len(dm.jobs),
+            'source_jobs_file': self.source_jobs_file,
+            'sent_at': datetime.now().isoformat()
+        }
+        _write_json(manifest_file, self.manifest)
+        logger.info(f"✓ {n_profiles} profils en {self.manifest['n_shards']} shards, {len(dm.jobs)} offres")
+
+    def embed(self):
+        """Charge ou entraîne le modèle et enregistre les vecteurs d'offres, une fois par exécution
+
+        Le modèle de l'exécution précédente est réutilisé tant que la dérive
+        du vocabulaire des offres le permet : sa clé ne change pas et le cache
+        ne rescore que les offres ajoutées ou modifiées. Les processus de
+        scoring lisent ensuite le modèle et les vecteurs dans le registre; la
+        version retenue est notée dans model.json.
+        """
+        if not self._pending('scores'):
+            return
+        store = ModelStore(self.models_dir)
+        if self.model_file.exists():
+            model = _read_json(self.model_file)
+            if index_artifact_path(store, model['model_key'], model['index_key'], JOB_VECTORS_FILE).exists():
+                logger.info(f"↻ Modèle {model['model_key'][:12]} déjà prêt")
+                return
+        profiles, jobs = _load_data(self.profiles_file, self.jobs_file)
+        matcher = EmbeddingsMatcher(model_type=self.model_type)
+        matcher.load_or_train(profiles, jobs, store=store, reuse=True)
+        matcher.save_job_vectors(store)
+        _write_json(self.model_file, {'model_key': matcher.model_key, 'index_key': matcher.index_key})
+        logger.info(f"✓ Modèle {matcher.model_key[:12]} prêt")
+
+    def score(self):
+        """Recommandations de chaque shard restant, dans un pool de processus"""
+        pending = self._pending('scores')
+        if not pending:
+            return
+        if not self.model_file.exists():
+            self.embed()
+        model = _read_json(self.model_file)
+        (self.run_dir / 'scores').mkdir(exist_ok=True)
+        shard_size = self.manifest['shard_size']
+        with ProcessPoolExecutor(
+            max_workers=self.workers, initializer=_init_score_worker,
+            initargs=(self.profiles_file, self.jobs_file, self.model_type, self.models_dir, model,
+                      self.cache_file, str(self.run_dir / 'catalog.json'))
+        ) as executor:
+            futures = [
+                executor.submit(_score_shard, i * shard_size, (i + 1) * shard_size,
+                                str(self._shard_file('scores', i)))
+                for i in pending
+            ]
+            for future in futures:
+                output, statuses = future.result()
+                details = f" {statuses}" if statuses else ""
+                logger.info(f"✓ Scores: {Path(output).name}{details}")
+
+    def render(self):
+        """Emails de chaque shard restant, rendus dans un pool de processus"""
+        pending = self._pending('rendered')
+        if not pending:
+            return
+        (self.run_dir / 'rendered').mkdir(exist_ok=True)
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            futures = [
+                executor.submit(_render_shard, str(self._shard_file('scores', i)),
+                                str(self._shard_file('rendered', i)), self.manifest['sent_at'])
+                for i in pending
+            ]
+            for future in futures:
+                logger.info(f"✓ Rendu: {Path(future.result()).name}")
+
+    def sent_emails(self):
+        """Destinataires déjà inscrits dans le journal d'envoi"""
+        if not self.ledger_file.exists():
+            return set()
+        sent = set()
+        with open(self.ledger_file, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    sent.add(json.loads(line)['email'])
+                except ValueError:
+                    continue  # Dernière ligne tronquée par un arrêt brutal
+        return sent
+
+    def _terminate_ledger(self):
+        """Termine une dernière ligne tronquée pour que les ajouts suivants restent lisibles"""
+        if not self.ledger_file.exists() or self.ledger_file.stat().st_size == 0:
+            return
+        with open(self.ledger_file, 'rb+') as f:
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b'\n':
+                f.write(b'\n')
+
+    def _record_sent(self, result):
+        """Inscrit un envoi réussi dès sa confirmation par le serveur SMTP"""
+        if not result['success']:
+            return
+        with self._ledger_lock, open(self.ledger_file, 'a', encoding='utf-8') as f:
+            f.write(json.dumps({'email': result['email'], 'at': datetime.now().isoformat()}) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+
+    def send(self, app=None):
+        """Envoie les emails non encore inscrits au journal, shard par shard"""
+        app = app or create_mail_app()
+        sent = self.sent_emails()
+        self._terminate_ledger()
+        summary = {'sent': 0, 'failed': 0, 'skipped': 0}
+
+        for i in range(self.manifest['n_shards']):
+            entries = []
+            for entry in _read_json(self._shard_file('rendered', i)):
+                if entry['email'] in sent:
+                    summary['skipped'] += 1
+                else:
+                    entries.append(entry)
+                    sent.add(entry['email'])
+            if not entries:
+                continue
+
+            with app.app_context():
+                messages = [
+                    Message(subject=e['subject'], recipients=[e['email']], html=e['html'], body=e['text'])
+                    for e in entries
+                ]
+            results = EmailService.send_messages(messages, app=app, on_result=self._record_sent)
+            for result in results:
+                if result['success']:
+                    summary['sent'] += 1
+                else:
+                    summary['failed'] += 1
+                    logger.error(f"✗ Échec de l'envoi à {result['email']} "
+                                 f"({result['attempts']} tentatives): {result['error']}")
+
+        if self.cache_file:
+            self._update_cache()
+        logger.info(f"✓ Emails envoyés: {summary['sent']}, échecs: {summary['failed']}, "
+                    f"déjà envoyés: {summary['skipped']}")
+        return summary
+
+    def _update_cache(self):
+        """Enregistre les recommandations de l'exécution et les offres effectivement envoyées"""
+        cache = RecommendationCache(self.cache_file)
+        catalog = _read_json(self.run_dir / 'catalog.json')
+        sent = self.sent_emails()
+        for i in range(self.manifest['n_shards']):
+            for entry in _read_json(self._shard_file('scores', i)):
+                cache.update(entry['cache'])
+                if entry['email'] in sent:
+                    cache.mark_sent(entry['email'], [rec['job_id'] for rec in entry['recommendations']])
+        cache.catalogs[catalog['version']] = catalog['jobs']
+        cache.save()
+
+    def run(self, app=None, stages=STAGES):
+        """Exécute (ou reprend) les étapes demandées; retourne le bilan de l'envoi"""
+        with metrics.timer("pipeline_load"):
+            self.load()
+        summary = None
+        for stage in stages:
+            if stage == "load":
+                continue
+            with metrics.timer(f"pipeline_{stage}"):
+                if stage == "send":
+                    summary = self.send(app)
+                else:
+                    getattr(self, stage)()
+        return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tâche quotidienne de recommandation (reprenable)")
+    parser.add_argument('--run-id', help="identifiant de l'exécution (défaut : date du jour)")
+    parser.add_argument('--profiles', default=str(MADAGASCAR_PROFILES_FILE))
+    parser.add_argument('--jobs', default=str(MADAGASCAR_JOBS_FILE))
+    parser.add_argument('--shard-size', type=int, default=PIPELINE_SHARD_SIZE)
+    parser.add_argument('--workers', type=int, default=PIPELINE_WORKERS)
+    parser.add_argument('--stages', nargs='*', choices=DailyPipeline.STAGES, default=list(DailyPipeline.STAGES))
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(message)s')
+    pipeline = DailyPipeline(run_id=args.run_id, profiles_file=args.profiles, jobs_file=args.jobs,
+                             shard_size=args.shard_size, workers=args.workers)
+    with StageSummary(metrics) as timings:
+        pipeline.run(stages=args.stages)
+    logger.info(f"Durées par étape:\n{timings.format()}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+# Préfiltrage strict des offres par index inversés (localisation, type de contrat, salaire)
+
+import numpy as np
+from src.scoring import _salary_bounds
+
+# Filtres disponibles pour le préfiltrage
+FILTER_FIELDS = ("location", "job_type", "salary")
+
+
+def _postings(codes, n_codes):
+    """Listes inversées code -> ids au format CSR (ids triés dans chaque liste)"""
+    order = np.argsort(codes, kind='stable').astype(np.int64)
+    counts = np.bincount(codes, minlength=n_codes)
+    offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+    return order, offsets
+
+
+class JobFilterIndex:
+    """Index inversés sur les colonnes des offres pour restreindre les candidats avant le scoring
+
+    Chaque filtre donne une liste d'ids; les filtres combinés sont
+    intersectés sous forme de bitmaps. Un filtre sans critère dans le profil
+    (localisation vide, aucun type de contrat) est ignoré.
+    """
+
+    def __init__(self, columns):
+        self.n_jobs = len(columns)
+        self.location_ids = columns.location_ids
+        self.job_type_ids = columns.job_type_ids
+        self._location_postings = _postings(columns.location_codes, len(columns.location_ids))
+        self._job_type_postings = _postings(columns.job_type_codes, len(columns.job_type_values))
+
+        # Index d'intervalles : offres à salaire connu triées par minimum, et par maximum
+        known = np.flatnonzero(~np.isnan(columns.salary_min))
+        self._by_min = known[np.argsort(columns.salary_min[known], kind='stable')]
+        self._min_sorted = columns.salary_min[self._by_min]
+        self._by_max = known[np.argsort(columns.salary_max_filled[known], kind='stable')]
+        self._max_sorted = columns.salary_max_filled[self._by_max]
+        self._unknown_salary = np.flatnonzero(np.isnan(columns.salary_min))
+
+    def __len__(self):
+        return self.n_jobs
+
+    @staticmethod
+    def _posting(postings, code):
+        ids, offsets = postings
+        return ids[offsets[code]:offsets[code + 1]]
+
+    def bitmap(self, ids):
+        """Bitmap (tableau booléen) des offres d'une liste d'ids"""
+        mask = np.zeros(self.n_jobs, dtype=bool)
+        mask[ids] = True
+        return mask
+
+    def location_ids_for(self, profile):
+        """Offres dont la localisation est celle du profil, None sans critère"""
+        location = (profile.get('desired_location') or '').lower()
+        if not location:
+            return None
+        code = self.location_ids.get(location)
+        if code is None:
+            return np.array([], dtype=np.int64)
+        return self._posting(self._location_postings, code)
+
+    def job_type_ids_for(self, profile):
+        """Offres dont le type de contrat fait partie des souhaits du profil, None sans critère"""
+        wanted = profile.get('job_types') or []
+        if not wanted:
+            return None
+        codes = [self.job_type_ids[t] for t in wanted if t in self.job_type_ids]
+        if len(codes) == 1:
+            return self._posting(self._job_type_postings, codes[0])
+        ids = [self._posting(self._job_type_postings, code) for code in codes]
+        return np.sort(np.concatenate(ids)) if ids else np.array([], dtype=np.int64)
+
+    def salary_ids_for(self, profile):
+        """Offres dont la fourchette recoupe celle du profil; un salaire inconnu n'exclut pas l'offre"""
+        if profile.get('salary_min') is None and profile.get('salary_max') is None:
+            return None
+        profile_min, profile_max = _salary_bounds(profile)
+        min_ok = self._by_min[:np.searchsorted(self._min_sorted, profile_max, side='right')]
+        max_ok = self._by_max[np.searchsorted(self._max_sorted, profile_min, side='left'):]
+        mask = self.bitmap(min_ok) & self.bitmap(max_ok)
+        mask[self._unknown_salary] = True
+        return np.flatnonzero(mask)
+
+    def candidates(self, profile, fields=FILTER_FIELDS):
+        """Ids triés des offres qui passent tous les filtres demandés, None si aucun ne s'applique"""
+        lookups = {
+            'location': self.location_ids_for,
+            'job_type': self.job_type_ids_for,
+            'salary': self.salary_ids_for
+        }
+        selected = [ids for ids in (lookups[field](profile) for field in fields) if ids is not None]
+        if not selected:
+            return None
+        if len(selected) == 1:
+            return np.asarray(selected[0], dtype=np.int64)
+
+        # Intersection des bitmaps
+        mask = self.bitmap(selected[0])
+        for ids in selected[1:]:
+            mask &= self.bitmap(ids)
+        return np.flatnonzero(mask)
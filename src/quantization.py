@@ -0,0 +1,300 @@
+# Quantification de l'index d'offres (float16, int8, product quantization)
+
+import os
+import time
+from pathlib import Path
+import numpy as np
+from config import PQ_SUBSPACES
+from src.job_index import normalize_rows, top_n_indices
+
+# Lignes décodées par bloc lors du calcul des scores approximatifs
+SCORE_CHUNK_SIZE = 4096
+
+# Vecteurs échantillonnés pour entraîner les dictionnaires du product quantization
+PQ_TRAIN_SAMPLE = 20000
+
+
+class QuantizedVectors:
+    """Vecteurs d'offres compressés : scores approximatifs par bloc, sans matrice float32 complète
+
+    Les vecteurs sont centrés sur leur moyenne avant l'encodage : les
+    embeddings d'offres sont très proches les uns des autres et seuls les
+    écarts à la moyenne départagent les offres (le terme moyenne · requête est
+    commun à toutes).
+    """
+
+    name = None
+
+    def __init__(self):
+        self.codes = None
+        self.mean = None
+
+    def __len__(self):
+        return 0 if self.codes is None else len(self.codes)
+
+    @property
+    def nbytes(self):
+        """Mémoire occupée par les codes (et dictionnaires éventuels)"""
+        return self.codes.nbytes
+
+    def fit(self, vectors):
+        """Encode les vecteurs normalisés de l'index exact"""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        self.mean = vectors.mean(axis=0) if len(vectors) else np.zeros(vectors.shape[1], dtype=np.float32)
+        self._train(vectors - self.mean)
+        self._set_codes(self._encode(vectors - self.mean))
+        return self
+
+    def extended(self, vectors):
+        """Nouvel objet couvrant vectors, dont les premières lignes sont déjà encodées"""
+        extended = self._copy()
+        new = np.asarray(vectors[len(self):], dtype=np.float32) - self.mean
+        extended._set_codes(self._encode(new), append=True)
+        return extended
+
+    def _set_codes(self, codes, append=False):
+        self.codes = np.concatenate([self.codes, codes]) if append else codes
+
+    def _copy(self):
+        copy = self.__class__.__new__(self.__class__)
+        copy.__dict__.update(self.__dict__)
+        return copy
+
+    def save(self, path):
+        """Sauvegarde les codes et paramètres d'encodage (écriture atomique, voir load_quantized)"""
+        path = Path(path)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, method=np.array(self.name), **self._arrays())
+        os.replace(tmp_path, path)
+
+    def _arrays(self):
+        return {'codes': self.codes, 'mean': self.mean}
+
+    def _load_arrays(self, data):
+        self.codes = data['codes']
+        self.mean = data['mean']
+
+    def scores(self, query_vector):
+        """Similarités cosinus approximatives entre une requête normalisée et toutes les offres"""
+        query = np.asarray(query_vector, dtype=np.float32)
+        scores = np.empty(len(self), dtype=np.float32)
+        prepared = self._prepare(query)
+        for start in range(0, len(self), SCORE_CHUNK_SIZE):
+            block = self.codes[start:start + SCORE_CHUNK_SIZE]
+            scores[start:start + len(block)] = self._block_scores(block, start, prepared)
+        return scores + np.float32(self.mean @ query)
+
+    def search(self, query_vector, k):
+        """Ids des k offres aux meilleurs scores approximatifs"""
+        query = np.asarray(query_vector, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if norm == 0 or not len(self):
+            return np.array([], dtype=np.int64)
+        return top_n_indices(self.scores(query / norm), k)
+
+    def _prepare(self, query):
+        return query
+
+    def _train(self, vectors):
+        pass
+
+    def _encode(self, vectors):
+        raise NotImplementedError
+
+    def _block_scores(self, block, start, query):
+        raise NotImplementedError
+
+
+class Float16Vectors(QuantizedVectors):
+    """Demi-précision : 2 octets par dimension"""
+
+    name = "float16"
+
+    def _encode(self, vectors):
+        return np.asarray(vectors, dtype=np.float16)
+
+    def _block_scores(self, block, start, query):
+        return block.astype(np.float32) @ query
+
+
+class Int8Vectors(QuantizedVectors):
+    """Quantification scalaire symétrique : 1 octet par dimension et une échelle float32 par offre"""
+
+    name = "int8"
+
+    def __init__(self):
+        super().__init__()
+        self.scales = np.empty(0, dtype=np.float32)
+
+    @property
+    def nbytes(self):
+        return self.codes.nbytes + self.scales.nbytes
+
+    def _encode(self, vectors):
+        scales = np.abs(vectors).max(axis=1, initial=0.0) / 127
+        scales[scales == 0] = 1.0
+        return np.rint(vectors / scales[:, None]).astype(np.int8), scales.astype(np.float32)
+
+    def _set_codes(self, codes, append=False):
+        codes, scales = codes
+        super()._set_codes(codes, append)
+        self.scales = np.concatenate([self.scales, scales]) if append else scales
+
+    def _arrays(self):
+        return {**super()._arrays(), 'scales': self.scales}
+
+    def _load_arrays(self, data):
+        super()._load_arrays(data)
+        self.scales = data['scales']
+
+    def _block_scores(self, block, start, query):
+        return (block.astype(np.float32) @ query) * self.scales[start:start + len(block)]
+
+
+class PQVectors(QuantizedVectors):
+    """Product quantization : un octet (centroïde) par sous-espace, produits scalaires par table (ADC)"""
+
+    name = "pq"
+
+    def __init__(self, n_subspaces=PQ_SUBSPACES, n_centroids=256, n_iter=15, seed=0):
+        super().__init__()
+        self.n_subspaces = n_subspaces
+        self.n_centroids = n_centroids
+        self.n_iter = n_iter
+        self.seed = seed
+        self.codebooks = None
+
+    @property
+    def nbytes(self):
+        return self.codes.nbytes + self.codebooks.nbytes
+
+    def _arrays(self):
+        params = [self.n_subspaces, self.n_centroids, self.n_iter, self.seed]
+        return {**super()._arrays(), 'codebooks': self.codebooks, 'params': np.array(params, dtype=np.int64)}
+
+    def _load_arrays(self, data):
+        super()._load_arrays(data)
+        self.codebooks = data['codebooks']
+        self.n_subspaces, self.n_centroids, self.n_iter, self.seed = (int(v) for v in data['params'])
+
+    def _train(self, vectors):
+        dim = vectors.shape[1]
+        if dim % self.n_subspaces:
+            raise ValueError(f"{self.n_subspaces} sous-espaces ne divisent pas la dimension {dim}")
+        rng = np.random.default_rng(self.seed)
+        sample = vectors
+        if len(vectors) > PQ_TRAIN_SAMPLE:
+            sample = vectors[np.sort(rng.choice(len(vectors), PQ_TRAIN_SAMPLE, replace=False))]
+        n_centroids = min(self.n_centroids, len(sample))
+        sub_dim = dim // self.n_subspaces
+        self.codebooks = np.stack([
+            self._kmeans(sample[:, j * sub_dim:(j + 1) * sub_dim], n_centroids, rng)
+            for j in range(self.n_subspaces)
+        ])
+
+    def _kmeans(self, points, n_centroids, rng):
+        centroids = points[rng.choice(len(points), n_centroids, replace=False)].copy()
+        for _ in range(self.n_iter):
+            labels = self._nearest(points, centroids)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, labels, points)
+            counts = np.bincount(labels, minlength=n_centroids)
+            filled = counts > 0
+            centroids[filled] = sums[filled] / counts[filled, None]
+        return centroids
+
+    @staticmethod
+    def _nearest(points, centroids):
+        # argmin ||p - c||² = argmin (||c||² - 2 p.c)
+        distances = (centroids ** 2).sum(axis=1) - 2 * points @ centroids.T
+        return np.argmin(distances, axis=1)
+
+    def _encode(self, vectors):
+        sub_dim = vectors.shape[1] // self.n_subspaces
+        codes = np.empty((len(vectors), self.n_subspaces), dtype=np.uint8)
+        for j, codebook in enumerate(self.codebooks):
+            codes[:, j] = self._nearest(vectors[:, j * sub_dim:(j + 1) * sub_dim], codebook)
+        return codes
+
+    def _prepare(self, query):
+        # Table (sous-espace, centroïde) des produits scalaires partiels avec la requête
+        sub_queries = query.reshape(self.n_subspaces, -1)
+        return np.einsum('jd,jcd->jc', sub_queries, self.codebooks)
+
+    def _block_scores(self, block, start, table):
+        return table[np.arange(self.n_subspaces), block].sum(axis=1)
+
+
+QUANTIZERS = {cls.name: cls for cls in (Float16Vectors, Int8Vectors, PQVectors)}
+
+
+def quantize(vectors, method):
+    """Encode les vecteurs normalisés avec la méthode "float16", "int8" ou "pq\""""
+    try:
+        return QUANTIZERS[method]().fit(vectors)
+    except KeyError:
+        raise ValueError(f"Quantification inconnue: {method} (disponibles: {', '.join(QUANTIZERS)})")
+
+
+def load_quantized(path, n_vectors=None):
+    """Charge des vecteurs quantifiés sauvegardés (ValueError s'ils ne couvrent pas n_vectors offres)"""
+    with np.load(path) as data:
+        quantized = QUANTIZERS[str(data['method'])]()
+        quantized._load_arrays(data)
+    if n_vectors is not None and len(quantized) != n_vectors:
+        raise ValueError("Les vecteurs quantifiés ne correspondent pas au catalogue d'offres")
+    return quantized
+
+
+def rerank(vectors, query_vector, candidates, k):
+    """(ids, scores) des k meilleurs candidats re-classés avec les vecteurs float32 exacts"""
+    query = np.asarray(query_vector, dtype=np.float32)
+    norm = np.linalg.norm(query)
+    if norm == 0 or not len(candidates):
+        return np.array([], dtype=np.int64), np.array([], dtype=np.float32)
+    ids = np.sort(candidates)
+    scores = np.asarray(vectors[ids]) @ (query / norm)
+    best = top_n_indices(scores, k)
+    return ids[best], scores[best]
+
+
+def evaluate_agreement(quantized, vectors, queries, k, n_candidates):
+    """Compare les classements quantifiés au classement float32 exact
+
+    Retourne le recouvrement moyen des top k (approximatif seul, puis avec
+    re-classement exact de n_candidates offres) et les latences moyennes.
+    """
+    queries = normalize_rows(queries)
+    approx_overlap, rerank_overlap = [], []
+    exact_time = approx_time = rerank_time = 0.0
+
+    for query in queries:
+        start = time.perf_counter()
+        exact = set(top_n_indices(vectors @ query, k).tolist())
+        exact_time += time.perf_counter() - start
+
+        start = time.perf_counter()
+        approx = quantized.search(query, k)
+        approx_time += time.perf_counter() - start
+
+        start = time.perf_counter()
+        reranked, _ = rerank(vectors, query, quantized.search(query, n_candidates), k)
+        rerank_time += time.perf_counter() - start
+
+        approx_overlap.append(len(exact & set(approx.tolist())) / max(1, len(exact)))
+        rerank_overlap.append(len(exact & set(reranked.tolist())) / max(1, len(exact)))
+
+    n = max(1, len(queries))
+    return {
+        'method': quantized.name,
+        'k': k,
+        'candidates': n_candidates,
+        'bytes_per_job': quantized.nbytes / max(1, len(quantized)),
+        'float32_bytes_per_job': vectors.shape[1] * 4,
+        'topk_overlap': float(np.mean(approx_overlap)) if approx_overlap else 0.0,
+        'topk_overlap_reranked': float(np.mean(rerank_overlap)) if rerank_overlap else 0.0,
+        'exact_ms': 1000 * exact_time / n,
+        'quantized_ms': 1000 * approx_time / n,
+        'reranked_ms': 1000 * rerank_time / n
+    }
@@ -0,0 +1,170 @@
+# Cache des recommandations par profil entre deux exécutions quotidiennes
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from config import RECOMMENDATION_CACHE_FILE, TOP_N_RECOMMENDATIONS
+
+
+def content_hash(data):
+    """Empreinte du contenu d'un dict (toute modification change l'empreinte)"""
+    data = json.dumps(data, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(data.encode('utf-8')).hexdigest()[:16]
+
+
+def profile_hash(profile):
+    """Empreinte du contenu d'un profil"""
+    return content_hash(profile)
+
+
+def catalog_fingerprints(jobs):
+    """Empreinte du contenu de chaque offre d'un catalogue : {id: empreinte}, dans l'ordre du catalogue"""
+    return {str(job['id']): content_hash(job) for job in jobs}
+
+
+def catalog_version(fingerprints, model_key):
+    """Version d'un catalogue scoré par un modèle : empreinte du modèle, des identifiants et des contenus"""
+    digest = hashlib.sha256(f"{model_key}\n".encode('utf-8'))
+    for job_id, fingerprint in fingerprints.items():
+        digest.update(f"{job_id}\t{fingerprint}\n".encode('utf-8'))
+    return digest.hexdigest()[:12]
+
+
+def merge_recommendations(cached, fresh, positions, n=TOP_N_RECOMMENDATIONS):
+    """Top N de deux listes de recommandations (une offre n'apparaît qu'une fois)
+
+    Même ordre que le matcher : score décroissant, égalités départagées par la
+    position de l'offre dans le catalogue (positions : id -> position).
+    """
+    best = {}
+    for rec in list(cached) + list(fresh):
+        if rec['job_id'] not in best or rec['score'] > best[rec['job_id']]['score']:
+            best[rec['job_id']] = rec
+    return sorted(best.values(), key=lambda rec: (-rec['score'], positions[str(rec['job_id'])]))[:n]
+
+
+class RecommendationCache:
+    """Dernières recommandations de chaque profil, avec les offres déjà envoyées
+
+    Une entrée (par email) garde l'empreinte du profil, le modèle et la
+    version du catalogue avec lesquels il a été scoré et ses
+    recommandations. Les empreintes d'offres des versions encore
+    référencées sont conservées pour retrouver les offres ajoutées ou
+    modifiées depuis.
+    """
+
+    def __init__(self, path=RECOMMENDATION_CACHE_FILE):
+        self.path = Path(path)
+        self.profiles = {}
+        self.catalogs = {}
+        if self.path.exists():
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.profiles = data.get('profiles', {})
+            self.catalogs = data.get('catalogs', {})
+
+    def save(self):
+        """Écriture atomique; seules les versions de catalogue encore utilisées sont gardées"""
+        used = {entry['catalog_version'] for entry in self.profiles.values()}
+        self.catalogs = {
+            version: fingerprints for version, fingerprints in self.catalogs.items() if version in used
+        }
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'profiles': self.profiles, 'catalogs': self.catalogs}, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+    def update(self, entry, fingerprints=None):
+        """Enregistre une entrée produite par refresh_recommendations (et les empreintes de son catalogue)"""
+        email = entry['email']
+        sent = set(self.profiles.get(email, {}).get('sent_job_ids', []))
+        self.profiles[email] = {**entry, 'sent_job_ids': sorted(sent | set(entry.get('sent_job_ids', [])))}
+        if fingerprints is not None:
+            self.catalogs[entry['catalog_version']] = fingerprints
+
+    def mark_sent(self, email, job_ids):
+        """Ajoute des offres à celles déjà envoyées au profil"""
+        entry = self.profiles[email]
+        entry['sent_job_ids'] = sorted(set(entry['sent_job_ids']) | set(job_ids))
+
+
+def refresh_recommendations(matcher, profiles, jobs, cache, fingerprints=None):
+    """Recommandations de profils en ne rescorant que ce qui a changé
+
+    - profil inconnu ou modifié, modèle différent (ré-entraîné : ses scores
+      ne sont pas comparables), ou offre recommandée retirée ou modifiée :
+      scoring complet (en lot);
+    - profil et modèle inchangés, offres ajoutées ou modifiées depuis sa
+      version de catalogue : scoring de ces offres seulement, fusionné avec
+      le top N en cache;
+    - profil, modèle et catalogue inchangés : entrée en cache réutilisée.
+
+    fingerprints : empreintes du catalogue (catalog_fingerprints), calculées
+    si absentes. Retourne par profil un dict {'entry', 'new_matches',
+    'status'} : entry est l'entrée de cache à jour (voir
+    RecommendationCache.update), new_matches les recommandations jamais
+    envoyées au profil.
+    """
+    fingerprints = fingerprints if fingerprints is not None else catalog_fingerprints(jobs)
+    version = catalog_version(fingerprints, matcher.model_key)
+    positions = {job_id: i for i, job_id in enumerate(fingerprints)}
+    changed_since = {}
+
+    def changed_positions(old_version):
+        # Offres ajoutées ou modifiées depuis une version (calculé une fois par version)
+        if old_version not in changed_since:
+            old = cache.catalogs[old_version]
+            changed_since[old_version] = [
+                positions[job_id] for job_id, fingerprint in fingerprints.items() if old.get(job_id) != fingerprint
+            ]
+        return changed_since[old_version]
+
+    def unchanged(job_id, old_version):
+        job_id = str(job_id)
+        return job_id in fingerprints and cache.catalogs[old_version].get(job_id) == fingerprints[job_id]
+
+    results = [None] * len(profiles)
+    full = []
+    for i, profile in enumerate(profiles):
+        key = profile_hash(profile)
+        entry = cache.profiles.get(profile['email'])
+        if (entry is None or entry['profile_hash'] != key or entry.get('model_key') != matcher.model_key
+                or entry['catalog_version'] not in cache.catalogs
+                or not all(unchanged(rec['job_id'], entry['catalog_version']) for rec in entry['recommendations'])):
+            full.append(i)
+            continue
+
+        if entry['catalog_version'] == version:
+            recommendations, status = entry['recommendations'], 'reused'
+        else:
+            changed = changed_positions(entry['catalog_version'])
+            fresh = matcher.recommend_among(profile, jobs, changed) if changed else []
+            recommendations = merge_recommendations(entry['recommendations'], fresh, positions)
+            status = 'incremental'
+        results[i] = (recommendations, status)
+
+    if full:
+        batch = matcher.recommend_batch([profiles[i] for i in full], jobs)
+        for i, recommendations in zip(full, batch):
+            results[i] = (recommendations, 'full')
+
+    refreshed = []
+    for profile, (recommendations, status) in zip(profiles, results):
+        recommendations = [{**rec, 'score': float(rec['score'])} for rec in recommendations]
+        previous = cache.profiles.get(profile['email'], {})
+        sent = set(previous.get('sent_job_ids', []))
+        refreshed.append({
+            'entry': {
+                'email': profile['email'],
+                'profile_hash': profile_hash(profile),
+                'model_key': matcher.model_key,
+                'catalog_version': version,
+                'recommendations': recommendations,
+                'sent_job_ids': sorted(sent)
+            },
+            'new_matches': [rec for rec in recommendations if rec['job_id'] not in sent],
+            'status': status
+        })
+    return refreshed
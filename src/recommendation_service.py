@@ -0,0 +1,340 @@
+# Service de recommandation partagé par le processus (données + modèle chargés une fois)
+
+import copy
+import hashlib
+import itertools
+import logging
+import os
+import threading
+import time
+from config import (
+    MADAGASCAR_PROFILES_FILE, MADAGASCAR_JOBS_FILE, SCRAPED_JOBS_FILE, EMBEDDING_MODEL, RELOAD_WATCH_INTERVAL,
+    JOB_STORE_ENABLED, RECOMMENDATION_ENGINES, DEFAULT_ENGINE, DEDUP_ENABLED
+)
+from src.data_manager import DataManager, is_ndjson, validate_jobs
+from src.dedup import MinHashLSH, cached_signatures, unique_jobs
+from src.embeddings_matcher import EmbeddingsMatcher
+from src.hybrid_matcher import HybridMatcher
+from src.matcher import SimpleMatcher
+
+logger = logging.getLogger(__name__)
+
+
+class ServiceState:
+    """Instantané cohérent des profils, des offres et du matcher entraîné
+
+    Un état n'est jamais modifié après sa création : un rechargement en
+    construit un nouveau puis remplace la référence d'un seul coup.
+    """
+
+    def __init__(self, profiles, jobs, matcher, file_stamps, sparse_matcher=None):
+        self.profiles = profiles
+        self.jobs = jobs
+        self.matcher = matcher
+        self.sparse_matcher = sparse_matcher
+        self.file_stamps = file_stamps
+        # Index MinHash LSH du catalogue, construit à la première ingestion (voir RecommendationService.ingest_jobs)
+        self.dedup_index = None
+        self.matchers = {matcher.model_type: matcher}
+        if sparse_matcher is not None:
+            self.matchers['tfidf'] = sparse_matcher
+            self.matchers['hybrid'] = HybridMatcher(matcher, sparse_matcher)
+        self.loaded_at = time.time()
+        self.version = hashlib.sha1(
+            f"{matcher.model_key}:{len(jobs)}:{sorted(file_stamps.items())}".encode('utf-8')
+        ).hexdigest()[:12]
+
+    def get_profile(self, profile_id):
+        """Récupère un profil par ID"""
+        return next((p for p in self.profiles if p['id'] == profile_id), None)
+
+    def get_matcher(self, engine=None):
+        """Matcher d'un moteur ("word2vec", "tfidf", "hybrid"...), DEFAULT_ENGINE si None"""
+        if engine is None:
+            return self.matchers.get(DEFAULT_ENGINE, self.matcher)
+        try:
+            return self.matchers[engine]
+        except KeyError:
+            raise ValueError(f"Moteur inconnu: {engine} (disponibles: {', '.join(self.matchers)})")
+
+
+class PendingState:
+    """État sans modèle (chargement paresseux) : seuls les profils sont chargés
+
+    Le premier accès aux offres ou à un matcher charge le modèle (gensim,
+    sklearn...) et publie l'état complet, auquel l'accès est délégué.
+    """
+
+    def __init__(self, service, profiles, file_stamps):
+        self._service = service
+        self.profiles = profiles
+        self.file_stamps = file_stamps
+        self.loaded_at = time.time()
+        self.version = hashlib.sha1(f"pending:{sorted(file_stamps.items())}".encode('utf-8')).hexdigest()[:12]
+
+    def get_profile(self, profile_id):
+        """Récupère un profil par ID"""
+        return next((p for p in self.profiles if p['id'] == profile_id), None)
+
+    @property
+    def jobs(self):
+        return self._service.load_model().jobs
+
+    @property
+    def matcher(self):
+        return self._service.load_model().matcher
+
+    @property
+    def sparse_matcher(self):
+        return self._service.load_model().sparse_matcher
+
+    def get_matcher(self, engine=None):
+        return self._service.load_model().get_matcher(engine)
+
+
+class RecommendationService:
+    """Détient l'état courant et le recharge de façon atomique quand les fichiers changent"""
+
+    def __init__(self, profiles_file=MADAGASCAR_PROFILES_FILE, jobs_file=MADAGASCAR_JOBS_FILE,
+                 model_type=EMBEDDING_MODEL, store=None, use_job_store=JOB_STORE_ENABLED,
+                 engines=RECOMMENDATION_ENGINES, lazy_model=False, dedup=DEDUP_ENABLED):
+        self.profiles_file = profiles_file
+        self.jobs_file = jobs_file
+        self.model_type = model_type
+        self.store = store
+        self.use_job_store = use_job_store
+        # Quasi-doublons retirés à la lecture du catalogue et à l'ingestion (jamais du fichier source)
+        self.dedup = dedup
+        # L'index TF-IDF n'est construit que si un moteur l'utilise
+        self.with_sparse = bool({'tfidf', 'hybrid'} & set(engines))
+        # Modèle chargé à la première recommandation (les workers qui ne servent que les profils ne le chargent jamais)
+        self.lazy_model = lazy_model
+        self._state = None
+        self._reload_lock = threading.Lock()
+        self._watcher = None
+        self._stop_event = threading.Event()
+        self._listeners = []
+
+    def _file_stamps(self):
+        """mtime, inode et taille des fichiers de données"""
+        stamps = {}
+        for path in (self.profiles_file, self.jobs_file):
+            try:
+                st = os.stat(path)
+                stamps[str(path)] = (st.st_mtime_ns, st.st_ino, st.st_size)
+            except FileNotFoundError:
+                stamps[str(path)] = None
+        return stamps
+
+    def _build_state(self, load_model=True):
+        """Charge les données et le modèle dans un nouvel état (profils seuls si load_model est faux)"""
+        stamps = self._file_stamps()
+
+        dm = DataManager(dedup=self.dedup)
+        dm.load_profiles(self.profiles_file)
+        if not load_model:
+            return PendingState(self, dm.profiles, stamps)
+        if self.use_job_store:
+            # Offres memory-mapped : pages partagées avec les autres processus
+            jobs = dm.load_job_store(self.jobs_file)
+        elif is_ndjson(self.jobs_file):
+            # Catalogue lu en flux : seuls les champs utiles sont gardés en mémoire
+            jobs = unique_jobs(DataManager.iter_jobs(self.jobs_file), dm.dedup)
+        else:
+            jobs = dm.load_scraped_jobs(self.jobs_file)
+
+        matcher = EmbeddingsMatcher(model_type=self.model_type)
+        matcher.load_or_train(dm.profiles, jobs, store=self.store)
+        catalog = matcher.job_index.jobs
+
+        sparse_matcher = None
+        if self.with_sparse:
+            sparse_matcher = self._build_sparse(self._full_jobs(catalog), catalog)
+
+        return ServiceState(dm.profiles, catalog, matcher, stamps, sparse_matcher)
+
+    def _full_jobs(self, catalog, pending=()):
+        """Offres complètes (avec description) du catalogue
+
+        Un catalogue NDJSON lu en flux ne garde que des offres réduites : les
+        textes sont relus depuis le fichier, suivis des offres non encore écrites.
+        """
+        if is_ndjson(self.jobs_file) and not self.use_job_store:
+            return itertools.chain(unique_jobs(DataManager.iter_jobs(self.jobs_file), self.dedup), pending)
+        return catalog
+
+    def _dedup_index(self, state):
+        """Index MinHash LSH des offres de l'état, construit une fois puis transmis aux états suivants"""
+        if state.dedup_index is None:
+            index = MinHashLSH()
+            for _ in index.unique(self._full_jobs(state.jobs), signatures=cached_signatures()):
+                pass
+            state.dedup_index = index
+        return state.dedup_index
+
+    def _build_sparse(self, jobs, catalog):
+        """Ajuste l'index TF-IDF et le rattache à la liste d'offres de l'index dense"""
+        sparse_matcher = SimpleMatcher()
+        sparse_matcher.load_or_fit(jobs, store=self.store)
+        sparse_matcher.job_index.jobs = catalog
+        return sparse_matcher
+
+    def start(self, watch_interval=RELOAD_WATCH_INTERVAL):
+        """Charge l'état initial et démarre la surveillance des fichiers si demandée"""
+        self.reload(force=True)
+        if watch_interval:
+            self.start_watcher(watch_interval)
+        return self
+
+    def snapshot(self):
+        """État courant; à récupérer une fois par requête"""
+        if self._state is None:
+            raise RuntimeError("Le service n'a pas été démarré. Appelez start() d'abord.")
+        return self._state
+
+    def add_listener(self, callback):
+        """Appelle callback(state) à chaque publication d'un nouvel état (ex: invalidation de cache)"""
+        self._listeners.append(callback)
+
+    def _publish(self, state):
+        self._state = state  # Remplacement atomique de la référence
+        for callback in self._listeners:
+            try:
+                callback(state)
+            except Exception as e:
+                logger.error(f"Erreur lors de la notification du nouvel état: {str(e)}")
+
+    def _full_state(self):
+        """État courant avec son modèle, construit et publié s'il manque (verrou de rechargement tenu)"""
+        state = self.snapshot()
+        if isinstance(state, PendingState):
+            state = self._build_state()
+            self._publish(state)
+            logger.info(f"Modèle chargé à la demande (version {state.version})")
+        return state
+
+    def load_model(self):
+        """État complet (offres et matchers), en chargeant le modèle au premier appel"""
+        state = self.snapshot()
+        if isinstance(state, ServiceState):
+            return state
+        with self._reload_lock:
+            return self._full_state()
+
+    def has_changed(self):
+        """Indique si les fichiers de données ont changé depuis le dernier chargement"""
+        return self._state is None or self._file_stamps() != self._state.file_stamps
+
+    def reload(self, force=False):
+        """Recharge les données et le modèle puis remplace l'état courant
+
+        Les requêtes en cours continuent d'utiliser l'ancien état; retourne
+        True si un nouvel état a été publié.
+        """
+        with self._reload_lock:
+            if not force and not self.has_changed():
+                return False
+
+            # En chargement paresseux, un modèle n'est reconstruit que s'il était déjà chargé
+            new_state = self._build_state(
+                load_model=not self.lazy_model or isinstance(self._state, ServiceState)
+            )
+            self._publish(new_state)
+            logger.info(f"État de recommandation chargé (version {new_state.version})")
+            return True
+
+    def ingest_jobs(self, jobs, persist=True):
+        """Ajoute de nouvelles offres au catalogue sans rechargement complet
+
+        Les offres sont dédoublonnées par id et, si le dédoublonnage est
+        actif, les quasi-doublons d'offres du catalogue (ou du lot) sont
+        écartés (index MinHash LSH). Les offres retenues sont embeddées avec
+        le modèle courant; le modèle n'est ré-entraîné que si la dérive du
+        vocabulaire dépasse le seuil configuré. Retourne le rapport d'ingestion.
+        Un lot contenant une offre invalide est refusé en entier (ValueError).
+        """
+        jobs = validate_jobs(jobs)
+        with self._reload_lock:
+            state = self._full_state()
+
+            near_duplicates = 0
+            dedup_index = None
+            if self.dedup:
+                dedup_index = self._dedup_index(state)
+                received = len(jobs)
+                jobs = list(dedup_index.unique(jobs))
+                near_duplicates = received - len(jobs)
+
+            # Copie superficielle : l'état courant garde son matcher et son index
+            matcher = copy.copy(state.matcher)
+            report = matcher.add_jobs(jobs)
+            report['near_duplicates'] = near_duplicates
+            if not report['added']:
+                return report
+
+            all_jobs = matcher.job_index.jobs
+            new_jobs = all_jobs[len(state.jobs):]
+            stamps = state.file_stamps
+            if persist:
+                # Seules les nouvelles offres sont écrites : le catalogue en mémoire,
+                # sans les quasi-doublons, ne remplace jamais le fichier source
+                DataManager.append_jobs(new_jobs, self.jobs_file)
+                stamps = self._file_stamps()
+
+            if report['needs_retrain']:
+                logger.info(f"Dérive du vocabulaire {report['vocab_drift']:.1%} : ré-entraînement complet")
+                matcher = EmbeddingsMatcher(model_type=self.model_type)
+                matcher.load_or_train(
+                    state.profiles, self._full_jobs(all_jobs, () if persist else new_jobs), store=self.store
+                )
+                all_jobs = matcher.job_index.jobs
+
+            if persist and self.use_job_store:
+                # Reconstruire le store et y rattacher le nouvel index (pas encore publié)
+                all_jobs = DataManager().load_job_store(self.jobs_file)
+                matcher.job_index.jobs = all_jobs
+
+            sparse_matcher = None
+            if state.sparse_matcher is not None:
+                if report['needs_retrain']:
+                    full_jobs = self._full_jobs(all_jobs, () if persist else new_jobs)
+                    sparse_matcher = self._build_sparse(full_jobs, all_jobs)
+                else:
+                    # Vocabulaire et IDF inchangés, comme pour les embeddings
+                    sparse_matcher = copy.copy(state.sparse_matcher)
+                    sparse_matcher.add_jobs(new_jobs)
+                    sparse_matcher.job_index.jobs = all_jobs
+
+            new_state = ServiceState(state.profiles, all_jobs, matcher, stamps, sparse_matcher)
+            new_state.dedup_index = dedup_index
+            self._publish(new_state)
+            logger.info(f"{report['added']} offres ingérées (version {self._state.version})")
+            return report
+
+    def ingest_jobs_file(self, file_path=SCRAPED_JOBS_FILE, persist=True):
+        """Ingère les offres d'un fichier produit par JSearchScraper.save_to_json"""
+        dm = DataManager()
+        return self.ingest_jobs(dm.load_scraped_jobs(file_path), persist=persist)
+
+    def start_watcher(self, interval):
+        """Vérifie périodiquement les fichiers dans un thread de fond"""
+        if self._watcher is not None:
+            return
+
+        def watch():
+            while not self._stop_event.wait(interval):
+                try:
+                    self.reload()
+                except Exception as e:
+                    logger.error(f"Erreur lors du rechargement: {str(e)}")
+
+        self._watcher = threading.Thread(target=watch, name='recommendation-reload', daemon=True)
+        self._watcher.start()
+
+    def stop_watcher(self):
+        """Arrête la surveillance des fichiers"""
+        self._stop_event.set()
+        if self._watcher is not None:
+            self._watcher.join()
+            self._watcher = None
+        self._stop_event.clear()
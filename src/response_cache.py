@@ -0,0 +1,155 @@
+# Cache des réponses HTTP des endpoints de lecture (LRU en mémoire ou Redis)
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from flask import Response, current_app, request
+from config import (
+    RESPONSE_CACHE_BACKEND, RESPONSE_CACHE_TTL, RESPONSE_CACHE_MAX_ENTRIES, RESPONSE_CACHE_REDIS_URL
+)
+
+
+class MemoryBackend:
+    """LRU du processus avec expiration (TTL)"""
+
+    def __init__(self, max_entries=RESPONSE_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return None
+            expires_at, value = item
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class RedisBackend:
+    """Serveur Redis (ou compatible) partagé entre les workers; redis n'est importé qu'ici
+
+    L'invalidation incrémente une génération incluse dans les clés : les
+    anciennes entrées ne sont plus lues et expirent avec leur TTL. Chaque
+    entrée est un hash Redis (etag, type, corps brut) : rien de ce qui est
+    lu dans le serveur partagé n'est désérialisé en objets Python.
+    """
+
+    def __init__(self, url=RESPONSE_CACHE_REDIS_URL, prefix='job-reco:http'):
+        import redis
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    def _key(self, key):
+        generation = int(self.client.get(f"{self.prefix}:generation") or 0)
+        return f"{self.prefix}:{generation}:{key}"
+
+    def get(self, key):
+        fields = self.client.hgetall(self._key(key))
+        if not {b'etag', b'body', b'mimetype'} <= fields.keys():
+            return None
+        return fields[b'etag'].decode('ascii'), fields[b'body'], fields[b'mimetype'].decode('ascii')
+
+    def set(self, key, value, ttl):
+        etag, body, mimetype = value
+        redis_key = self._key(key)
+        pipe = self.client.pipeline()
+        pipe.hset(redis_key, mapping={'etag': etag, 'body': body, 'mimetype': mimetype})
+        pipe.expire(redis_key, max(1, int(ttl)))
+        pipe.execute()
+
+    def clear(self):
+        self.client.incr(f"{self.prefix}:generation")
+
+
+class ResponseCache:
+    """Réponses JSON mises en cache par clé (profil, moteur...) et version de l'état
+
+    Les réponses servies portent un ETag; une requête If-None-Match
+    correspondante reçoit un 304 sans corps.
+    """
+
+    def __init__(self, backend=None, ttl=RESPONSE_CACHE_TTL):
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_config(cls, backend=RESPONSE_CACHE_BACKEND):
+        """Cache du backend configuré ("memory", "redis" ou None pour désactiver)"""
+        if backend is None:
+            return cls(None)
+        if backend == "memory":
+            return cls(MemoryBackend())
+        if backend == "redis":
+            return cls(RedisBackend())
+        raise ValueError(f"Backend de cache inconnu: {backend}")
+
+    @property
+    def enabled(self):
+        return self.backend is not None
+
+    def invalidate(self, state=None):
+        """Vide le cache (à appeler quand le catalogue ou le modèle change)"""
+        if self.enabled:
+            self.backend.clear()
+
+    @staticmethod
+    def _respond(entry):
+        """Réponse depuis une entrée (etag, corps, type), 304 si le client a déjà cette version"""
+        etag, body, mimetype = entry
+        if etag in request.if_none_match:
+            response = Response(status=304)
+        else:
+            response = Response(body, mimetype=mimetype)
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
+
+    def cached(self, key_func):
+        """Décorateur d'une vue : key_func() retourne la clé de la requête (avec la version de l'état)
+
+        Seules les réponses 200 sont mises en cache.
+        """
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return view(*args, **kwargs)
+                key = f"{request.path}:{key_func()}"
+                entry = self.backend.get(key)
+                if entry is not None:
+                    self.hits += 1
+                    return self._respond(entry)
+
+                self.misses += 1
+                response = current_app.make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+                body = response.get_data()
+                entry = (hashlib.sha1(body).hexdigest(), body, response.mimetype)
+                self.backend.set(key, entry, self.ttl)
+                return self._respond(entry)
+            return wrapper
+        return decorator
@@ -1,45 +1,23 @@
 from apscheduler.schedulers.background import BackgroundScheduler
-from src.data_manager import DataManager
-from src.embeddings_matcher import EmbeddingsMatcher
-from src.email_service import EmailService
-from config import MADAGASCAR_PROFILES_FILE, MADAGASCAR_JOBS_FILE, SCHEDULER_TIME
+from src.pipeline import DailyPipeline
+from src.metrics import metrics, StageSummary
+from config import SCHEDULER_TIME
 import logging
 
 logger = logging.getLogger(__name__)
 
 scheduler = BackgroundScheduler()
 
-def daily_job():
-    """Tâche quotidienne : scraper, matcher, et envoyer les emails"""
+def daily_job(app=None):
+    """Tâche quotidienne : matcher et envoyer les emails (étapes reprenables, voir src/pipeline.py)"""
     
     logger.info("Début de la tâche quotidienne...")
     
     try:
-        # Charger les données
-        dm = DataManager()
-        dm.load_profiles(MADAGASCAR_PROFILES_FILE)
-        dm.load_scraped_jobs(MADAGASCAR_JOBS_FILE)
-        
-        # Entraîner le matcher
-        matcher = EmbeddingsMatcher(model_type="word2vec")
-        matcher.train_model(dm.profiles, dm.jobs)
-        
-        # Générer les recommandations et envoyer les emails
-        for profile in dm.profiles:
-            recommendations = matcher.recommend(profile, dm.jobs)
-            
-            if recommendations:
-                success = EmailService.send_recommendations_email(
-                    profile['name'],
-                    profile['email'],
-                    recommendations
-                )
-                status = "✓" if success else "✗"
-                logger.info(f"{status} Email envoyé à {profile['name']}")
-            else:
-                logger.warning(f"Aucune recommandation pour {profile['name']}")
-        
-        logger.info("Tâche quotidienne terminée")
+        # Une exécution interrompue le même jour reprend là où elle s'est arrêtée
+        with StageSummary(metrics) as timings:
+            DailyPipeline().run(app=app)
+        logger.info(f"Tâche quotidienne terminée - durées par étape:\n{timings.format()}")
         
     except Exception as e:
         logger.error(f"Erreur lors de la tâche quotidienne: {str(e)}")
@@ -49,6 +27,7 @@ def init_scheduler(app):
     
     scheduler.add_job(
         func=daily_job,
+        args=[app],
         trigger="cron",
         hour=int(SCHEDULER_TIME.split(':')[0]),
         minute=int(SCHEDULER_TIME.split(':')[1]),
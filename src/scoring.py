@@ -0,0 +1,173 @@
+# Bonus de score vectorisés (localisation, type de contrat, salaire)
+
+import copy
+import numpy as np
+from src.metrics import metrics
+
+# Valeurs par défaut utilisées par les règles de bonus historiques
+DEFAULT_SALARY_MIN = 0
+DEFAULT_SALARY_MAX = 999999
+
+# Plafond des scores après bonus
+MAX_SCORE = 1.0
+
+
+def _salary_bounds(profile):
+    """Fourchette de salaire souhaitée par un profil"""
+    profile_min = profile.get('salary_min', DEFAULT_SALARY_MIN)
+    profile_max = profile.get('salary_max', DEFAULT_SALARY_MAX)
+    if profile_min is None:
+        profile_min = DEFAULT_SALARY_MIN
+    if profile_max is None:
+        profile_max = DEFAULT_SALARY_MAX
+    return profile_min, profile_max
+
+
+def _to_float(value):
+    """Convertit un salaire en float, NaN si absent ou nul"""
+    if not value:
+        return np.nan
+    return float(value)
+
+
+class JobColumns:
+    """Attributs des offres stockés en colonnes pour le calcul des bonus"""
+
+    def __init__(self, jobs=()):
+        self.location_ids = {}
+        self.job_type_ids = {}
+        self.job_type_values = []
+        self.location_codes = np.empty(0, dtype=np.int32)
+        self.job_type_codes = np.empty(0, dtype=np.int32)
+        self.salary_min = np.empty(0, dtype=np.float64)
+        self.salary_max = np.empty(0, dtype=np.float64)
+        self.salary_max_filled = np.empty(0, dtype=np.float64)
+        self.extend(jobs)
+
+    def __len__(self):
+        return len(self.location_codes)
+
+    def _intern_location(self, location):
+        key = (location or '').lower()
+        return self.location_ids.setdefault(key, len(self.location_ids))
+
+    def _intern_job_type(self, job_type):
+        code = self.job_type_ids.get(job_type)
+        if code is None:
+            code = len(self.job_type_values)
+            self.job_type_ids[job_type] = code
+            self.job_type_values.append(job_type)
+        return code
+
+    def extend(self, jobs):
+        """Ajoute des offres aux colonnes"""
+        location_codes = []
+        job_type_codes = []
+        salary_min = []
+        salary_max = []
+        for job in jobs:
+            location_codes.append(self._intern_location(job.get('location', '')))
+            job_type_codes.append(self._intern_job_type(job.get('job_type')))
+            salary_min.append(_to_float(job.get('salary_min')))
+            salary_max.append(_to_float(job.get('salary_max')))
+
+        salary_max = np.array(salary_max, dtype=np.float64)
+        self.location_codes = np.concatenate([self.location_codes, np.array(location_codes, dtype=np.int32)])
+        self.job_type_codes = np.concatenate([self.job_type_codes, np.array(job_type_codes, dtype=np.int32)])
+        self.salary_min = np.concatenate([self.salary_min, np.array(salary_min, dtype=np.float64)])
+        self.salary_max = np.concatenate([self.salary_max, salary_max])
+        # Un maximum absent vaut le plafond par défaut
+        self.salary_max_filled = np.concatenate([
+            self.salary_max_filled,
+            np.where(np.isnan(salary_max), DEFAULT_SALARY_MAX, salary_max)
+        ])
+        return self
+
+    def extended(self, jobs):
+        """Nouvelles colonnes avec des offres ajoutées (les colonnes courantes ne changent pas)
+
+        Les tables d'internement sont copiées : les index construits sur les
+        colonnes courantes (ex: JobFilterIndex) ne voient pas les nouveaux codes.
+        """
+        columns = copy.copy(self)
+        columns.location_ids = dict(self.location_ids)
+        columns.job_type_ids = dict(self.job_type_ids)
+        columns.job_type_values = list(self.job_type_values)
+        return columns.extend(jobs)
+
+    def subset(self, indices):
+        """Colonnes restreintes à un sous-ensemble d'offres"""
+        sub = JobColumns()
+        sub.location_ids = self.location_ids
+        sub.job_type_ids = self.job_type_ids
+        sub.job_type_values = self.job_type_values
+        sub.location_codes = self.location_codes[indices]
+        sub.job_type_codes = self.job_type_codes[indices]
+        sub.salary_min = self.salary_min[indices]
+        sub.salary_max = self.salary_max[indices]
+        sub.salary_max_filled = self.salary_max_filled[indices]
+        return sub
+
+    def location_mask(self, profile):
+        """Offres dont la localisation correspond à celle du profil"""
+        code = self.location_ids.get((profile.get('desired_location') or '').lower(), -1)
+        return self.location_codes == code
+
+    def job_type_mask(self, profile):
+        """Offres dont le type de contrat fait partie des souhaits du profil"""
+        wanted = profile.get('job_types', [])
+        accepted = np.array([value in wanted for value in self.job_type_values], dtype=bool)
+        if not len(accepted):
+            return np.zeros(len(self), dtype=bool)
+        return accepted[self.job_type_codes]
+
+    def salary_mask(self, profile):
+        """Offres dont la fourchette de salaire recoupe celle du profil"""
+        profile_min, profile_max = _salary_bounds(profile)
+        # Les comparaisons avec NaN (minimum absent) sont fausses
+        return (self.salary_min <= profile_max) & (self.salary_max_filled >= profile_min)
+
+
+@metrics.timed("bonus")
+def apply_bonus(similarities, profile, columns, weights):
+    """Ajoute les bonus à toutes les similarités d'un coup, plafonné à 1.0
+
+    weights : dict avec les clés 'location', 'job_type' et 'salary'.
+    """
+    scores = np.asarray(similarities, dtype=np.float64)
+    scores = scores + np.where(columns.location_mask(profile), weights['location'], 0.0)
+    scores = scores + np.where(columns.job_type_mask(profile), weights['job_type'], 0.0)
+    scores = scores + np.where(columns.salary_mask(profile), weights['salary'], 0.0)
+    return np.minimum(scores, MAX_SCORE)
+
+
+@metrics.timed("bonus")
+def apply_bonus_batch(similarities, profiles, columns, weights):
+    """Version matricielle de apply_bonus pour un bloc (n_profiles, n_jobs)"""
+    scores = np.asarray(similarities, dtype=np.float64)
+
+    location_codes = np.array([
+        columns.location_ids.get((p.get('desired_location') or '').lower(), -1)
+        for p in profiles
+    ], dtype=np.int32)
+    location_match = location_codes[:, None] == columns.location_codes[None, :]
+
+    accepted = np.array([
+        [value in p.get('job_types', []) for value in columns.job_type_values]
+        for p in profiles
+    ], dtype=bool).reshape(len(profiles), len(columns.job_type_values))
+    if accepted.shape[1]:
+        job_type_match = accepted[:, columns.job_type_codes]
+    else:
+        job_type_match = np.zeros(scores.shape, dtype=bool)
+
+    bounds = np.array([_salary_bounds(p) for p in profiles], dtype=np.float64).reshape(-1, 2)
+    salary_match = (
+        (columns.salary_min[None, :] <= bounds[:, 1:2])
+        & (columns.salary_max_filled[None, :] >= bounds[:, 0:1])
+    )
+
+    scores = scores + np.where(location_match, weights['location'], 0.0)
+    scores = scores + np.where(job_type_match, weights['job_type'], 0.0)
+    scores = scores + np.where(salary_match, weights['salary'], 0.0)
+    return np.minimum(scores, MAX_SCORE)
@@ -0,0 +1,220 @@
+# Extraction des compétences techniques des descriptions d'offres
+
+import json
+import re
+import numpy as np
+from config import SKILLS_FILE
+
+# Compétences reconnues : nom canonique -> alias
+DEFAULT_SKILLS = {
+    'Python': [],
+    'JavaScript': ['JS', 'ECMAScript'],
+    'Java': [],
+    'C++': ['cpp'],
+    'C#': ['csharp', 'C sharp'],
+    'PHP': [],
+    'Ruby': [],
+    'Go': ['Golang'],
+    'Rust': [],
+    'React': ['React.js', 'ReactJS'],
+    'Vue': ['Vue.js', 'VueJS'],
+    'Angular': ['AngularJS'],
+    'Node.js': ['NodeJS', 'Node'],
+    'Django': [],
+    'Flask': [],
+    'Spring': ['Spring Boot'],
+    'Machine Learning': ['ML', 'apprentissage automatique'],
+    'Deep Learning': ['apprentissage profond'],
+    'AI': ['IA', 'artificial intelligence', 'intelligence artificielle'],
+    'Data Analysis': ['data analytics', 'analyse de données'],
+    'SQL': [],
+    'Git': [],
+    'Docker': [],
+    'Kubernetes': ['k8s'],
+    'AWS': ['Amazon Web Services'],
+    'Azure': [],
+    'GCP': ['Google Cloud'],
+    'HTML': ['HTML5'],
+    'CSS': ['CSS3'],
+    'REST API': ['REST', 'RESTful'],
+    'GraphQL': [],
+    'MongoDB': ['Mongo'],
+    'PostgreSQL': ['Postgres'],
+}
+
+# Termes ambigus (mots courants en anglais ou en français) reconnus seulement avec cette casse
+CASE_SENSITIVE_TERMS = {
+    'Go', 'Rust', 'React', 'Vue', 'Spring', 'Node', 'AI', 'IA', 'ML', 'JS', 'REST', 'Mongo'
+}
+
+# Limites d'un terme : ni lettre/chiffre ni symbole faisant partie d'un nom (C++, C#, Node.js)
+_BEFORE = r'(?<![\w+#.])'
+_AFTER = r'(?![\w+#]|\.\w)'
+_BEFORE_CHAR = re.compile(r'[\w+#.]')
+_AFTER_CHARS = re.compile(r'[\w+#]|\.\w')
+
+# Alphabet des trigrammes : caractères ASCII pouvant faire partie d'un nom, tout le reste
+# (séparateurs, caractères non ASCII) confondu avec l'espace d'indice 0
+_ALPHABET = ' abcdefghijklmnopqrstuvwxyz0123456789_+#.'
+_SYMBOLS = np.zeros(1 << 16, dtype=np.int32)
+_SYMBOLS[[ord(char) for char in _ALPHABET]] = np.arange(len(_ALPHABET))
+
+
+class SkillExtractor:
+    """Reconnaît toutes les compétences d'un texte
+
+    Le dictionnaire (noms canoniques et alias) est compilé en une
+    expression régulière alternée, avec des limites de mots adaptées aux
+    noms contenant des symboles. Les termes de case_sensitive ne sont
+    reconnus qu'avec leur casse exacte ("Go" mais pas "go", "good").
+
+    extract donne le même résultat sans parcourir le texte avec
+    l'expression : les trigrammes du texte en minuscules sont calculés une
+    fois avec numpy, et seuls les termes dont tous les trigrammes (dont
+    espace + deux premières lettres, pour la limite de début) y figurent
+    sont cherchés par str.find. Un terme qui peut chevaucher celui d'une
+    autre compétence ("Go" dans "Google Cloud" si ce dernier désignait une
+    autre compétence) voit ses occurrences départagées comme par
+    l'expression : la plus à gauche, puis la plus longue.
+    """
+
+    def __init__(self, skills=None, case_sensitive=None):
+        self.skills = dict(DEFAULT_SKILLS if skills is None else skills)
+        self.case_sensitive = set(CASE_SENSITIVE_TERMS if case_sensitive is None else case_sensitive)
+        self._order = {name: i for i, name in enumerate(self.skills)}
+
+        # Terme reconnu -> nom canonique (clé exacte ou en minuscules)
+        self._exact = {}
+        self._folded = {}
+        for name, aliases in self.skills.items():
+            for term in [name, *aliases]:
+                if term in self.case_sensitive:
+                    self._exact[term] = name
+                else:
+                    self._folded[term.lower()] = name
+
+        # Les termes les plus longs d'abord ("Spring Boot" avant "Spring")
+        terms = sorted(
+            [(term, True) for term in self._exact] + [(term, False) for term in self._folded],
+            key=lambda item: -len(item[0])
+        )
+        alternatives = [
+            f"(?-i:{re.escape(term)})" if exact else re.escape(term)
+            for term, exact in terms
+        ]
+        self.pattern = re.compile(f"{_BEFORE}(?:{'|'.join(alternatives)}){_AFTER}", re.IGNORECASE)
+
+        # Trigrammes de chaque terme, à la suite (segments commençant à _offsets) ;
+        # les termes d'un caractère n'en ont pas et sont toujours cherchés
+        self._terms = terms
+        self._short = [i for i, (term, _) in enumerate(terms) if len(term) < 2]
+        self._long = np.array([i for i, (term, _) in enumerate(terms) if len(term) >= 2], dtype=np.intp)
+        trigrams = [_trigrams(terms[i][0].lower()) for i in self._long]
+        self._trigrams = np.concatenate(trigrams) if trigrams else np.zeros(0, dtype=np.int32)
+        self._offsets = np.cumsum([0] + [len(t) for t in trigrams[:-1]])
+
+        # Termes dont une occurrence peut chevaucher celle d'un terme d'une autre compétence
+        self._overlapping = {
+            i for i, (term, exact) in enumerate(terms)
+            for other, other_exact in terms
+            if self._name(term, exact) != self._name(other, other_exact)
+            and (_may_overlap(term.lower(), other.lower()) or _may_overlap(other.lower(), term.lower()))
+        }
+
+    @classmethod
+    def from_file(cls, path):
+        """Charge un dictionnaire JSON {"skills": {nom: [alias]}, "case_sensitive": [termes]}"""
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return cls(data.get('skills'), data.get('case_sensitive'))
+
+    def _name(self, term, exact):
+        return self._exact[term] if exact else self._folded[term]
+
+    def extract(self, text):
+        """Compétences trouvées dans le texte, dans l'ordre du dictionnaire"""
+        if not text:
+            return []
+        lowered = text.lower()
+        if len(lowered) != len(text):
+            # Positions décalées par la mise en minuscules : expression alternée
+            found = {self._exact.get(m.group(0)) or self._folded[m.group(0).lower()]
+                     for m in self.pattern.finditer(text)}
+            return sorted(found, key=self._order.__getitem__)
+
+        present = np.zeros(len(_ALPHABET) ** 3, dtype=bool)
+        present[_trigrams(lowered)] = True
+        candidates = self._short
+        if len(self._long):
+            matched = np.logical_and.reduceat(present[self._trigrams], self._offsets)
+            candidates = candidates + self._long[matched].tolist()
+
+        found = set()
+        # (début, -longueur, rang dans l'expression) des occurrences à départager
+        occurrences = []
+        for i in candidates:
+            term, exact = self._terms[i]
+            haystack = text if exact else lowered
+            if i in self._overlapping:
+                occurrences.extend((start, -len(term), i) for start in _occurrences(term, haystack, text))
+            elif _occurs(term, haystack, text):
+                found.add(self._name(term, exact))
+
+        covered = 0
+        for start, length, i in sorted(occurrences):
+            if start >= covered:
+                found.add(self._name(*self._terms[i]))
+                covered = start - length
+        return sorted(found, key=self._order.__getitem__)
+
+
+def _occurrences(term, haystack, text):
+    """Débuts des occurrences de term dans haystack (texte ou texte en minuscules) entre deux limites"""
+    start = haystack.find(term)
+    while start != -1:
+        if ((start == 0 or not _BEFORE_CHAR.match(text, start - 1))
+                and not _AFTER_CHARS.match(text, start + len(term))):
+            yield start
+        start = haystack.find(term, start + 1)
+
+
+def _occurs(term, haystack, text):
+    """Vrai si term apparaît au moins une fois dans haystack entre deux limites"""
+    for _ in _occurrences(term, haystack, text):
+        return True
+    return False
+
+
+def _may_overlap(term, other):
+    """Vrai si other peut commencer à l'intérieur d'une occurrence de term, limites comprises"""
+    for k in range(len(term)):
+        overlap = min(len(term) - k, len(other))
+        if term[k:k + overlap] != other[:overlap]:
+            continue
+        if k > 0 and _BEFORE_CHAR.match(term, k - 1):
+            continue
+        if k + len(other) <= len(term):
+            if not _AFTER_CHARS.match(term, k + len(other)):
+                return True
+        elif not _AFTER_CHARS.match(other, len(term) - k):
+            return True
+    return False
+
+
+def _trigrams(lowered):
+    """Indices des trigrammes d'un texte en minuscules précédé d'un espace (limite de début)"""
+    codes = np.frombuffer((' ' + lowered).encode('utf-16-le', 'surrogatepass'), dtype=np.uint16)
+    symbols = _SYMBOLS[codes]
+    size = len(_ALPHABET)
+    return (symbols[:-2] * size + symbols[1:-1]) * size + symbols[2:]
+
+
+_default_extractor = None
+
+
+def get_skill_extractor():
+    """Extracteur partagé, compilé une seule fois (dictionnaire SKILLS_FILE si configuré)"""
+    global _default_extractor
+    if _default_extractor is None:
+        _default_extractor = SkillExtractor.from_file(SKILLS_FILE) if SKILLS_FILE else SkillExtractor()
+    return _default_extractor
@@ -0,0 +1,181 @@
+# Tokenisation des textes et cache des tokens
+
+import hashlib
+import json
+import re
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from config import TOKENIZER_MODE, TOKEN_CACHE_SIZE, TOKEN_CACHE_DIR, STOPWORDS_DIR, NLTK_DATA_DIR
+
+# Séparateurs reproduisant le découpage de word_tokenize (Treebank) :
+# espaces, ponctuation isolée, guillemets, '--', '...', et ':' ',' hors nombres
+_SPLIT_RE = re.compile(r"""\s+|[;@#$%&?!()\[\]{}<>"`’‘“”]|--|\.\.\.|[:,](?!\d)""")
+
+# Contractions anglaises séparées par word_tokenize ("team's" -> "team", "'s")
+_SUFFIX_RE = re.compile(r"^(.+?)(?:'s|'m|'d|'ll|'re|'ve|n't|')$")
+
+_stopwords = None
+
+
+def load_stopwords(language):
+    """Stop words NLTK d'une langue, depuis la copie du dépôt (STOPWORDS_DIR)"""
+    with open(STOPWORDS_DIR / f"{language}.txt", 'r', encoding='utf-8') as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def get_stopwords():
+    """Stop words français et anglais fusionnés (chargés une seule fois)"""
+    global _stopwords
+    if _stopwords is None:
+        _stopwords = frozenset(load_stopwords('french')) | frozenset(load_stopwords('english'))
+    return _stopwords
+
+
+def regex_tokenize(text):
+    """Tokenisation rapide par expressions régulières, proche de word_tokenize"""
+    tokens = []
+    for chunk in _SPLIT_RE.split(text):
+        if not chunk:
+            continue
+        chunk = chunk.rstrip('.').lstrip("'")
+        match = _SUFFIX_RE.match(chunk)
+        if match:
+            chunk = match.group(1)
+        tokens.append(chunk)
+    return tokens
+
+
+_word_tokenize = None
+
+
+def _load_word_tokenize():
+    """Importe word_tokenize et vérifie Punkt (NLTK_DATA_DIR ou chemins NLTK), sans téléchargement"""
+    global _word_tokenize
+    if _word_tokenize is None:
+        import nltk
+        from nltk.tokenize import word_tokenize
+        if str(NLTK_DATA_DIR) not in nltk.data.path:
+            nltk.data.path.insert(0, str(NLTK_DATA_DIR))
+        try:
+            nltk.data.find('tokenizers/punkt')
+        except LookupError:
+            raise RuntimeError(
+                f"Ressource NLTK 'punkt' introuvable. Copiez-la dans {NLTK_DATA_DIR} "
+                f"(python -m nltk.downloader -d {NLTK_DATA_DIR} punkt) ou utilisez TOKENIZER_MODE = \"regex\""
+            )
+        _word_tokenize = word_tokenize
+    return _word_tokenize
+
+
+def nltk_tokenize(text):
+    """Tokenisation NLTK (Punkt + Treebank)"""
+    return _load_word_tokenize()(text)
+
+
+class TokenCache:
+    """Cache LRU des tokens indexé par empreinte du texte, avec débordement disque optionnel"""
+
+    def __init__(self, max_size=TOKEN_CACHE_SIZE, spill_dir=TOKEN_CACHE_DIR):
+        self.max_size = max_size
+        self.spill_dir = Path(spill_dir) if spill_dir else None
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(text, mode):
+        """Empreinte du contenu (et du mode de tokenisation)"""
+        return hashlib.sha1(f"{mode}\x00{text}".encode('utf-8')).hexdigest()
+
+    def _spill_path(self, key):
+        return self.spill_dir / key[:2] / f"{key}.json"
+
+    def get(self, key):
+        """Retourne les tokens en cache, ou None"""
+        with self._lock:
+            tokens = self._entries.get(key)
+            if tokens is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return tokens
+
+        if self.spill_dir:
+            try:
+                with open(self._spill_path(key), 'r', encoding='utf-8') as f:
+                    tokens = tuple(json.load(f))
+                self.put(key, tokens)
+                with self._lock:
+                    self.hits += 1
+                return tokens
+            except (FileNotFoundError, ValueError):
+                pass
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key, tokens):
+        """Ajoute une entrée, les plus anciennes sont évincées (vers le disque si configuré)"""
+        evicted = []
+        with self._lock:
+            self._entries[key] = tokens
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                evicted.append(self._entries.popitem(last=False))
+
+        if self.spill_dir:
+            for old_key, old_tokens in evicted:
+                path = self._spill_path(old_key)
+                if path.exists():
+                    continue
+                path.parent.mkdir(parents=True, exist_ok=True)
+                with open(path, 'w', encoding='utf-8') as f:
+                    json.dump(list(old_tokens), f, ensure_ascii=False)
+
+    def clear(self):
+        """Vide le cache mémoire"""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+# Cache partagé par tous les tokenizers du processus
+default_token_cache = TokenCache()
+
+
+class TextTokenizer:
+    """Tokenizer avec stop words fusionnés et cache des tokens
+
+    mode : "nltk" (word_tokenize) ou "regex" (découpage rapide équivalent)
+    cache : TokenCache à utiliser, None pour désactiver le cache
+    """
+
+    def __init__(self, mode=TOKENIZER_MODE, cache=default_token_cache):
+        if mode not in ("nltk", "regex"):
+            raise ValueError(f"Mode de tokenisation inconnu: {mode}")
+        self.mode = mode
+        self.cache = cache
+        self._split = nltk_tokenize if mode == "nltk" else regex_tokenize
+
+    def _tokenize(self, text):
+        stops = get_stopwords()
+        return tuple(
+            token for token in self._split(text.lower())
+            if token.isalnum() and token not in stops
+        )
+
+    def tokenize(self, text):
+        """Tokens nettoyés (minuscules, alphanumériques, sans stop words)"""
+        if self.cache is None:
+            return list(self._tokenize(text))
+
+        key = TokenCache.make_key(text, self.mode)
+        tokens = self.cache.get(key)
+        if tokens is None:
+            tokens = self._tokenize(text)
+            self.cache.put(key, tokens)
+        return list(tokens)
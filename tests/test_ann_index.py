@@ -0,0 +1,29 @@
+import numpy as np
+from src.ann_index import IVFIndex, evaluate_recall
+from src.job_index import normalize_rows
+
+
+def _vectors(n=3000, dim=32, seed=0):
+    rng = np.random.default_rng(seed)
+    topics = rng.normal(size=(40, dim))
+    return normalize_rows(topics[rng.integers(0, 40, n)] + rng.normal(scale=0.5, size=(n, dim)))
+
+
+def test_full_probe_equals_exact_search():
+    vectors = _vectors()
+    index = IVFIndex(n_lists=16, n_probe=16).build(vectors)
+    result = evaluate_recall(index, vectors, vectors[:20], k=10)
+    assert result['recall'] == 1.0
+
+
+def test_partial_probe_recall_and_persistence(tmp_path):
+    vectors = _vectors()
+    index = IVFIndex(n_lists=32, n_probe=8).build(vectors)
+    assert evaluate_recall(index, vectors, vectors[:50], k=10)['recall'] > 0.9
+
+    path = tmp_path / 'ann.npz'
+    index.save(path)
+    loaded = IVFIndex.load(path, vectors)
+    ids, _ = index.search(vectors[0], 10)
+    loaded_ids, _ = loaded.search(vectors[0], 10)
+    assert ids.tolist() == loaded_ids.tolist()
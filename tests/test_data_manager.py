@@ -0,0 +1,62 @@
+import json
+from src.data_manager import DataManager, compact_job
+
+
+JOBS = [
+    {'id': 'a', 'title': 'Développeur Python', 'company': 'X', 'location': 'Antananarivo',
+     'description': 'Django et API', 'salary_min': None},
+    {'id': 'b', 'title': 'Data Analyst', 'company': 'Y', 'location': 'Toamasina',
+     'description': 'SQL, Power BI', 'job_type': 'CDI'},
+]
+
+
+def test_convert_then_stream_ndjson(tmp_path):
+    json_file = tmp_path / 'jobs.json'
+    json_file.write_text(json.dumps({'jobs': JOBS}, ensure_ascii=False), encoding='utf-8')
+
+    ndjson_file = DataManager.convert_to_ndjson(json_file)
+    assert ndjson_file == tmp_path / 'jobs.ndjson'
+    assert len(ndjson_file.read_text(encoding='utf-8').splitlines()) == len(JOBS)
+
+    jobs = DataManager.iter_jobs(ndjson_file)
+    assert not isinstance(jobs, list)
+    assert list(jobs) == JOBS
+    assert DataManager().load_scraped_jobs(ndjson_file) == JOBS
+
+
+def test_append_jobs_ndjson_and_truncated_line(tmp_path):
+    ndjson_file = tmp_path / 'jobs.ndjson'
+    dm = DataManager()
+    dm.jobs = JOBS[:1]
+    dm.save_jobs(ndjson_file)
+
+    before = ndjson_file.read_bytes()
+    assert DataManager.append_jobs(JOBS[1:], ndjson_file) == 1
+    # Les lignes existantes ne sont pas réécrites
+    assert ndjson_file.read_bytes().startswith(before)
+
+    # Une écriture interrompue laisse une ligne incomplète, ignorée à la lecture
+    with open(ndjson_file, 'a', encoding='utf-8') as f:
+        f.write('{"id": "c", "tit')
+    assert [job['id'] for job in DataManager.iter_jobs(ndjson_file)] == ['a', 'b']
+    DataManager.append_jobs([{'id': 'd'}], ndjson_file)
+    assert [job['id'] for job in DataManager.iter_jobs(ndjson_file)] == ['a', 'b', 'd']
+
+
+def test_append_jobs_json_keeps_rows_removed_at_load(tmp_path):
+    json_file = tmp_path / 'jobs.json'
+    # Quasi-doublon de 'a' sous un autre id : retiré à la lecture, conservé dans le fichier
+    raw = JOBS + [{**JOBS[0], 'id': 'a2'}]
+    json_file.write_text(json.dumps({'jobs': raw, 'source': 'test'}, ensure_ascii=False), encoding='utf-8')
+    assert [job['id'] for job in DataManager().load_scraped_jobs(json_file)] == ['a', 'b']
+
+    assert DataManager.append_jobs([{'id': 'c', 'title': 'Comptable'}], json_file) == 1
+    data = json.loads(json_file.read_text(encoding='utf-8'))
+    assert [job['id'] for job in data['jobs']] == ['a', 'b', 'a2', 'c']
+    assert data['source'] == 'test'
+
+
+def test_compact_job_keeps_only_present_fields():
+    assert compact_job(JOBS[0]) == {
+        'id': 'a', 'title': 'Développeur Python', 'company': 'X', 'location': 'Antananarivo', 'salary_min': None
+    }
@@ -0,0 +1,51 @@
+import json
+from config import MADAGASCAR_JOBS_FILE
+from src.data_manager import DataManager
+from src.dedup import MinHashLSH
+from src.jsearch_scraper import JSearchScraper
+
+DESCRIPTION = (
+    "Nous recherchons un développeur Python expérimenté pour rejoindre notre équipe produit à Antananarivo. "
+    "Vous concevrez des API REST avec Django, écrirez des tests automatisés et participerez aux revues de code. "
+    "Une bonne maîtrise de PostgreSQL, de Docker et des méthodes agiles est attendue."
+)
+
+
+def _jobs():
+    original = {'id': 'board-a-1', 'title': 'Développeur Python', 'company': 'Acme', 'description': DESCRIPTION}
+    # Même annonce reprise par un autre site : autre id, ponctuation et casse modifiées
+    syndicated = {'id': 'board-b-9', 'title': 'DÉVELOPPEUR PYTHON', 'company': 'Acme',
+                  'description': DESCRIPTION.replace('.', ' !') + " Postulez vite."}
+    other = {'id': 'board-a-2', 'title': 'Data Analyst', 'company': 'Acme',
+             'description': "Analyse de données commerciales avec SQL et Power BI, tableaux de bord mensuels."}
+    return [original, syndicated, other]
+
+
+def test_near_duplicates_are_dropped_and_first_copy_kept():
+    index = MinHashLSH()
+    kept = list(index.unique(_jobs()))
+    assert [job['id'] for job in kept] == ['board-a-1', 'board-a-2']
+    assert index.duplicates == {'board-b-9': 'board-a-1'}
+
+    # Catalogue réel : aucune offre distincte confondue
+    jobs = list(DataManager.iter_jobs(MADAGASCAR_JOBS_FILE))
+    assert len(list(MinHashLSH().unique(jobs))) == len(jobs)
+
+
+def test_persistent_index_dedups_new_scrapes_against_previous_ones(tmp_path):
+    index_file = tmp_path / 'dedup.npz'
+    first = JSearchScraper(api_key='test', dedup_index_file=index_file)
+    first.jobs = _jobs()[:1]
+    first.save_to_json(tmp_path / 'day1.json')
+
+    second = JSearchScraper(api_key='test', dedup_index_file=index_file)
+    assert len(second.get_dedup_index()) == 1
+    second.jobs = _jobs()
+    assert [job['id'] for job in second.get_unique_jobs()] == ['board-a-1', 'board-a-2']
+
+
+def test_data_manager_load_drops_near_duplicates(tmp_path):
+    jobs_file = tmp_path / 'jobs.json'
+    jobs_file.write_text(json.dumps({'jobs': _jobs()}), encoding='utf-8')
+    assert len(DataManager().load_scraped_jobs(jobs_file)) == 2
+    assert len(DataManager(dedup=False).load_scraped_jobs(jobs_file)) == 3
@@ -0,0 +1,111 @@
+import smtplib
+import socket
+from datetime import datetime
+import pytest
+from flask import Flask
+from src.email_service import EmailService, SMTPWorker, mail
+
+
+class StubSMTPHandler:
+    """Serveur SMTP local : enregistre les messages, refuse certains destinataires"""
+
+    def __init__(self, fail_once=(), reject=()):
+        self.fail_once = set(fail_once)
+        self.reject = set(reject)
+        self.delivered = []
+        self.sessions = set()
+
+    async def handle_RCPT(self, server, session, envelope, address, rcpt_options):
+        if address in self.reject:
+            return '550 Mailbox unavailable'
+        if address in self.fail_once:
+            self.fail_once.discard(address)
+            return '451 Try again later'
+        envelope.rcpt_tos.append(address)
+        return '250 OK'
+
+    async def handle_DATA(self, server, session, envelope):
+        self.sessions.add(id(session))
+        self.delivered.extend(envelope.rcpt_tos)
+        return '250 Message accepted'
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+@pytest.fixture
+def smtp_stub():
+    aiosmtpd_controller = pytest.importorskip('aiosmtpd.controller')
+    handler = StubSMTPHandler(fail_once={'retry@example.com'}, reject={'bad@example.com'})
+    controller = aiosmtpd_controller.Controller(handler, hostname='127.0.0.1', port=_free_port())
+    controller.start()
+    yield handler, controller
+    controller.stop()
+
+
+def _app(controller=None):
+    app = Flask(__name__)
+    app.config.update(MAIL_DEFAULT_SENDER='no-reply@example.com', MAIL_USE_TLS=False)
+    if controller:
+        app.config.update(MAIL_SERVER=controller.hostname, MAIL_PORT=controller.port)
+    mail.init_app(app)
+    return app
+
+
+RECOMMENDATION = {'job_title': 'Dev Python', 'company': 'Acme', 'location': 'Antananarivo',
+                  'score': 0.8, 'url': 'https://example.com'}
+
+
+def test_render_messages_html_and_text():
+    recipients = [('Rado <b>', 'rado@example.com', [RECOMMENDATION, {**RECOMMENDATION, 'job_title': 'R&D'}]),
+                  ('Vide', 'vide@example.com', [])]
+
+    with _app().app_context():
+        msg, empty = EmailService.render_messages(recipients, sent_at=datetime(2024, 5, 1, 8, 0))
+
+    assert empty is None
+    assert msg.recipients == ['rado@example.com']
+    assert 'Bonjour Rado &lt;b&gt;!' in msg.html
+    assert '2. R&amp;D' in msg.html and '80.0%' in msg.html
+    assert '1. Dev Python (80.0%)' in msg.body and 'https://example.com' in msg.body
+    assert 'Envoyé le 01/05/2024 à 08:00' in msg.body
+
+
+def test_send_bulk_reports_each_recipient(smtp_stub, monkeypatch):
+    handler, controller = smtp_stub
+    monkeypatch.setattr('src.email_service.MAIL_BACKOFF_BASE', 0.0)
+    recipients = [(f'P{i}', f'p{i}@example.com', [RECOMMENDATION]) for i in range(40)]
+    recipients += [
+        ('Retry', 'retry@example.com', [RECOMMENDATION]),
+        ('Bad', 'bad@example.com', [RECOMMENDATION]),
+        ('Empty', 'empty@example.com', [])
+    ]
+
+    results = EmailService.send_bulk(recipients, app=_app(controller), max_workers=4)
+
+    assert [r['email'] for r in results] == [email for _, email, _ in recipients]
+    assert all(r['success'] and r['attempts'] == 1 for r in results[:40])
+    assert results[40]['success'] and results[40]['attempts'] == 2
+    assert not results[41]['success'] and results[41]['attempts'] == 1
+    assert not results[42]['success'] and results[42]['attempts'] == 0
+    assert sorted(handler.delivered) == sorted([f'p{i}@example.com' for i in range(40)] + ['retry@example.com'])
+    # Une session SMTP par worker, plus celles rouvertes après les deux erreurs
+    assert len(handler.sessions) <= 4 + 2
+
+
+def test_permanent_smtp_error_is_not_retried(monkeypatch):
+    sends = []
+
+    def send(self, msg):
+        sends.append(msg)
+        raise smtplib.SMTPNotSupportedError('SMTPUTF8 not supported by server')
+    monkeypatch.setattr(SMTPWorker, 'send', send)
+    monkeypatch.setattr('src.email_service.MAIL_BACKOFF_BASE', 0.0)
+
+    results = EmailService.send_bulk([('P', 'p@example.com', [RECOMMENDATION])], app=_app(), max_workers=1)
+    # SMTPException hérite d'OSError mais l'erreur est définitive : une seule tentative
+    assert not results[0]['success'] and results[0]['attempts'] == 1
+    assert len(sends) == 1
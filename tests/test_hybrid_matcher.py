@@ -0,0 +1,43 @@
+import json
+import numpy as np
+import pytest
+from config import MADAGASCAR_PROFILES_FILE, MADAGASCAR_JOBS_FILE
+from src.hybrid_matcher import HybridMatcher, ranks, top_n_mask
+from src.model_store import ModelStore
+
+
+def test_top_n_mask_and_ranks():
+    scores = np.array([[0.1, 0.9, 0.5, 0.9], [0.3, 0.2, 0.1, 0.0]])
+    assert top_n_mask(scores, 2).sum(axis=1).tolist() == [2, 2]
+    assert top_n_mask(scores, 2)[1].tolist() == [True, True, False, False]
+    assert ranks(scores).tolist() == [[3, 0, 2, 1], [0, 1, 2, 3]]
+
+
+def test_fusion_restricts_to_candidates():
+    dense = np.array([[0.9, 0.8, 0.1, 0.0]])
+    sparse = np.array([[0.0, 0.1, 0.7, 0.2]])
+
+    weighted = HybridMatcher(fusion='weighted', sparse_weight=0.5, candidates=1).fuse(dense, sparse)
+    assert weighted[0].tolist() == pytest.approx([0.45, -np.inf, 0.4, -np.inf])
+
+    rrf = HybridMatcher(fusion='rrf', rrf_k=60, candidates=4).fuse(dense, sparse)
+    # Premier d'un côté, quatrième de l'autre
+    assert rrf[0, 0] == pytest.approx((1 / 61 + 1 / 64) * 61 / 2)
+    assert rrf.max() < 1.0
+
+
+def test_hybrid_batch_matches_single(tmp_path):
+    with open(MADAGASCAR_PROFILES_FILE, encoding='utf-8') as f:
+        profiles = json.load(f)['profiles']
+    with open(MADAGASCAR_JOBS_FILE, encoding='utf-8') as f:
+        jobs = json.load(f)['jobs']
+
+    matcher = HybridMatcher().load_or_train(profiles, jobs, store=ModelStore(tmp_path / 'models'))
+    assert matcher.dense.job_index.covers(jobs) and matcher.sparse.job_index.covers(jobs)
+
+    batch = matcher.recommend_batch(profiles, jobs)
+    for profile, recommendations in zip(profiles, batch):
+        single = matcher.recommend(profile, jobs)
+        # gemm sur 1 ou n profils : écarts de l'ordre de l'ulp
+        assert [r['score'] for r in recommendations] == pytest.approx([r['score'] for r in single], abs=1e-5)
+        assert all(r['score'] <= 1.0 for r in recommendations)
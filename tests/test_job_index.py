@@ -0,0 +1,60 @@
+import numpy as np
+from src.job_index import JobIndex, top_n_indices, top_n_refined
+
+
+def test_top_n_indices_matches_stable_sort():
+    rng = np.random.default_rng(0)
+    scores = np.round(rng.random(500), 2)  # beaucoup d'égalités
+    expected = sorted(range(len(scores)), key=lambda i: scores[i], reverse=True)[:10]
+    assert top_n_indices(scores, 10).tolist() == expected
+    assert top_n_indices(scores, 1000).tolist() == sorted(
+        range(len(scores)), key=lambda i: scores[i], reverse=True)
+
+
+def test_top_n_refined_orders_near_ties_by_exact_score():
+    exact = np.array([0.5, 0.9, 0.9, 0.3, 0.9])
+    # Écarts d'arrondi (1e-7) qui inverseraient l'ordre des égalités
+    noisy = exact + np.array([0.0, -1e-7, 1e-7, 0.0, 2e-7])
+    refined = []
+
+    def refine(ids):
+        refined.append(ids.tolist())
+        return exact[ids]
+
+    ids, scores = top_n_refined(noisy, 2, refine, 1e-5)
+    assert ids.tolist() == [1, 2] and scores.tolist() == [0.9, 0.9]
+    assert refined == [[1, 2, 4]]
+
+    # Plafond : re-calcul arrêté dès que n offres l'atteignent
+    capped = np.ones(200)
+    ids, _ = top_n_refined(capped, 2, lambda ids: capped[ids], 1e-5, max_score=1.0)
+    assert ids.tolist() == [0, 1]
+
+
+def test_index_scores_are_cosine_similarities():
+    rng = np.random.default_rng(1)
+    vectors = rng.normal(size=(50, 8))
+    vectors[3] = 0.0
+    index = JobIndex(list(range(50)), vectors)
+    query = rng.normal(size=8)
+
+    expected = vectors @ query / np.maximum(
+        np.linalg.norm(vectors, axis=1) * np.linalg.norm(query), 1e-12)
+    assert index.vectors.dtype == np.float32
+    assert index.vectors.flags['C_CONTIGUOUS']
+    np.testing.assert_allclose(index.scores(query), expected, atol=1e-5)
+    assert index.scores(np.zeros(8)).tolist() == [0.0] * 50
+
+
+def test_extending_a_memory_mapped_index_stays_on_disk(tmp_path):
+    rng = np.random.default_rng(0)
+    index = JobIndex([{'id': i} for i in range(10)], rng.random((10, 4))).memory_mapped(tmp_path / 'v.npy')
+
+    extended = index.extended([{'id': 10}, {'id': 11}], rng.random((2, 4)))
+    again = extended.extended([{'id': 12}], rng.random((1, 4)))
+
+    assert isinstance(extended.vectors, np.memmap) and isinstance(again.vectors, np.memmap)
+    np.testing.assert_array_equal(again.vectors[:12], extended.vectors)
+    np.testing.assert_array_equal(extended.vectors[:10], index.vectors)
+    np.testing.assert_allclose(np.linalg.norm(again.vectors, axis=1), 1.0, rtol=1e-6)
+    assert len(index.vectors) == 10 and [p.name for p in tmp_path.iterdir()] == ['v.npy']
@@ -0,0 +1,52 @@
+import json
+import numpy as np
+from config import MADAGASCAR_JOBS_FILE, SAMPLE_JOBS_FILE
+from src.data_manager import DataManager
+from src.job_store import JobStore
+
+
+def test_store_round_trips_jobs(tmp_path):
+    with open(SAMPLE_JOBS_FILE, encoding='utf-8') as f:
+        jobs = json.load(f)['jobs']
+    with open(MADAGASCAR_JOBS_FILE, encoding='utf-8') as f:
+        jobs += json.load(f)['jobs']
+
+    store = JobStore.build(jobs, tmp_path / 'jobs.store')
+    assert len(store) == len(jobs)
+    for job, stored in zip(jobs, store):
+        # Les champs absents d'une offre sont relus à None
+        assert {k: v for k, v in stored.items() if k in job} == job
+        assert all(stored[k] is None for k in stored if k not in job)
+    assert store[-1] == store[len(jobs) - 1]
+    assert store.get(0, ['id', 'title']) == {'id': jobs[0]['id'], 'title': jobs[0]['title']}
+
+
+def test_dataframe_shares_store_memory(tmp_path):
+    with open(SAMPLE_JOBS_FILE, encoding='utf-8') as f:
+        jobs = json.load(f)['jobs']
+    store = JobStore.build(jobs, tmp_path / 'jobs.store')
+
+    df = store.to_dataframe()
+    assert list(df['id']) == [job['id'] for job in jobs]
+    assert np.shares_memory(df['salary_min'].to_numpy(), store.column('salary_min'))
+    assert isinstance(store.column('salary_min'), np.memmap)
+
+
+def test_load_job_store_rebuilds_when_source_changes(tmp_path):
+    jobs_file = tmp_path / 'jobs.ndjson'
+    dm = DataManager()
+    with open(SAMPLE_JOBS_FILE, encoding='utf-8') as f:
+        dm.jobs = json.load(f)['jobs']
+    dm.save_jobs(jobs_file)
+
+    store = dm.load_job_store(jobs_file)
+    assert (JobStore.current_path(tmp_path / 'jobs.store') / 'meta.json').exists()
+    assert dm.get_all_jobs_df().shape[0] == len(store)
+    assert not JobStore.is_stale(tmp_path / 'jobs.store', jobs_file)
+
+    DataManager.append_jobs([{'id': 'new', 'title': 'Comptable'}], jobs_file)
+    assert JobStore.is_stale(tmp_path / 'jobs.store', jobs_file)
+    assert dm.load_job_store(jobs_file)[-1]['id'] == 'new'
+    # Reconstruction publiée par CURRENT : l'ancienne version reste ouverte et lisible
+    assert store[0]['id'] == dm.jobs[0]['id'] and store.path != dm.jobs.path
+    assert store.path.exists()
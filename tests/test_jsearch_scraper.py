@@ -0,0 +1,83 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+import pytest
+from src import jsearch_scraper
+from src.jsearch_scraper import JSearchScraper
+
+
+class StubJSearchHandler(BaseHTTPRequestHandler):
+    """Imite la forme des réponses de l'API JSearch"""
+
+    requests_seen = []
+    throttle_first = set()
+
+    def do_GET(self):
+        params = parse_qs(urlparse(self.path).query)
+        query, location, page = params['query'][0], params['location'][0], int(params['page'][0])
+        key = (query, location, page)
+        self.requests_seen.append(key)
+
+        if key in self.throttle_first:
+            self.throttle_first.discard(key)
+            self.send_response(429)
+            self.send_header('Retry-After', '0')
+            self.end_headers()
+            return
+
+        body = json.dumps({'status': 'OK', 'data': [{
+            'job_id': f"{query}-{location}-{page}-{i}",
+            'job_title': f"{query} {i}",
+            'employer_name': 'Acme',
+            'job_location': location,
+            'job_description': 'Python and SQL developer, good communication',
+            'job_employment_type': 'FULLTIME',
+            'job_apply_link': 'https://example.com'
+        } for i in range(3)]}).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub_server():
+    StubJSearchHandler.requests_seen = []
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubJSearchHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/search"
+    server.shutdown()
+
+
+def test_concurrent_search_retries_throttled_pages(stub_server, monkeypatch):
+    monkeypatch.setattr(jsearch_scraper, 'SCRAPER_BACKOFF_BASE', 0.01)
+    StubJSearchHandler.throttle_first = {('Python developer', 'Antananarivo', 2)}
+
+    # Offres du stub quasi-identiques : seul le dédoublonnage par id est vérifié ici
+    scraper = JSearchScraper(api_key='test', base_url=stub_server, max_workers=4, rate_limit=100, dedup=False)
+    scraper.search_many(['Python developer', 'Data scientist'], ['Antananarivo', 'Remote'], pages=2)
+
+    assert scraper.errors == []
+    assert len(scraper.get_unique_jobs()) == 2 * 2 * 2 * 3
+    assert StubJSearchHandler.requests_seen.count(('Python developer', 'Antananarivo', 2)) == 2
+    assert 'Python' in scraper.jobs[0]['required_skills']
+
+
+def test_resumes_from_checkpoint(stub_server, tmp_path):
+    checkpoint = tmp_path / 'scrape.ndjson'
+    first = JSearchScraper(api_key='test', base_url=stub_server, rate_limit=100, checkpoint_file=checkpoint)
+    first.search_many(['Python developer'], ['Remote'], pages=2)
+
+    StubJSearchHandler.requests_seen = []
+    resumed = JSearchScraper(api_key='test', base_url=stub_server, rate_limit=100, checkpoint_file=checkpoint,
+                             dedup=False)
+    resumed.search_many(['Python developer'], ['Remote'], pages=3)
+
+    assert StubJSearchHandler.requests_seen == [('Python developer', 'Remote', 3)]
+    assert len(resumed.get_unique_jobs()) == 9
@@ -0,0 +1,127 @@
+import json
+import numpy as np
+import pytest
+from config import MADAGASCAR_PROFILES_FILE, MADAGASCAR_JOBS_FILE
+from src import embeddings_matcher
+from src.ann_index import IVFIndex
+from src.embeddings_matcher import EmbeddingsMatcher
+from src.model_store import ModelStore
+from src.scoring import MAX_SCORE
+
+
+@pytest.fixture(scope='module')
+def data():
+    with open(MADAGASCAR_PROFILES_FILE, encoding='utf-8') as f:
+        profiles = json.load(f)['profiles']
+    with open(MADAGASCAR_JOBS_FILE, encoding='utf-8') as f:
+        jobs = json.load(f)['jobs']
+    return profiles, jobs
+
+
+@pytest.fixture(scope='module')
+def trained_matcher(data):
+    profiles, jobs = data
+    matcher = EmbeddingsMatcher()
+    matcher.train_model(profiles, jobs)
+    return matcher
+
+
+def test_recommend_batch_matches_recommend(data, trained_matcher, monkeypatch):
+    profiles, jobs = data
+    # Forcer plusieurs blocs
+    monkeypatch.setattr(embeddings_matcher, 'BATCH_MAX_CELLS', 2 * len(jobs))
+
+    batch = trained_matcher.recommend_batch(profiles, jobs)
+    assert len(batch) == len(profiles)
+    for profile, recommendations in zip(profiles, batch):
+        single = trained_matcher.recommend(profile, jobs)
+        assert [r['job_id'] for r in recommendations] == [r['job_id'] for r in single]
+        assert [r['score'] for r in recommendations] == pytest.approx([r['score'] for r in single], abs=1e-5)
+
+
+def test_recommend_accepts_job_iterator(data, trained_matcher):
+    profiles, jobs = data
+    for profile in profiles[:5]:
+        expected = trained_matcher.recommend(profile, jobs)
+        streamed = trained_matcher.recommend(profile, iter(jobs))
+        assert [r['job_id'] for r in streamed] == [r['job_id'] for r in expected]
+        assert [r['salary_range'] for r in streamed] == [r['salary_range'] for r in expected]
+
+
+def test_load_or_train_from_iterator_matches_list(tmp_path, data):
+    profiles, jobs = data
+    store = ModelStore(tmp_path / 'models')
+    from_list = EmbeddingsMatcher()
+    from_list.load_or_train(profiles, jobs, store=store)
+
+    streamed = EmbeddingsMatcher()
+    streamed.load_or_train(profiles, iter(jobs), store=store)
+    assert streamed.model_key == from_list.model_key
+    # Offres réduites aux champs utiles, vecteurs identiques
+    assert 'description' not in streamed.job_index.jobs[0]
+    assert [job['id'] for job in streamed.job_index.jobs] == [job['id'] for job in jobs]
+    assert np.allclose(streamed.job_index.vectors, from_list.job_index.vectors)
+
+
+def test_load_from_store_reuses_saved_job_vectors(tmp_path, data, monkeypatch):
+    profiles, jobs = data
+    store = ModelStore(tmp_path / 'models')
+    trained = EmbeddingsMatcher()
+    trained.load_or_train(profiles, jobs, store=store)
+    trained.save_job_vectors(store)
+
+    def fail(self, job_tokens):
+        raise AssertionError("le catalogue ne doit pas être ré-embarqué")
+    monkeypatch.setattr(EmbeddingsMatcher, '_embed_tokens', fail)
+
+    loaded = EmbeddingsMatcher()
+    loaded.load_from_store(jobs, trained.model_key, store=store)
+    assert isinstance(loaded.job_index.vectors, np.memmap)
+    for profile in profiles[:5]:
+        expected = trained.recommend(profile, jobs)
+        assert [r['job_id'] for r in loaded.recommend(profile, jobs)] == [r['job_id'] for r in expected]
+
+    with pytest.raises(ValueError):
+        EmbeddingsMatcher().load_from_store(jobs[:-1], trained.model_key, store=store)
+
+
+def test_ann_recommendations_break_ties_like_exact_search(data, trained_matcher, monkeypatch):
+    profiles, jobs = data
+    # Bonus forts : les offres de la localisation souhaitée atteignent toutes le score maximal
+    profiles = [{**profile, 'desired_location': 'Washington, DC'} for profile in profiles]
+    monkeypatch.setattr(trained_matcher, 'BONUS_WEIGHTS', {'location': 1.0, 'job_type': 0.0, 'salary': 0.0})
+    trained_matcher.build_job_index(jobs)
+    exact = [[r['job_id'] for r in trained_matcher.recommend(profile, jobs)] for profile in profiles]
+
+    # Sondage de toutes les listes : mêmes offres que la recherche exacte, dans le même ordre
+    monkeypatch.setattr(trained_matcher, 'use_ann', True)
+    monkeypatch.setattr(embeddings_matcher, 'ANN_CANDIDATES', len(jobs))
+    trained_matcher.ann_index = IVFIndex(n_lists=4, n_probe=4).build(trained_matcher.job_index.vectors)
+    try:
+        capped = sum(sum(r['score'] >= MAX_SCORE for r in trained_matcher.recommend(p, jobs)) > 1
+                     for p in profiles)
+        assert capped
+        for profile, expected in zip(profiles, exact):
+            assert [r['job_id'] for r in trained_matcher.recommend(profile, jobs)] == expected
+    finally:
+        trained_matcher.ann_index = None
+
+
+def test_reused_model_until_vocabulary_drift(tmp_path, data, monkeypatch):
+    profiles, jobs = data
+    store = ModelStore(tmp_path / 'models')
+    base = EmbeddingsMatcher()
+    base.load_or_train(profiles, jobs[:-3], store=store)
+
+    reused = EmbeddingsMatcher()
+    reused.load_or_train(profiles, jobs, store=store, reuse=True)
+    assert reused.model_key == base.model_key and reused.index_key != base.index_key
+    assert len(reused.job_index.jobs) == len(jobs)
+    # Vecteurs de l'index rangés à part : ceux du corpus d'entraînement ne sont pas écrasés
+    reused.save_job_vectors(store)
+    assert not store.artifact_path(base.model_key, 'job_vectors.npy').exists()
+
+    monkeypatch.setattr(embeddings_matcher, 'VOCAB_DRIFT_THRESHOLD', -1.0)
+    retrained = EmbeddingsMatcher()
+    retrained.load_or_train(profiles, jobs, store=store, reuse=True)
+    assert retrained.model_key == retrained.index_key != base.model_key
@@ -0,0 +1,66 @@
+from flask import Flask, jsonify
+from werkzeug.test import Client
+from src.metrics import MetricsRegistry, StageSummary, _NULL_TIMER, init_metrics
+
+
+def test_render_prometheus_text_format():
+    registry = MetricsRegistry(enabled=True)
+    sent = registry.counter('emails', "Emails envoyés", ['status'])
+    sent.inc(status='sent')
+    sent.inc(2, status='sent')
+    latency = registry.histogram('latency_seconds', "Latence", ['endpoint'], buckets=(0.1, 1.0))
+    latency.observe(0.05, endpoint='a')
+    latency.observe(0.1, endpoint='a')
+    latency.observe(3.0, endpoint='a')
+
+    text = registry.render()
+    assert '# TYPE emails_total counter' in text
+    assert 'emails_total{status="sent"} 3.0' in text
+    assert '# TYPE latency_seconds histogram' in text
+    assert 'latency_seconds_bucket{endpoint="a",le="0.1"} 2' in text
+    assert 'latency_seconds_bucket{endpoint="a",le="1.0"} 2' in text
+    assert 'latency_seconds_bucket{endpoint="a",le="+Inf"} 3' in text
+    assert 'latency_seconds_sum{endpoint="a"} 3.15' in text
+    assert 'latency_seconds_count{endpoint="a"} 3' in text
+
+
+def test_disabled_registry_records_nothing():
+    registry = MetricsRegistry(enabled=False)
+    assert registry.timer('score') is _NULL_TIMER
+
+    @registry.timed('train')
+    def train(x):
+        return x * 2
+
+    with registry.timer('score'):
+        assert train(2) == 4
+    assert registry.stage_totals() == {}
+
+
+def test_stage_summary_reports_only_the_block():
+    registry = MetricsRegistry(enabled=True)
+    with registry.timer('load'):
+        pass
+
+    with StageSummary(registry) as summary:
+        for _ in range(3):
+            with registry.timer('score'):
+                pass
+    assert set(summary.stages) == {'score'} and summary.stages['score']['calls'] == 3
+    assert 'score' in summary.format()
+
+
+def test_metrics_endpoint_exposes_request_latencies():
+    registry = MetricsRegistry(enabled=True)
+    app = init_metrics(Flask(__name__), registry)
+
+    @app.route('/api/items')
+    def items():
+        return jsonify([])
+
+    client = Client(app)
+    client.get('/api/items')
+    response = client.get('/metrics')
+    assert response.mimetype == 'text/plain'
+    assert ('job_reco_http_request_duration_seconds_count{endpoint="items",method="GET",status="200"} 1'
+            in response.get_data(as_text=True))
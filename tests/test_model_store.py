@@ -0,0 +1,56 @@
+import json
+from config import MADAGASCAR_PROFILES_FILE, MADAGASCAR_JOBS_FILE
+from src.embeddings_matcher import EmbeddingsMatcher
+from src.model_store import ModelStore
+
+
+def _load_data():
+    with open(MADAGASCAR_PROFILES_FILE, encoding='utf-8') as f:
+        profiles = json.load(f)['profiles']
+    with open(MADAGASCAR_JOBS_FILE, encoding='utf-8') as f:
+        jobs = json.load(f)['jobs']
+    return profiles, jobs
+
+
+def test_load_or_train_reuses_stored_model(tmp_path, monkeypatch):
+    profiles, jobs = _load_data()
+    store = ModelStore(tmp_path)
+
+    first = EmbeddingsMatcher()
+    first.load_or_train(profiles, jobs, store=store)
+    assert store.list_models() == [first.model_key]
+
+    # Le second chargement ne doit jamais ré-entraîner
+    second = EmbeddingsMatcher()
+    monkeypatch.setattr(second, 'train_model', lambda *a: (_ for _ in ()).throw(AssertionError))
+    second.load_or_train(profiles, jobs, store=store)
+
+    assert second.model_key == first.model_key
+    assert len(second.wv) == len(first.wv)
+    assert [r['job_id'] for r in second.recommend(profiles[0], jobs)] == \
+        [r['job_id'] for r in first.recommend(profiles[0], jobs)]
+
+
+def test_key_changes_with_corpus(tmp_path):
+    profiles, jobs = _load_data()
+    matcher = EmbeddingsMatcher()
+    params = matcher._training_params()
+
+    key = ModelStore.compute_key(matcher._corpus_texts(profiles, jobs), params)
+    assert key == ModelStore.compute_key(matcher._corpus_texts(profiles, jobs), params)
+    assert key != ModelStore.compute_key(matcher._corpus_texts(profiles, jobs[:-1]), params)
+
+
+def test_publish_keeps_existing_version(tmp_path):
+    store = ModelStore(tmp_path)
+
+    def write(content):
+        return lambda tmp_dir: (tmp_dir / 'data.txt').write_text(content)
+
+    store._publish('w2v-1', {}, write('first'))
+    # Un second processus publiant la même clé ne remplace pas la version en place
+    store._publish('w2v-1', {}, write('second'))
+
+    assert (store.model_dir('w2v-1') / 'data.txt').read_text() == 'first'
+    assert store.list_models() == ['w2v-1']
+    assert [p.name for p in tmp_path.iterdir()] == ['w2v-1']
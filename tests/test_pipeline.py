@@ -0,0 +1,105 @@
+import json
+import logging
+from flask import Flask
+from config import MADAGASCAR_PROFILES_FILE, MADAGASCAR_JOBS_FILE
+from src.email_service import mail
+from src.pipeline import DailyPipeline
+
+
+def _suppressed_mail_app():
+    app = Flask(__name__)
+    app.config.update(MAIL_SUPPRESS_SEND=True, MAIL_DEFAULT_SENDER='no-reply@example.com')
+    mail.init_app(app)
+    return app
+
+
+def test_pipeline_resumes_without_duplicate_emails(tmp_path):
+    def pipeline():
+        return DailyPipeline(run_id='2024-05-01', profiles_file=MADAGASCAR_PROFILES_FILE,
+                             jobs_file=MADAGASCAR_JOBS_FILE, shard_size=2, workers=2,
+                             pipeline_dir=tmp_path / 'pipeline', models_dir=tmp_path / 'models',
+                             cache_file=tmp_path / 'cache.json')
+
+    first = pipeline()
+    first.run(stages=("load", "embed", "score", "render"))
+    rendered = [entry['email'] for i in range(first.manifest['n_shards'])
+                for entry in json.loads(first._shard_file('rendered', i).read_text(encoding='utf-8'))]
+    assert first.manifest['n_shards'] == 3
+    assert rendered
+    # Vecteurs d'offres enregistrés une fois par l'étape embed, lus par les processus
+    model_key = json.loads(first.model_file.read_text(encoding='utf-8'))['model_key']
+    assert (tmp_path / 'models' / model_key / 'job_vectors.npy').exists()
+
+    # Arrêt simulé après le premier envoi (dernière ligne du journal tronquée)
+    with open(first.ledger_file, 'w', encoding='utf-8') as f:
+        f.write(json.dumps({'email': rendered[0]}) + '\n{"email": "tronq')
+    scores_mtime = first._shard_file('scores', 0).stat().st_mtime_ns
+
+    resumed = pipeline()
+    summary = resumed.run(app=_suppressed_mail_app())
+    assert summary == {'sent': len(rendered) - 1, 'failed': 0, 'skipped': 1}
+    assert first._shard_file('scores', 0).stat().st_mtime_ns == scores_mtime
+    assert resumed.sent_emails() == set(rendered)
+
+    again = pipeline().run(app=_suppressed_mail_app())
+    assert again == {'sent': 0, 'failed': 0, 'skipped': len(rendered)}
+
+
+def test_resume_scores_against_the_run_catalog(tmp_path):
+    jobs_file = tmp_path / 'jobs.json'
+    jobs = json.loads(MADAGASCAR_JOBS_FILE.read_text(encoding='utf-8'))['jobs']
+    jobs_file.write_text(json.dumps({'jobs': jobs}), encoding='utf-8')
+
+    def pipeline():
+        return DailyPipeline(run_id='2024-05-01', profiles_file=MADAGASCAR_PROFILES_FILE, jobs_file=jobs_file,
+                             shard_size=5, workers=1, pipeline_dir=tmp_path / 'pipeline',
+                             models_dir=tmp_path / 'models', cache_file=None)
+
+    pipeline().run(stages=("load", "embed"))
+    # Catalogue source modifié entre l'arrêt et la reprise
+    jobs_file.write_text(json.dumps({'jobs': jobs[:-5]}), encoding='utf-8')
+
+    resumed = pipeline()
+    resumed.run(stages=("score",))
+    assert resumed.manifest['n_jobs'] == len(jobs)
+    recommended = {rec['job_id'] for i in range(resumed.manifest['n_shards'])
+                   for entry in json.loads(resumed._shard_file('scores', i).read_text(encoding='utf-8'))
+                   for rec in entry['recommendations']}
+    assert recommended and recommended <= {job['id'] for job in jobs}
+
+
+def test_next_run_only_emails_new_matches(tmp_path):
+    def run(run_id):
+        pipeline = DailyPipeline(run_id=run_id, profiles_file=MADAGASCAR_PROFILES_FILE,
+                                 jobs_file=MADAGASCAR_JOBS_FILE, shard_size=5, workers=1,
+                                 pipeline_dir=tmp_path / 'pipeline', models_dir=tmp_path / 'models',
+                                 cache_file=tmp_path / 'cache.json')
+        return pipeline.run(app=_suppressed_mail_app())
+
+    first = run('2024-05-01')
+    assert first['sent'] > 0
+    # Mêmes profils, même catalogue : rien de nouveau à envoyer
+    assert run('2024-05-02') == {'sent': 0, 'failed': 0, 'skipped': 0}
+
+
+def test_new_job_keeps_the_model_and_rescores_incrementally(tmp_path, caplog):
+    jobs_file = tmp_path / 'jobs.json'
+    jobs = json.loads(MADAGASCAR_JOBS_FILE.read_text(encoding='utf-8'))['jobs']
+
+    def run(run_id, catalog):
+        jobs_file.write_text(json.dumps({'jobs': catalog}), encoding='utf-8')
+        pipeline = DailyPipeline(run_id=run_id, profiles_file=MADAGASCAR_PROFILES_FILE, jobs_file=jobs_file,
+                                 shard_size=5, workers=1, pipeline_dir=tmp_path / 'pipeline',
+                                 models_dir=tmp_path / 'models', cache_file=tmp_path / 'cache.json')
+        caplog.clear()
+        pipeline.run(app=_suppressed_mail_app())
+        model = json.loads(pipeline.model_file.read_text(encoding='utf-8'))
+        return model, ' '.join(r.getMessage() for r in caplog.records if 'Scores' in r.getMessage())
+
+    caplog.set_level(logging.INFO, logger='src.pipeline')
+    first_model, _ = run('2024-05-01', jobs[:-1])
+    # Une offre publiée entre les deux exécutions : même modèle, seule la nouvelle offre est scorée
+    model, statuses = run('2024-05-02', jobs)
+    assert model['model_key'] == first_model['model_key']
+    assert model['index_key'] != first_model['index_key']
+    assert "'incremental'" in statuses and "'full'" not in statuses
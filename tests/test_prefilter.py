@@ -0,0 +1,69 @@
+import json
+import numpy as np
+import pytest
+from config import MADAGASCAR_PROFILES_FILE, MADAGASCAR_JOBS_FILE
+from src.embeddings_matcher import EmbeddingsMatcher
+from src.prefilter import JobFilterIndex
+from src.scoring import JobColumns
+
+
+def _jobs(n=500, seed=0):
+    rng = np.random.default_rng(seed)
+    locations = ['Antananarivo', 'antananarivo', 'Toamasina', 'Remote', '']
+    job_types = ['CDI', 'CDD', 'Stage', None]
+    salaries = [None, 500, 1500, 3000, 6000]
+    return [{
+        'location': locations[rng.integers(len(locations))],
+        'job_type': job_types[rng.integers(len(job_types))],
+        'salary_min': salaries[rng.integers(len(salaries))],
+        'salary_max': salaries[rng.integers(len(salaries))]
+    } for _ in range(n)]
+
+
+@pytest.mark.parametrize('profile', [
+    {'desired_location': 'Antananarivo', 'job_types': ['CDI']},
+    {'desired_location': 'Remote', 'job_types': ['CDI', 'Stage'], 'salary_min': 1000, 'salary_max': 2000},
+    {'desired_location': 'Fianarantsoa', 'job_types': ['CDI']},
+    {'job_types': ['CDD'], 'salary_min': 2500},
+])
+def test_candidates_match_brute_force(profile):
+    jobs = _jobs()
+    filters = JobFilterIndex(JobColumns(jobs))
+    candidates = filters.candidates(profile)
+
+    expected = []
+    for i, job in enumerate(jobs):
+        ok = True
+        if profile.get('desired_location'):
+            ok &= job['location'].lower() == profile['desired_location'].lower()
+        if profile.get('job_types'):
+            ok &= job['job_type'] in profile['job_types']
+        if 'salary_min' in profile or 'salary_max' in profile:
+            low, high = profile.get('salary_min', 0), profile.get('salary_max', 999999)
+            ok &= not job['salary_min'] or (job['salary_min'] <= high and (job['salary_max'] or 999999) >= low)
+        if ok:
+            expected.append(i)
+    assert candidates.tolist() == expected
+
+
+def test_no_criterion_means_no_filter():
+    filters = JobFilterIndex(JobColumns(_jobs()))
+    assert filters.candidates({'desired_location': '', 'job_types': []}) is None
+
+
+def test_prefiltered_recommendations_respect_filters():
+    with open(MADAGASCAR_PROFILES_FILE, encoding='utf-8') as f:
+        profiles = json.load(f)['profiles']
+    with open(MADAGASCAR_JOBS_FILE, encoding='utf-8') as f:
+        jobs = json.load(f)['jobs']
+    jobs_by_id = {job['id']: job for job in jobs}
+
+    matcher = EmbeddingsMatcher(prefilter=True)
+    matcher.prefilter_fields = ('job_type',)
+    matcher.train_model(profiles, jobs)
+    # Types de contrat présents dans les offres scrappées
+    profiles = [dict(profile, job_types=['Contractor', 'Full-time']) for profile in profiles]
+    batch = matcher.recommend_batch(profiles, jobs)
+    assert any(batch)
+    for profile, recommendations in zip(profiles, batch):
+        assert all(jobs_by_id[r['job_id']]['job_type'] in profile['job_types'] for r in recommendations)
@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+from config import MADAGASCAR_PROFILES_FILE, MADAGASCAR_JOBS_FILE
+from src.data_manager import DataManager
+from src.embeddings_matcher import EmbeddingsMatcher
+from src.job_index import normalize_rows
+from src.model_store import ModelStore
+from src.quantization import evaluate_agreement, load_quantized, quantize
+
+
+def _clustered_vectors(n, dim=300, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(20, dim))
+    return normalize_rows(centers[rng.integers(20, size=n)] + 0.5 * rng.normal(size=(n, dim)))
+
+
+@pytest.mark.parametrize('method', ['float16', 'int8', 'pq'])
+def test_quantized_search_with_exact_rerank_agrees_with_float32(method, tmp_path):
+    vectors = _clustered_vectors(3000)
+    quantized = quantize(vectors, method)
+    assert quantized.nbytes <= vectors.nbytes / 2
+
+    report = evaluate_agreement(quantized, vectors, _clustered_vectors(20, seed=1), k=5, n_candidates=100)
+    assert report['topk_overlap_reranked'] >= 0.95
+
+    # Ajout d'offres : seules les nouvelles lignes sont encodées
+    more = np.vstack([vectors, _clustered_vectors(10, seed=2)])
+    extended = quantized.extended(more)
+    assert len(extended) == len(more) and len(quantized) == len(vectors)
+    scores = extended.scores(more[0])
+    np.testing.assert_array_equal(scores[:len(vectors)], quantized.scores(more[0]))
+    np.testing.assert_allclose(scores[len(vectors):], more[len(vectors):] @ more[0], atol=0.1)
+
+    # Sauvegarde avec le modèle : codes et dictionnaires rechargés tels quels
+    quantized.save(tmp_path / 'quantized.npz')
+    loaded = load_quantized(tmp_path / 'quantized.npz', len(vectors))
+    assert loaded.name == method
+    np.testing.assert_array_equal(loaded.scores(more[0]), quantized.scores(more[0]))
+    with pytest.raises(ValueError):
+        load_quantized(tmp_path / 'quantized.npz', len(more))
+
+
+def test_matcher_reranks_from_memory_mapped_vectors(tmp_path, monkeypatch):
+    dm = DataManager()
+    dm.load_profiles(MADAGASCAR_PROFILES_FILE)
+    jobs = dm.load_scraped_jobs(MADAGASCAR_JOBS_FILE)
+    store = ModelStore(tmp_path / 'models')
+
+    exact = EmbeddingsMatcher(prefilter=False)
+    exact.load_or_train(dm.profiles, jobs, store=store)
+    quantized = EmbeddingsMatcher(prefilter=False, quantization='int8')
+    quantized.load_or_train(dm.profiles, jobs, store=store)
+
+    assert isinstance(quantized.job_index.vectors, np.memmap)
+    # Codes enregistrés avec le modèle : rechargés sans ré-encoder
+    monkeypatch.setattr('src.embeddings_matcher.quantize', lambda *args: pytest.fail("codes ré-encodés"))
+    reloaded = EmbeddingsMatcher(prefilter=False, quantization='int8')
+    reloaded.load_or_train(dm.profiles, jobs, store=store)
+    np.testing.assert_array_equal(reloaded.quantized_index.codes, quantized.quantized_index.codes)
+    for profile in dm.profiles:
+        expected = [(r['job_id'], round(float(r['score']), 5)) for r in exact.recommend(profile, jobs)]
+        assert [(r['job_id'], round(float(r['score']), 5)) for r in quantized.recommend(profile, jobs)] == expected
@@ -0,0 +1,99 @@
+import json
+import pytest
+from config import MADAGASCAR_PROFILES_FILE, MADAGASCAR_JOBS_FILE
+from src.embeddings_matcher import EmbeddingsMatcher
+from src.model_store import ModelStore
+from src.recommendation_cache import RecommendationCache, catalog_fingerprints, refresh_recommendations
+
+
+def _load():
+    with open(MADAGASCAR_PROFILES_FILE, 'r', encoding='utf-8') as f:
+        profiles = json.load(f)['profiles']
+    with open(MADAGASCAR_JOBS_FILE, 'r', encoding='utf-8') as f:
+        jobs = json.load(f)
+    return profiles, jobs['jobs'] if isinstance(jobs, dict) else jobs
+
+
+@pytest.fixture(scope='module')
+def trained(tmp_path_factory):
+    profiles, jobs = _load()
+    matcher = EmbeddingsMatcher()
+    matcher.load_or_train(profiles, jobs, store=ModelStore(tmp_path_factory.mktemp('models')))
+    return matcher, profiles, jobs
+
+
+def _remember(cache, refreshed, jobs):
+    for result in refreshed:
+        cache.update(result['entry'], catalog_fingerprints(jobs))
+        cache.mark_sent(result['entry']['email'], [rec['job_id'] for rec in result['new_matches']])
+
+
+def test_unchanged_inputs_are_reused(tmp_path, trained):
+    matcher, profiles, jobs = trained
+    cache = RecommendationCache(tmp_path / 'cache.json')
+
+    first = refresh_recommendations(matcher, profiles, jobs, cache)
+    assert {r['status'] for r in first} == {'full'}
+    _remember(cache, first, jobs)
+    cache.save()
+
+    cache = RecommendationCache(tmp_path / 'cache.json')
+    edited = [{**profiles[0], 'skills': profiles[0]['skills'] + ['Rust']}] + profiles[1:]
+    second = refresh_recommendations(matcher, edited, jobs, cache)
+
+    assert [r['status'] for r in second] == ['full'] + ['reused'] * (len(profiles) - 1)
+    assert all(not r['new_matches'] for r in second[1:])
+    assert second[1]['entry']['recommendations'] == first[1]['entry']['recommendations']
+
+
+def test_added_jobs_are_scored_incrementally(tmp_path, trained):
+    matcher, profiles, jobs = trained
+    cache = RecommendationCache(tmp_path / 'cache.json')
+    old_jobs = jobs[:-5]
+    _remember(cache, refresh_recommendations(matcher, profiles, old_jobs, cache), old_jobs)
+
+    refreshed = refresh_recommendations(matcher, profiles, jobs, cache)
+    expected = matcher.recommend_batch(profiles, jobs)
+
+    assert {r['status'] for r in refreshed} == {'incremental'}
+    for result, recommendations in zip(refreshed, expected):
+        assert [r['job_id'] for r in result['entry']['recommendations']] == [r['job_id'] for r in recommendations]
+        added = {job['id'] for job in jobs[-5:]}
+        assert {r['job_id'] for r in result['new_matches']} <= added
+
+
+def test_edited_job_is_rescored(tmp_path, trained):
+    matcher, profiles, jobs = trained
+    cache = RecommendationCache(tmp_path / 'cache.json')
+    _remember(cache, refresh_recommendations(matcher, profiles, jobs, cache), jobs)
+
+    top = refresh_recommendations(matcher, profiles[:1], jobs, cache)[0]['entry']['recommendations'][0]
+    edited = [{**job, 'title': 'Comptable', 'description': 'Comptabilité générale'} if job['id'] == top['job_id']
+              else job for job in jobs]
+    refreshed = refresh_recommendations(matcher, profiles, edited, cache)
+    expected = matcher.recommend_batch(profiles, edited)
+
+    assert refreshed[0]['status'] == 'full'
+    assert 'incremental' in {r['status'] for r in refreshed}
+    for result, recommendations in zip(refreshed, expected):
+        assert [r['job_id'] for r in result['entry']['recommendations']] == [r['job_id'] for r in recommendations]
+
+
+def test_catalog_change_that_retrains_rescores_everything(tmp_path):
+    profiles, jobs = _load()
+    store = ModelStore(tmp_path / 'models')
+    old_matcher = EmbeddingsMatcher()
+    old_matcher.load_or_train(profiles, jobs[:-5], store=store)
+    cache = RecommendationCache(tmp_path / 'cache.json')
+    _remember(cache, refresh_recommendations(old_matcher, profiles, jobs[:-5], cache), jobs[:-5])
+
+    matcher = EmbeddingsMatcher()
+    matcher.load_or_train(profiles, jobs, store=store)
+    refreshed = refresh_recommendations(matcher, profiles, jobs, cache)
+    expected = matcher.recommend_batch(profiles, jobs)
+
+    assert matcher.model_key != old_matcher.model_key
+    assert {r['status'] for r in refreshed} == {'full'}
+    assert {r['entry']['model_key'] for r in refreshed} == {matcher.model_key}
+    for result, recommendations in zip(refreshed, expected):
+        assert result['entry']['recommendations'] == [{**r, 'score': float(r['score'])} for r in recommendations]
@@ -0,0 +1,220 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+import pytest
+from config import MADAGASCAR_PROFILES_FILE, MADAGASCAR_JOBS_FILE, SCRAPED_JOBS_FILE
+from src.data_manager import DataManager
+from src.job_store import JobStore
+from src.model_store import ModelStore
+from src.recommendation_service import RecommendationService
+
+
+def test_reload_swaps_state_only_when_files_change(tmp_path):
+    profiles_file = tmp_path / 'profiles.json'
+    jobs_file = tmp_path / 'jobs.json'
+    profiles_file.write_bytes(MADAGASCAR_PROFILES_FILE.read_bytes())
+    jobs_file.write_bytes(MADAGASCAR_JOBS_FILE.read_bytes())
+
+    service = RecommendationService(profiles_file, jobs_file, store=ModelStore(tmp_path / 'models'))
+    service.start(watch_interval=0)
+    first = service.snapshot()
+    assert not service.reload()
+    assert service.snapshot() is first
+
+    with open(jobs_file, encoding='utf-8') as f:
+        data = json.load(f)
+    data['jobs'] = data['jobs'][:-1]
+    with open(jobs_file, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+    os.utime(jobs_file, ns=(0, first.file_stamps[str(jobs_file)][0] + 10**9))
+
+    assert service.reload()
+    second = service.snapshot()
+    assert second is not first
+    assert len(second.jobs) == len(first.jobs) - 1
+    assert second.matcher.job_index.covers(second.jobs)
+    # L'ancien état reste utilisable par les requêtes en cours
+    assert first.matcher.recommend(first.profiles[0], first.jobs) is not None
+
+
+def test_ingest_jobs_appends_without_retraining(tmp_path):
+    profiles_file = tmp_path / 'profiles.json'
+    jobs_file = tmp_path / 'jobs.json'
+    profiles_file.write_bytes(MADAGASCAR_PROFILES_FILE.read_bytes())
+    with open(MADAGASCAR_JOBS_FILE, encoding='utf-8') as f:
+        jobs = json.load(f)['jobs']
+    with open(jobs_file, 'w', encoding='utf-8') as f:
+        json.dump({'jobs': jobs[:20]}, f)
+
+    service = RecommendationService(profiles_file, jobs_file, store=ModelStore(tmp_path / 'models'))
+    service.start(watch_interval=0)
+    first = service.snapshot()
+
+    report = service.ingest_jobs(jobs[10:])
+    assert report['added'] == len(jobs) - 20
+    assert report['duplicates'] == 10
+
+    second = service.snapshot()
+    assert len(second.jobs) == len(jobs)
+    assert len(first.jobs) == 20 and len(first.matcher.job_index.vectors) == 20
+    assert second.matcher.job_index.covers(second.jobs)
+    assert len(second.matcher.job_index.columns) == len(jobs)
+    # Sauvegardé sans déclencher de rechargement par la surveillance des fichiers
+    assert not service.has_changed()
+    with open(jobs_file, encoding='utf-8') as f:
+        assert len(json.load(f)['jobs']) == len(jobs)
+
+    # Un lot contenant une offre invalide est refusé en entier, catalogue inchangé
+    before = jobs_file.read_bytes()
+    with pytest.raises(ValueError):
+        service.ingest_jobs([{'id': 'ok', 'title': 'Dev', 'company': 'X', 'location': 'Remote'},
+                             {'id': 'ko', 'title': 'Dev'}, 'pas une offre'])
+    assert service.snapshot() is second
+    assert jobs_file.read_bytes() == before
+
+
+def test_ndjson_catalog_is_streamed_and_appended(tmp_path):
+    profiles_file = tmp_path / 'profiles.json'
+    jobs_file = tmp_path / 'jobs.ndjson'
+    profiles_file.write_bytes(MADAGASCAR_PROFILES_FILE.read_bytes())
+    with open(MADAGASCAR_JOBS_FILE, encoding='utf-8') as f:
+        jobs = json.load(f)['jobs']
+    dm = DataManager()
+    dm.jobs = jobs[:20]
+    dm.save_jobs(jobs_file)
+    before = jobs_file.read_bytes()
+
+    service = RecommendationService(profiles_file, jobs_file, store=ModelStore(tmp_path / 'models'))
+    service.start(watch_interval=0)
+    assert 'description' not in service.snapshot().jobs[0]
+
+    report = service.ingest_jobs(jobs[10:])
+    assert report['added'] == len(jobs) - 20
+    assert jobs_file.read_bytes().startswith(before)
+    assert [job['id'] for job in DataManager.iter_jobs(jobs_file)] == [job['id'] for job in jobs]
+    assert not service.has_changed()
+
+
+def test_job_store_catalog_is_shared_by_the_index(tmp_path):
+    profiles_file = tmp_path / 'profiles.json'
+    jobs_file = tmp_path / 'jobs.json'
+    profiles_file.write_bytes(MADAGASCAR_PROFILES_FILE.read_bytes())
+    with open(MADAGASCAR_JOBS_FILE, encoding='utf-8') as f:
+        jobs = json.load(f)['jobs']
+    with open(jobs_file, 'w', encoding='utf-8') as f:
+        json.dump({'jobs': jobs[:20]}, f)
+
+    service = RecommendationService(profiles_file, jobs_file, store=ModelStore(tmp_path / 'models'),
+                                    use_job_store=True)
+    service.start(watch_interval=0)
+    state = service.snapshot()
+    assert isinstance(state.jobs, JobStore)
+    assert state.matcher.job_index.jobs is state.jobs
+    assert state.matcher.recommend(state.profiles[0], state.jobs) is not None
+
+    service.ingest_jobs(jobs[20:])
+    state = service.snapshot()
+    assert isinstance(state.jobs, JobStore) and len(state.jobs) == len(jobs)
+    assert state.matcher.job_index.covers(state.jobs)
+
+
+def test_engine_is_selectable_per_request(tmp_path):
+    service = RecommendationService(MADAGASCAR_PROFILES_FILE, MADAGASCAR_JOBS_FILE,
+                                    store=ModelStore(tmp_path / 'models'))
+    service.start(watch_interval=0)
+    state = service.snapshot()
+
+    assert state.get_matcher() is state.matcher
+    for engine in ('word2vec', 'tfidf', 'hybrid'):
+        matcher = state.get_matcher(engine)
+        assert matcher.recommend(state.profiles[0], state.jobs) is not None
+    assert state.get_matcher('tfidf').job_index.covers(state.jobs)
+    with pytest.raises(ValueError):
+        state.get_matcher('bm25')
+
+    service.ingest_jobs([{'id': 'new', 'title': 'Développeur Python', 'company': 'X', 'location': 'Remote'}],
+                        persist=False)
+    state = service.snapshot()
+    assert state.get_matcher('tfidf').job_index.covers(state.jobs)
+    assert len(state.get_matcher('hybrid').recommend(state.profiles[0], state.jobs)) > 0
+
+
+def test_lazy_service_loads_model_on_first_recommendation(tmp_path):
+    service = RecommendationService(MADAGASCAR_PROFILES_FILE, MADAGASCAR_JOBS_FILE,
+                                    store=ModelStore(tmp_path / 'models'), lazy_model=True)
+    service.start(watch_interval=0)
+    pending = service.snapshot()
+    assert pending.profiles and not hasattr(pending, 'matchers')
+
+    matcher = pending.get_matcher()
+    state = service.snapshot()
+    assert state is not pending and state.get_matcher() is matcher
+    assert matcher.recommend(state.profiles[0], pending.jobs) is not None
+    # Un rechargement garde le modèle une fois celui-ci chargé
+    assert service.reload(force=True) and service.snapshot().matcher is not None
+
+
+def test_serving_profiles_does_not_import_heavy_dependencies():
+    code = (
+        "import sys\n"
+        "from src.recommendation_service import RecommendationService\n"
+        "service = RecommendationService(lazy_model=True).start(watch_interval=0)\n"
+        "assert service.snapshot().profiles\n"
+        "print([m for m in ('gensim', 'sklearn', 'nltk') if m in sys.modules])\n"
+    )
+    completed = subprocess.run([sys.executable, '-c', code], cwd=Path(__file__).resolve().parent.parent,
+                               capture_output=True, text=True, check=True)
+    assert completed.stdout.strip().splitlines()[-1] == '[]'
+
+
+def test_ingest_keeps_previous_state_usable_with_prefilter(tmp_path):
+    profiles_file = tmp_path / 'profiles.json'
+    jobs_file = tmp_path / 'jobs.json'
+    profiles_file.write_bytes(MADAGASCAR_PROFILES_FILE.read_bytes())
+    with open(MADAGASCAR_JOBS_FILE, encoding='utf-8') as f:
+        jobs = json.load(f)['jobs']
+    with open(jobs_file, 'w', encoding='utf-8') as f:
+        json.dump({'jobs': jobs[:20]}, f)
+
+    service = RecommendationService(profiles_file, jobs_file, store=ModelStore(tmp_path / 'models'))
+    service.start(watch_interval=0)
+    first = service.snapshot()
+    first.matcher.prefilter = True
+    profile = {**first.profiles[0], 'desired_location': 'Toamasina', 'job_types': ['Stage']}
+    assert first.matcher.recommend(profile, first.jobs) == []
+
+    # Nouvelle localisation et nouveau type de contrat, pendant que l'ancien état sert encore
+    service.ingest_jobs([{**jobs[25], 'id': 'new', 'location': 'Toamasina', 'job_type': 'Stage'}])
+    assert first.matcher.recommend(profile, first.jobs) == []
+    state = service.snapshot()
+    assert 'toamasina' not in first.matcher.job_index.columns.location_ids
+    state.matcher.prefilter = True
+    assert [r['job_id'] for r in state.matcher.recommend(profile, state.jobs)] == ['new']
+
+
+def test_ingest_keeps_source_rows_and_skips_near_duplicates(tmp_path):
+    profiles_file = tmp_path / 'profiles.json'
+    jobs_file = tmp_path / 'jobs.json'
+    profiles_file.write_bytes(MADAGASCAR_PROFILES_FILE.read_bytes())
+    # Catalogue scrappé contenant un quasi-doublon, retiré à la lecture
+    jobs_file.write_bytes(SCRAPED_JOBS_FILE.read_bytes())
+    raw_ids = [job['id'] for job in json.loads(jobs_file.read_text(encoding='utf-8'))['jobs']]
+    with open(MADAGASCAR_JOBS_FILE, encoding='utf-8') as f:
+        new_job = json.load(f)['jobs'][0]
+
+    service = RecommendationService(profiles_file, jobs_file, store=ModelStore(tmp_path / 'models'))
+    service.start(watch_interval=0)
+    state = service.snapshot()
+    assert len(state.jobs) < len(raw_ids)
+
+    # Même offre republiée sous un autre id (titre retouché) : écartée
+    repost = {**state.jobs[3], 'id': 'repost', 'title': state.jobs[3]['title'] + ' (H/F)'}
+    report = service.ingest_jobs([repost, {**new_job, 'id': 'new'}])
+    assert report['added'] == 1 and report['near_duplicates'] == 1
+    assert [job['id'] for job in service.snapshot().jobs][-1] == 'new'
+
+    # Toutes les lignes du fichier source sont conservées, la nouvelle offre ajoutée
+    saved_ids = [job['id'] for job in json.loads(jobs_file.read_text(encoding='utf-8'))['jobs']]
+    assert saved_ids == raw_ids + ['new']
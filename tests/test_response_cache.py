@@ -0,0 +1,112 @@
+from flask import Flask, jsonify
+from werkzeug.test import Client
+from src.response_cache import MemoryBackend, RedisBackend, ResponseCache
+
+
+def _app(cache, calls, state):
+    app = Flask(__name__)
+
+    @app.route('/api/items')
+    @cache.cached(lambda: state['version'])
+    def items():
+        calls.append(1)
+        return jsonify({'version': state['version']})
+
+    @app.route('/api/broken')
+    @cache.cached(lambda: state['version'])
+    def broken():
+        calls.append(1)
+        return jsonify({'success': False}), 500
+
+    return app
+
+
+def test_repeat_requests_are_served_from_cache_with_etag():
+    cache, calls, state = ResponseCache(MemoryBackend()), [], {'version': 'v1'}
+    # Client werkzeug directement (app.test_client de Flask 2.3 ne suit pas Werkzeug 3)
+    client = Client(_app(cache, calls, state))
+
+    first = client.get('/api/items')
+    second = client.get('/api/items')
+    assert first.get_json() == second.get_json() == {'version': 'v1'}
+    assert len(calls) == 1 and cache.hits == 1
+
+    etag = first.headers['ETag']
+    not_modified = client.get('/api/items', headers={'If-None-Match': etag})
+    assert not_modified.status_code == 304 and not_modified.data == b''
+
+    # Nouvel état : nouvelle clé, l'ancien ETag ne correspond plus
+    state['version'] = 'v2'
+    cache.invalidate()
+    refreshed = client.get('/api/items', headers={'If-None-Match': etag})
+    assert refreshed.status_code == 200 and refreshed.get_json() == {'version': 'v2'}
+    assert len(calls) == 2
+
+    client.get('/api/broken')
+    client.get('/api/broken')
+    assert len(calls) == 4
+
+
+def test_memory_backend_lru_and_ttl(monkeypatch):
+    now = [0.0]
+    monkeypatch.setattr('src.response_cache.time.monotonic', lambda: now[0])
+    backend = MemoryBackend(max_entries=2)
+
+    backend.set('a', 1, ttl=10)
+    backend.set('b', 2, ttl=10)
+    assert backend.get('a') == 1
+    backend.set('c', 3, ttl=10)  # 'b' est le moins récemment utilisé
+    assert backend.get('b') is None and backend.get('a') == 1
+
+    now[0] = 11.0
+    assert backend.get('a') is None and len(backend) == 1
+
+
+class _FakeRedis:
+    """Sous-ensemble du client redis utilisé par RedisBackend (valeurs stockées en bytes)"""
+
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def incr(self, key):
+        self.data[key] = str(int(self.data.get(key, 0)) + 1).encode()
+
+    def hgetall(self, key):
+        return dict(self.data.get(key, {}))
+
+    def hset(self, key, mapping):
+        self.data.setdefault(key, {}).update({
+            name.encode(): value if isinstance(value, bytes) else value.encode()
+            for name, value in mapping.items()
+        })
+
+    def expire(self, key, seconds):
+        pass
+
+    def pipeline(self):
+        return self
+
+    def execute(self):
+        pass
+
+
+def test_redis_backend_stores_plain_fields():
+    backend = RedisBackend.__new__(RedisBackend)
+    backend.client, backend.prefix = _FakeRedis(), 'test'
+    cache, calls, state = ResponseCache(backend), [], {'version': 'v1'}
+    client = Client(_app(cache, calls, state))
+
+    first = client.get('/api/items')
+    second = client.get('/api/items')
+    assert first.get_json() == second.get_json() == {'version': 'v1'}
+    assert second.headers['ETag'] == first.headers['ETag'] and len(calls) == 1
+    # Entrée en champs bruts (pas d'objet sérialisé)
+    stored = backend.client.data[backend._key('/api/items:v1')]
+    assert stored[b'body'] == first.data and stored[b'mimetype'] == b'application/json'
+
+    cache.invalidate()
+    client.get('/api/items')
+    assert len(calls) == 2
@@ -0,0 +1,38 @@
+import numpy as np
+from src.matcher import SimpleMatcher
+from src.embeddings_matcher import EmbeddingsMatcher
+from src.scoring import JobColumns, apply_bonus
+
+PROFILE = {
+    'desired_location': 'Remote',
+    'job_types': ['CDI', 'Remote'],
+    'salary_min': 1500,
+    'salary_max': 3000
+}
+
+
+def _jobs():
+    locations = ['Remote', 'remote', 'Antananarivo', '']
+    job_types = ['CDI', 'CDD', 'Remote', None]
+    salaries = [None, 0, 1000, 2500, 5000]
+    jobs = []
+    for i in range(100):
+        jobs.append({
+            'location': locations[i % 4],
+            'job_type': job_types[i % 3],
+            'salary_min': salaries[i % 5],
+            'salary_max': salaries[(i // 5) % 5]
+        })
+    return jobs
+
+
+def test_vectorized_bonus_matches_per_job_rules():
+    jobs = _jobs()
+    columns = JobColumns(jobs)
+    similarities = np.linspace(0, 1, len(jobs))
+
+    for matcher_cls in (SimpleMatcher, EmbeddingsMatcher):
+        matcher = matcher_cls()
+        expected = [matcher.add_score_filtering(PROFILE, job, s) for job, s in zip(jobs, similarities)]
+        actual = apply_bonus(similarities, PROFILE, columns, matcher.BONUS_WEIGHTS)
+        assert actual.tolist() == expected
@@ -0,0 +1,64 @@
+import json
+import pytest
+from config import MADAGASCAR_PROFILES_FILE, MADAGASCAR_JOBS_FILE
+from src import matcher as matcher_module
+from src.matcher import SimpleMatcher
+from src.model_store import ModelStore
+
+
+@pytest.fixture(scope='module')
+def data():
+    with open(MADAGASCAR_PROFILES_FILE, encoding='utf-8') as f:
+        profiles = json.load(f)['profiles']
+    with open(MADAGASCAR_JOBS_FILE, encoding='utf-8') as f:
+        jobs = json.load(f)['jobs']
+    return profiles, jobs
+
+
+def test_vectorizer_is_fitted_once_per_catalog(data, monkeypatch):
+    profiles, jobs = data
+    matcher = SimpleMatcher()
+    fits = []
+    original = SimpleMatcher._fit_texts
+    monkeypatch.setattr(SimpleMatcher, '_fit_texts', lambda self, *args: fits.append(1) or original(self, *args))
+
+    for profile in profiles:
+        matcher.recommend(profile, jobs)
+    assert len(fits) == 1
+
+    matcher.recommend(profiles[0], list(jobs))
+    assert len(fits) == 2
+
+
+def test_recommend_batch_matches_recommend(data, monkeypatch):
+    profiles, jobs = data
+    # Forcer plusieurs blocs
+    monkeypatch.setattr(matcher_module, 'BATCH_MAX_CELLS', 2 * len(jobs))
+    matcher = SimpleMatcher()
+
+    batch = matcher.recommend_batch(profiles, jobs)
+    assert len(batch) == len(profiles)
+    for profile, recommendations in zip(profiles, batch):
+        single = matcher.recommend(profile, jobs)
+        assert [r['job_id'] for r in recommendations] == [r['job_id'] for r in single]
+        assert [r['score'] for r in recommendations] == pytest.approx([r['score'] for r in single])
+
+
+def test_load_or_fit_reuses_stored_index(tmp_path, data):
+    profiles, jobs = data
+    store = ModelStore(tmp_path / 'models')
+    fitted = SimpleMatcher()
+    fitted.load_or_fit(jobs, store=store)
+    assert store.list_models() == [fitted.model_key]
+
+    loaded = SimpleMatcher()
+    loaded.load_or_fit(jobs, store=store)
+    assert loaded.model_key == fitted.model_key
+    assert loaded.job_index.covers(jobs)
+    assert loaded.recommend(profiles[0], jobs) == fitted.recommend(profiles[0], jobs)
+
+    # Catalogue vide : rien à ajuster ni à enregistrer
+    empty = SimpleMatcher()
+    empty.load_or_fit([], store=store)
+    assert store.list_models() == [fitted.model_key]
+    assert empty.recommend(profiles[0], empty.job_index.jobs) == []
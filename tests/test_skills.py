@@ -0,0 +1,44 @@
+import json
+from src.skills import SkillExtractor
+
+
+def test_word_boundaries_avoid_false_positives():
+    extractor = SkillExtractor()
+    text = "A good team player who can maintain legacy code. J'ai une vue d'ensemble. Strong JavaScript."
+    assert extractor.extract(text) == ['JavaScript']
+
+
+def test_symbols_aliases_and_case_sensitive_terms():
+    extractor = SkillExtractor()
+    text = ("Go developer with C++, C#, Node.js and golang; k8s, Postgres. "
+            "Must know AI/ML and React. We go fast.")
+    assert extractor.extract(text) == [
+        'C++', 'C#', 'Go', 'React', 'Node.js', 'Machine Learning', 'AI', 'Kubernetes', 'PostgreSQL'
+    ]
+
+
+def test_from_file(tmp_path):
+    path = tmp_path / 'skills.json'
+    path.write_text(json.dumps({
+        'skills': {'Terraform': ['tf'], 'Go': ['Golang']},
+        'case_sensitive': ['Go']
+    }), encoding='utf-8')
+
+    extractor = SkillExtractor.from_file(path)
+
+    assert extractor.extract("Terraform and golang, let's go") == ['Terraform', 'Go']
+    assert extractor.extract('') == []
+
+
+def test_overlapping_terms_resolved_like_the_pattern():
+    extractor = SkillExtractor({'Data': [], 'Data Analysis': ['data analysis tools'], 'Tools': []})
+    expected = {
+        "Data analysis tools": ['Data Analysis'],
+        "data analysis, tools and data": ['Data', 'Data Analysis', 'Tools'],
+        "data.analysis tools": ['Tools'],
+    }
+    for text, skills in expected.items():
+        assert extractor.extract(text) == skills
+        assert {m.group(0).lower() for m in extractor.pattern.finditer(text)} <= {
+            term.lower() for name in skills for term in [name, *extractor.skills[name]]
+        }
@@ -0,0 +1,60 @@
+import json
+from collections import Counter
+import pytest
+from config import DATA_DIR
+from src.text_processing import TextTokenizer, TokenCache
+
+
+def _bundled_texts():
+    texts = []
+    for path in sorted(DATA_DIR.glob('*.json')):
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        for job in data.get('jobs', []):
+            texts.append(' '.join([
+                job.get('title', ''),
+                job.get('description', ''),
+                ' '.join(job.get('required_skills', [])),
+                job.get('location', ''),
+                job.get('job_type') or ''
+            ]))
+        for profile in data.get('profiles', []):
+            texts.append(' '.join([profile.get('keywords', ''), ' '.join(profile.get('skills', []))]))
+    return texts
+
+
+def test_regex_tokenizer_parity_with_nltk():
+    nltk = pytest.importorskip('nltk')
+    try:
+        nltk.data.find('tokenizers/punkt')
+    except LookupError:
+        pytest.skip("Ressource NLTK punkt absente")
+
+    reference = TextTokenizer("nltk", cache=None)
+    fast = TextTokenizer("regex", cache=None)
+
+    total = 0
+    mismatches = 0
+    for text in _bundled_texts():
+        expected = Counter(reference.tokenize(text))
+        actual = Counter(fast.tokenize(text))
+        total += sum(expected.values())
+        mismatches += sum((expected - actual).values()) + sum((actual - expected).values())
+
+    assert total > 10000
+    assert mismatches / total < 0.005
+
+
+def test_token_cache_lru_and_disk_spill(tmp_path):
+    cache = TokenCache(max_size=2, spill_dir=tmp_path)
+    tokenizer = TextTokenizer("regex", cache=cache)
+
+    first = tokenizer.tokenize("Développeur Python senior")
+    tokenizer.tokenize("Data scientist")
+    tokenizer.tokenize("Frontend React")
+    assert len(cache) == 2
+
+    # La première entrée a été évincée vers le disque puis est relue
+    hits = cache.hits
+    assert tokenizer.tokenize("Développeur Python senior") == first
+    assert cache.hits == hits + 1